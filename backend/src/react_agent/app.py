@@ -1,21 +1,76 @@
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from langgraph.types import Command
 from langserve import add_routes
 
+from react_agent import http_client
 from react_agent.graph_ import create_graph
-from react_agent.types import ChatInputType
+from react_agent.streaming import DAY_EVENT, REVIEW_EVENT
+from react_agent.types import ChatInputType, ChatStreamRequest
 
 # Load environment variables from .env file
 load_dotenv()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared upstream connection pool before serving and drain it on exit.
+    await http_client.startup()
+    try:
+        yield
+    finally:
+        await http_client.shutdown()
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_itinerary(graph: Any, request: ChatStreamRequest) -> AsyncIterator[str]:
+    """Run the graph for one turn as server-sent events.
+
+    `day` events carry each itinerary day as soon as the model finishes it,
+    `review` carries a problem a background review found after the itinerary
+    was shown, `update` events name the nodes that completed, `interrupt`
+    carries the question the graph is waiting on, and `end` closes the turn.
+    """
+    config = {"configurable": {"thread_id": request.thread_id}}
+    if request.resume is not None:
+        graph_input: Any = Command(resume=request.resume)
+    else:
+        graph_input = {"itinerary_messages": request.input}
+
+    async for mode, chunk in graph.astream(
+        graph_input, config, stream_mode=["updates", "custom"]
+    ):
+        if mode == "custom" and isinstance(chunk, dict) and chunk.get("type") == DAY_EVENT:
+            yield _sse("day", {"day_index": chunk["day_index"], "day": chunk["day"]})
+        elif mode == "custom" and isinstance(chunk, dict) and chunk.get("type") == REVIEW_EVENT:
+            yield _sse("review", {"feedback": chunk["feedback"]})
+        elif mode == "updates":
+            for node, update in chunk.items():
+                if node == "__interrupt__":
+                    yield _sse("interrupt", [item.value for item in update])
+                else:
+                    yield _sse("update", {"node": node})
+
+    state = await graph.aget_state(config)
+    yield _sse("end", {"next": list(state.next), "itinerary": state.values.get("itinerary")})
+
+
 def start() -> None:
     app = FastAPI(
         title="Travel Buddy",
         version="1.0",
         description="A simple api server using Langchain's Runnable interfaces",
+        lifespan=lifespan,
     )
 
     # Configure CORS
@@ -37,6 +92,13 @@ def start() -> None:
     runnable = graph.with_types(input_type=ChatInputType, output_type=dict)
 
     add_routes(app, runnable, path="/chat", playground_type="default")
+
+    @app.post("/chat/itinerary/stream")
+    async def chat_itinerary_stream(request: ChatStreamRequest) -> StreamingResponse:
+        return StreamingResponse(
+            stream_itinerary(graph, request), media_type="text/event-stream"
+        )
+
     print("Starting server...")
     uvicorn.run(app, host="0.0.0.0", port=6969)
 
@@ -2,48 +2,55 @@
 
 Works with a chat model with tool calling support.
 """
-import json 
-import os
+import json
 
 from datetime import datetime
-from typing import Dict, List, Literal
+from functools import cache
+from typing import TYPE_CHECKING, Literal
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage, trim_messages
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, trim_messages
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, START, END
+from langgraph.graph import StateGraph
+from langgraph.graph.graph import CompiledGraph
 from langgraph.prebuilt import ToolNode
 from langgraph.types import interrupt, Command
-from langchain_core.messages.base import BaseMessage
-from datetime import datetime 
-
-from pydantic import BaseModel, Field
 
 from react_agent.configuration import Configuration
 from react_agent.state import InputState, State
+from react_agent.streaming import invoke_streaming_days
 from react_agent.tools import TOOLS
-from react_agent.prompts import VALIDATE_INPUT_PROMPT, GENERATE_ITINERARY_PROMPT, FORMAT_ITINERARY_PROMPT, REFLECTION_ITINERARY_PROMPT, USER_ACCOMODATIONS_INPUT_PROMPT
-from react_agent.schemas import ITINERARY_SCHEMA, USER_SCHEMA, ACCOMMODATION_SCHEMA, REFLECTION_SCHEMA
+from react_agent.prompts import VALIDATE_INPUT_PROMPT, GENERATE_ITINERARY_PROMPT, FORMAT_ITINERARY_PROMPT, REFLECTION_ITINERARY_PROMPT
+from react_agent.schemas import ITINERARY_SCHEMA, USER_SCHEMA, REFLECTION_SCHEMA
 from langgraph.checkpoint.memory import MemorySaver
-from typing import List, Optional, TypedDict
 
-from langchain.output_parsers.openai_tools import JsonOutputToolsParser
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.runnables import RunnableConfig
-from langchain_openai import ChatOpenAI
-from langgraph.graph import END, StateGraph
-from langgraph.graph.graph import CompiledGraph
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
 
+@cache
+def get_llm() -> "BaseChatModel":
+    """Return the chat model, creating it on first use.
 
-llm = init_chat_model("gpt-4o", model_provider="openai")
+    Building the model imports the provider SDK and reads its API key, so it is
+    deferred until a node actually runs instead of happening at import time.
+    """
+    from langchain.chat_models import init_chat_model
+
+    return init_chat_model("gpt-4o", model_provider="openai")
+
+
+@cache
+def get_token_counter() -> "BaseChatModel":
+    """Return the model used to count tokens when trimming the research history."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model="gpt-4o")
 
 
 def validate_user_query(state: State) -> dict:
     """Request more information from the user when the query is incomplete."""
 
-    llm_json = llm.with_structured_output({
+    llm_json = get_llm().with_structured_output({
         "$schema": "https://json-schema.org/draft/2020-12/schema",
         "title": "validation_schema",
         "$id": "https://example.com/product.schema.json",
@@ -82,7 +89,7 @@ def validate_user_query(state: State) -> dict:
 
 def update_user_profile(state: State) -> dict:
 
-    llm_json = llm.with_structured_output(USER_SCHEMA)
+    llm_json = get_llm().with_structured_output(USER_SCHEMA)
     response = llm_json.invoke(
         [SystemMessage(
             content=f"""
@@ -119,14 +126,14 @@ async def research_itinerary(
         CURRENT_ITINERARY=state.itinerary
     )
 
-    llm_tools = llm.bind_tools(TOOLS)
+    llm_tools = get_llm().bind_tools(TOOLS)
 
     trimmed_messages = trim_messages(
         messages=state.itinerary_messages,
         include_system=False,
         max_tokens=50000,
         allow_partial=False,
-        token_counter=ChatOpenAI(model="gpt-4o"),
+        token_counter=get_token_counter(),
     )
     
     ai_msg = await llm_tools.ainvoke(
@@ -148,8 +155,10 @@ def format_itinerary(
         USER_PROFILE=state.user_profile
     )
 
-    llm_json = llm.with_structured_output(ITINERARY_SCHEMA)
-    response = llm_json.invoke(
+    llm_json = get_llm().with_structured_output(ITINERARY_SCHEMA)
+    # Each day is written to the custom stream as soon as it is generated.
+    response = invoke_streaming_days(
+            llm_json,
             [SystemMessage(content=system_message)] +
             [state.itinerary_messages[-1]]
     )
@@ -163,7 +172,7 @@ def review_itinerary(
 ) -> Command[Literal['validate_itinerary', 'research_itinerary']]:
     """ Reflect on the web search agent output and return feedback."""
 
-    llm_json = llm.with_structured_output(
+    llm_json = get_llm().with_structured_output(
         REFLECTION_SCHEMA
     )
 
@@ -207,7 +216,7 @@ def validate_itinerary(state: State) -> dict:
         )
 
     if isinstance(last_message, HumanMessage):
-        llm_json = llm.with_structured_output({
+        llm_json = get_llm().with_structured_output({
             "$schema": "https://json-schema.org/draft/2020-12/schema",
             "title": "itinerary_validation_schema",
             "$id": "https://example.com/product.schema.json",
@@ -277,7 +286,7 @@ def validate_itinerary(state: State) -> dict:
 #             })
 
     
-#     llm_json = llm.with_structured_output({
+#     llm_json = get_llm().with_structured_output({
 #         "$schema": "https://json-schema.org/draft/2020-12/schema",
 #         "title": "validation_schema",
 #         "$id": "https://example.com/product.schema.json",
@@ -294,7 +303,7 @@ def validate_itinerary(state: State) -> dict:
 #         },
 #         "required": ["is_valid", "response_message"]
 #     })
-#     response = llm.invoke(
+#     response = get_llm().invoke(
 #             [SystemMessage(content=USER_ACCOMODATIONS_INPUT_PROMPT.format(
 #                 ITINERARY=state.itinerary,
 #                 USER_PROFILE=state.user_profile,
@@ -0,0 +1,121 @@
+"""Process-wide pooled HTTP client shared by every upstream tool.
+
+Opening a fresh `aiohttp.ClientSession` per tool call pays a DNS lookup and a
+TCP+TLS handshake every time. Instead, all tools borrow a single session whose
+connector keeps connections alive, caches DNS answers and caps connections per
+host.
+
+The pool is started lazily on first use so the graph works under `langgraph dev`
+without any extra wiring. Servers that own their lifecycle (see
+`backend/src/react_agent/app.py`) should call `startup()` / `shutdown()` explicitly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Tuning knobs for the shared connection pool."""
+
+    limit: int = field(
+        default_factory=lambda: _env_int("HTTP_POOL_LIMIT", 100),
+        metadata={"description": "Maximum number of open connections in total."},
+    )
+    limit_per_host: int = field(
+        default_factory=lambda: _env_int("HTTP_POOL_LIMIT_PER_HOST", 20),
+        metadata={"description": "Maximum number of open connections per upstream host."},
+    )
+    keepalive_timeout: float = field(
+        default_factory=lambda: _env_float("HTTP_POOL_KEEPALIVE_SECONDS", 30.0),
+        metadata={"description": "Seconds an idle connection is kept for reuse."},
+    )
+    dns_cache_ttl: int = field(
+        default_factory=lambda: _env_int("HTTP_POOL_DNS_TTL_SECONDS", 300),
+        metadata={"description": "Seconds a resolved host address is cached."},
+    )
+    total_timeout: float = field(
+        default_factory=lambda: _env_float("HTTP_POOL_TIMEOUT_SECONDS", 30.0),
+        metadata={"description": "Overall timeout for a single request."},
+    )
+
+
+_settings = PoolSettings()
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _create_session(settings: PoolSettings) -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=settings.limit,
+        limit_per_host=settings.limit_per_host,
+        keepalive_timeout=settings.keepalive_timeout,
+        ttl_dns_cache=settings.dns_cache_ttl,
+        use_dns_cache=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=settings.total_timeout),
+    )
+
+
+async def startup(settings: Optional[PoolSettings] = None) -> aiohttp.ClientSession:
+    """Open the shared session, replacing any session bound to another event loop."""
+    global _settings, _session, _session_loop
+
+    loop = asyncio.get_running_loop()
+    if settings is not None and settings != _settings:
+        await shutdown()
+        _settings = settings
+
+    if _session is not None and not _session.closed and _session_loop is loop:
+        return _session
+
+    if _session is not None and not _session.closed and _session_loop is not None:
+        # A session can only be used from the loop that created it. The old loop
+        # may already be gone, so drop the reference rather than awaiting close().
+        if not _session_loop.is_closed():
+            stale = _session
+            _session_loop.call_soon_threadsafe(
+                lambda: asyncio.ensure_future(stale.close())
+            )
+
+    _session = _create_session(_settings)
+    _session_loop = loop
+    return _session
+
+
+async def shutdown() -> None:
+    """Close the shared session and release pooled connections."""
+    global _session, _session_loop
+
+    session, _session, _session_loop = _session, None, None
+    if session is not None and not session.closed:
+        await session.close()
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the shared session, starting the pool on first use."""
+    if (
+        _session is not None
+        and not _session.closed
+        and _session_loop is asyncio.get_running_loop()
+    ):
+        return _session
+    return await startup()
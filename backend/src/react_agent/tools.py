@@ -6,22 +6,30 @@ These tools are intended as free examples to get started. For production use,
 consider implementing more robust and specialized tools tailored to your needs.
 """
 import os
-from typing import Any, Callable, List, Optional, cast
+from functools import cache
+from typing import TYPE_CHECKING, Any, Callable, List, Optional
 
-import aiohttp
-import requests
-from exa_py import Exa
-from langchain_community.tools import GooglePlacesTool
-from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import InjectedToolArg, tool
-from tavily import TavilyClient, AsyncTavilyClient
+from langchain_core.tools import InjectedToolArg
 from typing_extensions import Annotated
 
 from react_agent.configuration import Configuration
+from react_agent.http_client import get_session
+
+if TYPE_CHECKING:
+    from tavily import AsyncTavilyClient
 
 # exa = Exa(api_key=os.environ["EXA_API_KEY"])
-client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+
+GOOGLE_PLACES_URL = "https://places.googleapis.com/v1"
+
+
+@cache
+def get_tavily_client() -> "AsyncTavilyClient":
+    """Return the shared Tavily client, importing and creating it on first use."""
+    from tavily import AsyncTavilyClient
+
+    return AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
 
 async def query_google_places(
@@ -68,25 +76,25 @@ async def query_google_places(
     - The search includes detailed attributes for each place, including user ratings, pricing details, 
       website URLs, and more.
     """  # noqa: D202, D212, D401
-    async with aiohttp.ClientSession() as session:
-
-        configuration = Configuration.from_runnable_config(config)
-
-        url = "https://places.googleapis.com/v1/places:searchText"
-        headers = {
-            'X-Goog-Api-Key': configuration.google_places_api_key,
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "X-Goog-FieldMask": "places.attributions,places.id,places.displayName,places.googleMapsLinks,places.formattedAddress,places.businessStatus,places.types,places.location,places.internationalPhoneNumber,places.rating,places.priceLevel,places.priceRange,places.websiteUri,places.userRatingCount,places.websiteUri,places.goodForChildren,places.liveMusic,places.paymentOptions,places.servesBeer,places.servesVegetarianFood,places.reviews"
-        }
-        data = {
-            "textQuery": query,
-            "pageSize": 5
-        }
-
-        async with session.post(url, headers=headers, json=data) as response:
-            response.raise_for_status()
-            return await response.json()         
+    session = await get_session()
+
+    configuration = Configuration.from_runnable_config(config)
+
+    url = f"{GOOGLE_PLACES_URL}/places:searchText"
+    headers = {
+        'X-Goog-Api-Key': configuration.google_places_api_key,
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "X-Goog-FieldMask": "places.attributions,places.id,places.displayName,places.googleMapsLinks,places.formattedAddress,places.businessStatus,places.types,places.location,places.internationalPhoneNumber,places.rating,places.priceLevel,places.priceRange,places.websiteUri,places.userRatingCount,places.websiteUri,places.goodForChildren,places.liveMusic,places.paymentOptions,places.servesBeer,places.servesVegetarianFood,places.reviews"
+    }
+    data = {
+        "textQuery": query,
+        "pageSize": 5
+    }
+
+    async with session.post(url, headers=headers, json=data) as response:
+        response.raise_for_status()
+        return await response.json()         
 
 async def tavily_web_search(
         query: str,
@@ -130,7 +138,7 @@ async def tavily_web_search(
 
     configuration = Configuration.from_runnable_config(config)
 
-    response = await client.search(
+    response = await get_tavily_client().search(
         query=query,
         include_images=True,
         max_results=configuration.max_search_results,
@@ -1,8 +1,13 @@
-from typing import List, Union
+from typing import Any, List, Optional, Union
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from pydantic import BaseModel
 
 
 class ChatInputType(BaseModel):
-    input: List[Union[HumanMessage, AIMessage, SystemMessage]]
\ No newline at end of file
+    input: List[Union[HumanMessage, AIMessage, SystemMessage]]
+
+class ChatStreamRequest(BaseModel):
+    thread_id: str
+    input: List[Union[HumanMessage, AIMessage, SystemMessage]] = []
+    resume: Optional[Any] = None
@@ -0,0 +1,100 @@
+"""Time day clustering and route ordering at 20, 200 and 2,000 places.
+
+The 20-place case uses `our_sample.json`; larger cases scatter synthetic places
+around a few Sri Lankan towns with a fixed seed. For each size the script
+prints the distance-matrix time, the full clustering time, how evenly places
+and estimated cost are spread across days, and the mean within-day spread.
+Route ordering is timed per day on the sample-sized case only, since a real
+day holds a handful of stops rather than hundreds.
+
+Usage:
+    python benchmarks/bench_day_clustering.py --days 7 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from react_agent.planning import (
+    _coordinates,
+    cluster_days,
+    haversine_matrix,
+    order_route,
+)
+from react_agent.projection import project_place
+
+SAMPLE = Path(__file__).resolve().parent.parent / "our_sample.json"
+TOWNS = [(6.93, 79.85), (7.29, 80.63), (6.03, 80.22), (7.96, 80.76), (6.95, 80.79)]
+PRICE_LEVELS = ["inexpensive", "moderate", "expensive", None]
+
+
+def synthetic_places(count: int, seed: int) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    towns = rng.integers(len(TOWNS), size=count)
+    jitter = rng.normal(scale=0.05, size=(count, 2))
+    return [
+        {
+            "id": f"place-{i}",
+            "name": f"Place {i}",
+            "location": {
+                "lat": float(TOWNS[town][0] + jitter[i, 0]),
+                "lng": float(TOWNS[town][1] + jitter[i, 1]),
+            },
+            "price_level": PRICE_LEVELS[i % len(PRICE_LEVELS)],
+        }
+        for i, town in enumerate(towns)
+    ]
+
+
+def main(days: int, repeat: int, seed: int) -> None:
+    cases = {
+        "sample (20)": [project_place(p) for p in json.loads(SAMPLE.read_text())["places"]],
+        "synthetic (200)": synthetic_places(200, seed),
+        "synthetic (2000)": synthetic_places(2000, seed),
+    }
+    print(
+        f"{'places':<18}{'matrix ms':>10}{'cluster ms':>12}"
+        f"{'count min/max':>15}{'cost min/max':>15}{'spread km':>11}"
+    )
+    for label, places in cases.items():
+        lat, lng = _coordinates(places)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            haversine_matrix(lat, lng)
+        matrix_ms = (time.perf_counter() - start) / repeat * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            clusters = cluster_days(places, days)
+        cluster_ms = (time.perf_counter() - start) / repeat * 1000
+
+        counts = [len(c.places) for c in clusters]
+        costs = [c.cost for c in clusters]
+        spread = sum(c.spread_km for c in clusters) / len(clusters)
+        print(
+            f"{label:<18}{matrix_ms:>10.2f}{cluster_ms:>12.2f}"
+            f"{f'{min(counts)}/{max(counts)}':>15}{f'{min(costs):.0f}/{max(costs):.0f}':>15}"
+            f"{spread:>11.1f}"
+        )
+
+    clusters = cluster_days(cases["sample (20)"], days)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        routes = [order_route(c.places) for c in clusters]
+    route_ms = (time.perf_counter() - start) / repeat / len(clusters) * 1000
+    minutes = sum(r.travel_minutes for r in routes) / len(routes)
+    print(f"\nroute ordering: {route_ms:.2f} ms per day, ~{minutes:.0f} travel minutes per day")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.days, args.repeat, args.seed)
@@ -0,0 +1,182 @@
+"""Benchmark itinerary formatting with and without the per-day fan-out.
+
+Runs the compiled graph from the end of research to the approval interrupt
+for trips of several lengths. Each `format_parallelism` setting is timed from
+`format_itinerary` starting to `review_itinerary` starting, so it covers the
+single formatting call, or the `format_days` runs and `merge_itinerary`.
+
+The chat model is simulated. It decodes at a fixed rate per output token
+after a fixed time to first token, which is the part of the latency that the
+fan-out splits between concurrent calls. A range of days is read from the
+`format_days` prompt and only those days are returned.
+
+Usage:
+    python benchmarks/bench_format_fanout.py --days 3 7 14 --parallelism 1 4 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import re
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# `react_agent.graph` the attribute is the compiled graph; we need the module.
+graph_module = importlib.import_module("react_agent.graph")
+
+DAY_RANGE = re.compile(r"Only write days (\d+) to (\d+) of this (\d+)-day trip")
+
+
+def synthetic_days(first: int, last: int) -> list[dict[str, Any]]:
+    """Return days with three attractions and two restaurants each."""
+    return [
+        {
+            "day_number": day,
+            "attractions": [
+                {"name": f"Attraction {day}.{i}", "type": "cultural", "location": "Colombo",
+                 "tips": "Go early to avoid the heat and the queues."}
+                for i in range(3)
+            ],
+            "dining": [
+                {"name": f"Restaurant {day}.{i}", "type": "local cuisine", "location": "Colombo",
+                 "reviews": "Friendly staff and generous rice and curry."}
+                for i in range(2)
+            ],
+            "daily_cost_estimate": 120,
+        }
+        for day in range(first, last + 1)
+    ]
+
+
+class DecodingChatModel(BaseChatModel):
+    """Chat model whose latency grows with the length of its answer."""
+
+    first_token_seconds: float = 0.05
+    seconds_per_token: float = 0.0002
+    trip_days: int = 3
+
+    @property
+    def _llm_type(self) -> str:
+        return "decoding"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _structured(self, name: str, messages: list[BaseMessage]) -> dict[str, Any]:
+        if name != "itinerary_schema":
+            return {"is_satisfactory": True, "feedback": ""}
+        match = DAY_RANGE.search(str(messages[0].content))
+        first, last = (int(match[1]), int(match[2])) if match else (1, self.trip_days)
+        return {
+            "destination": "Colombo",
+            "country": "Sri Lanka",
+            "trip_duration": self.trip_days,
+            "days": synthetic_days(first, last),
+            "general_tips": {"transportation": "Tuk-tuks with meters are cheapest."},
+            "total_estimated_cost": 120 * (last - first + 1),
+        }
+
+    def _generate(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        name = kwargs["tools"][0]["function"]["name"]
+        message = AIMessage(
+            content="",
+            tool_calls=[{"name": name, "args": self._structured(name, messages), "id": f"call_{name}"}],
+        )
+        time.sleep(self.first_token_seconds + count_tokens_approximately([message]) * self.seconds_per_token)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class StageTimer(BaseCallbackHandler):
+    """Record when formatting starts and when the review starts."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self.marks: dict[str, float] = {}
+
+    def on_chain_start(
+        self, serialized: Any, inputs: Any, *, run_id: UUID, metadata: dict | None = None, **kwargs: Any
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node in ("format_itinerary", "review_itinerary") and kwargs.get("name") == node:
+            self.marks.setdefault(node, time.perf_counter())
+
+
+async def format_once(days: int, parallelism: int, cache_path: str) -> float:
+    graph = graph_module.graph
+    timer = StageTimer()
+    config = {
+        "configurable": {
+            "thread_id": f"{days}-{parallelism}-{time.perf_counter_ns()}",
+            "format_parallelism": parallelism,
+            "cache_path": cache_path,
+            "structured_cache": {"*": {"enabled": False}},
+        },
+        "callbacks": [timer],
+    }
+    await graph.aupdate_state(
+        config,
+        {
+            "itinerary_messages": [
+                ("user", f"{days} days in Colombo"),
+                AIMessage(content="<FINAL_OUTPUT>Day by day research notes.</FINAL_OUTPUT>"),
+            ],
+            "user_profile": {"destination": "Colombo", "number_of_days": days, "budget": 120 * days},
+        },
+        as_node="research_itinerary",
+    )
+    await graph.ainvoke(None, config)
+    itinerary = (await graph.aget_state(config)).values["itinerary"]
+    if len(itinerary["days"]) != days:
+        raise RuntimeError(f"expected {days} days, got {len(itinerary['days'])}")
+    return timer.marks["review_itinerary"] - timer.marks["format_itinerary"]
+
+
+def main(
+    days: list[int], parallelism: list[int], runs: int, first_token_ms: float, ms_per_token: float
+) -> dict[tuple[int, int], float]:
+    model = DecodingChatModel(
+        first_token_seconds=first_token_ms / 1000, seconds_per_token=ms_per_token / 1000
+    )
+    graph_module.get_llm = lambda: model
+
+    results: dict[tuple[int, int], float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = str(Path(tmp) / "cache.sqlite")
+        for trip in days:
+            model.trip_days = trip
+            for width in parallelism:
+                times = [asyncio.run(format_once(trip, width, cache_path)) for _ in range(runs)]
+                results[trip, width] = statistics.median(times) * 1000
+
+    print(f"{'days':>5}{'parallelism':>13}{'format ms':>12}{'speedup':>10}")
+    for (trip, width), ms in results.items():
+        baseline = results.get((trip, parallelism[0]), ms)
+        print(f"{trip:>5}{width:>13}{ms:>12.1f}{baseline / ms:>9.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[3, 7, 14])
+    parser.add_argument("--parallelism", type=int, nargs="+", default=[1, 4, 7])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--first-token-ms", type=float, default=50.0)
+    parser.add_argument("--ms-per-token", type=float, default=0.2)
+    args = parser.parse_args()
+    main(args.days, args.parallelism, args.runs, args.first_token_ms, args.ms_per_token)
@@ -0,0 +1,557 @@
+"""End-to-end benchmark of the compiled itinerary graph.
+
+Drives `react_agent.graph` through the full flow - intake (with one
+clarifying interrupt), profile, research with a tool round, formatting,
+review and approval - using a scripted chat model and cassette fallbacks for
+the tools, so it runs offline and is deterministic. Each run reports:
+
+- wall time for the whole conversation,
+- time spent in every graph node (from callback start/end events),
+- time spent in the checkpointer and how many bytes it holds afterwards,
+- the serialized size of the final state,
+- tokens and estimated cost recorded in the state's `usage`,
+- how long after `format_itinerary` starts the first streamed day arrives,
+- peak RSS of the process.
+
+With `--trace PATH` the runs also export spans (see `react_agent.tracing`),
+which shows the tracing overhead and produces a file for
+`python -m react_agent.tracing PATH`. `--structured-cache` enables the
+structured-output response cache, which is off by default so every run
+measures the same model calls. `--research-categories` researches with
+concurrent sub-agents (see `react_agent.research`) instead of one loop.
+`--background-review` shows the itinerary while it is reviewed; compare
+"itinerary shown" with and without it, with `--llm-review always`.
+`--fused-intake` validates the query and extracts the profile in one call.
+
+Results are printed and appended as one JSON line per invocation to
+`--output`, tagged with the git commit, so regressions can be tracked.
+
+Usage:
+    python benchmarks/bench_graph.py --runs 5 --llm-latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.types import Command
+
+from react_agent.cassette import places_fixture, use_cassette
+from react_agent.projection import project_place
+from react_agent.prompts import RESEARCH_CATEGORY_FOCUS
+from react_agent.streaming import DAY_EVENT
+from react_agent.tracing import trace_to
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE = ROOT / "our_sample.json"
+DEFAULT_OUTPUT = ROOT / ".benchmarks" / "graph.jsonl"
+
+# `react_agent.graph` the attribute is the compiled graph; we need the module.
+graph_module = importlib.import_module("react_agent.graph")
+
+OPENING = "Hi! I'd love to visit Colombo."
+STREAM_PIECE_CHARS = 16
+RESUMES = ["3 days, 500 USD, two adults, vegetarian food please.", "Yes, that looks great!"]
+
+
+SCRIPTED_PROFILE = {
+    "destination": "Colombo",
+    "number_of_people": 2,
+    "number_of_adults": 2,
+    "number_of_kids": 0,
+    "number_of_days": 3,
+    "budget": 500,
+    "currency": "USD",
+    "is_vegetarian": True,
+    "preferences": ["food", "culture"],
+}
+
+
+def scripted_itinerary(days: int = 3) -> dict[str, Any]:
+    """Build a plausible itinerary from the sample places."""
+    places = [project_place(p) for p in json.loads(SAMPLE.read_text())["places"]]
+    per_day = max(1, len(places) // days)
+    itinerary_days = []
+    for day in range(days):
+        chunk = places[day * per_day : (day + 1) * per_day]
+        itinerary_days.append(
+            {
+                "day_number": day + 1,
+                "attractions": [
+                    {"name": p["name"], "type": p["type"] or "attraction", "location": p["address"]}
+                    for p in chunk[:3]
+                ],
+                "dining": [
+                    {"name": p["name"], "type": p["type"] or "restaurant", "location": p["address"]}
+                    for p in chunk[3:5]
+                ],
+                "daily_cost_estimate": 120,
+            }
+        )
+    return {
+        "destination": "Colombo",
+        "country": "Sri Lanka",
+        "trip_duration": days,
+        "days": itinerary_days,
+        "total_estimated_cost": 120 * days,
+    }
+
+
+def web_fixture(args: dict[str, Any]) -> dict[str, Any]:
+    """Return a canned Tavily response."""
+    result = {"title": "Colombo guide", "url": "https://example.com", "content": "Galle Face at dusk."}
+    return {"query": args["query"], "results": [result], "images": []}
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that answers every request the graph makes from a fixed script.
+
+    Structured output goes through the default tool-calling implementation, so
+    each schema is recognised by its tool name.
+    """
+
+    latency: float = 0.0
+    calls: dict[str, int] = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _structured(self, name: str, messages: list[BaseMessage]) -> dict[str, Any]:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if name == "validation_schema":
+            if not any(m.type == "human" and "days" in m.content for m in messages):
+                return {"is_valid": False, "response_message": "How many days, and what budget?"}
+            return {"is_valid": True, "response_message": ""}
+        if name in ("user_schema", "profile_update_schema"):
+            return SCRIPTED_PROFILE
+        if name == "intake_schema":
+            if not any(m.type == "human" and "days" in m.content for m in messages):
+                return {
+                    "is_valid": False,
+                    "response_message": "How many days, and what budget?",
+                    "profile": {"destination": "Colombo"},
+                }
+            return {"is_valid": True, "response_message": "", "profile": SCRIPTED_PROFILE}
+        if name == "itinerary_schema":
+            return scripted_itinerary()
+        if name == "itinerary_validation_schema":
+            return {"is_approved": True, "valid_feedback": True, "llm_response": "Thank you!"}
+        return {"is_satisfactory": True, "feedback": ""}
+
+    def _respond(self, messages: list[BaseMessage], **kwargs: Any) -> ChatResult:
+        tools = kwargs.get("tools") or []
+        if tools and kwargs.get("tool_choice"):
+            name = tools[0]["function"]["name"]
+            message = AIMessage(
+                content="",
+                tool_calls=[{"name": name, "args": self._structured(name, messages), "id": f"call_{name}"}],
+            )
+        elif tools and not isinstance(messages[-1], ToolMessage):
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "query_google_places",
+                        "args": {"query": "vegetarian restaurants Colombo"},
+                        "id": "call_places",
+                    },
+                    {
+                        "name": "tavily_web_search",
+                        "args": {"query": "Colombo 3 day itinerary"},
+                        "id": "call_web",
+                    },
+                ],
+            )
+        elif tools:
+            message = AIMessage(content="<FINAL_OUTPUT>Day 1 ... Day 3 ...</FINAL_OUTPUT>")
+        else:
+            message = AIMessage(content="ok")
+        input_tokens = count_tokens_approximately(messages)
+        output_tokens = count_tokens_approximately([message])
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        message.response_metadata = {"model_name": "gpt-4o"}
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return self._respond(messages, **kwargs)
+
+    async def _agenerate(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._respond(messages, **kwargs)
+
+    def _chunks(self, messages: list[BaseMessage], **kwargs: Any) -> list[ChatGenerationChunk]:
+        # Tool-call arguments arrive in small pieces, like a real streaming API.
+        message = self._respond(messages, **kwargs).generations[0].message
+        if not message.tool_calls:
+            return [ChatGenerationChunk(message=AIMessageChunk(**message.model_dump()))]
+        chunks = []
+        for index, call in enumerate(message.tool_calls):
+            args = json.dumps(call["args"])
+            for start in range(0, len(args), STREAM_PIECE_CHARS):
+                first = start == 0
+                piece = {
+                    "name": call["name"] if first else None,
+                    "args": args[start : start + STREAM_PIECE_CHARS],
+                    "id": call["id"] if first else None,
+                    "index": index,
+                }
+                chunks.append(ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[piece])))
+        chunks[-1].message.usage_metadata = message.usage_metadata
+        return chunks
+
+    def _stream(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        chunks = self._chunks(messages, **kwargs)
+        for chunk in chunks:
+            time.sleep(self.latency / len(chunks))
+            yield chunk
+
+    async def _astream(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        chunks = self._chunks(messages, **kwargs)
+        for chunk in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            yield chunk
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Collect start/end times of every graph node run."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self.started: dict[UUID, tuple[str, float]] = {}
+        self.durations: dict[str, list[float]] = defaultdict(list)
+        self.first_start: dict[str, float] = {}
+
+    def on_chain_start(
+        self,
+        serialized: Any,
+        inputs: Any,
+        *,
+        run_id: UUID,
+        metadata: dict | None = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            now = time.perf_counter()
+            self.started[run_id] = (node, now)
+            self.first_start.setdefault(node, now)
+
+    def _finish(self, run_id: UUID) -> None:
+        if run_id in self.started:
+            node, started = self.started.pop(run_id)
+            self.durations[node].append(time.perf_counter() - started)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        # Interrupts surface as errors; the node still ran until that point.
+        self._finish(run_id)
+
+
+class TimedSaver(MemorySaver):
+    """In-memory checkpointer that accounts for the time spent in it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.seconds = 0.0
+        self.calls: dict[str, int] = defaultdict(int)
+
+    def _timed(self, name: str, fn: Any, *args: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.calls[name] += 1
+
+    def put(self, *args: Any) -> Any:
+        return self._timed("put", super().put, *args)
+
+    def put_writes(self, *args: Any) -> Any:
+        return self._timed("put_writes", super().put_writes, *args)
+
+    def get_tuple(self, *args: Any) -> Any:
+        return self._timed("get_tuple", super().get_tuple, *args)
+
+    def stored_bytes(self) -> int:
+        return _bytes_in((self.storage, self.writes, self.blobs))
+
+
+def _bytes_in(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_bytes_in(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_bytes_in(v) for v in value)
+    return 0
+
+
+async def run_once(
+    model: ScriptedChatModel, thread_id: str, configurable: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    saver = TimedSaver()
+    graph = graph_module.graph.builder.compile(checkpointer=saver)
+    timer = NodeTimer()
+    config = {"configurable": {**(configurable or {}), "thread_id": thread_id}, "callbacks": [timer]}
+    resumes = list(RESUMES)
+
+    day_times: list[float] = []
+    shown_times: list[float] = []
+
+    async def run(graph_input: Any) -> None:
+        async for mode, event in graph.astream(graph_input, config, stream_mode=["custom", "updates"]):
+            if mode == "custom" and isinstance(event, dict) and event.get("type") == DAY_EVENT:
+                day_times.append(time.perf_counter())
+            elif mode == "updates" and "__interrupt__" in event and "format_itinerary" in timer.first_start:
+                shown_times.append(time.perf_counter())
+
+    started = time.perf_counter()
+    await run({"itinerary_messages": [("user", OPENING)]})
+    while (await graph.aget_state(config)).next:
+        if not resumes:
+            raise RuntimeError("graph asked for more input than the script provides")
+        await run(Command(resume=resumes.pop(0)))
+    wall = time.perf_counter() - started
+
+    state = await graph.aget_state(config)
+    if not state.values.get("itinerary"):
+        raise RuntimeError("graph finished without an itinerary")
+    _, state_blob = JsonPlusSerializer().dumps_typed(state.values)
+    return {
+        "wall_seconds": wall,
+        "nodes": {node: times for node, times in timer.durations.items()},
+        "checkpoint_seconds": saver.seconds,
+        "checkpoint_calls": dict(saver.calls),
+        "checkpoint_bytes": saver.stored_bytes(),
+        "state_bytes": len(state_blob),
+        "usage": state.values.get("usage") or {},
+        "first_day_seconds": (
+            day_times[0] - timer.first_start["format_itinerary"]
+            if day_times and "format_itinerary" in timer.first_start
+            else None
+        ),
+        "itinerary_shown_seconds": (
+            shown_times[0] - timer.first_start["format_itinerary"] if shown_times else None
+        ),
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    nodes: dict[str, list[float]] = defaultdict(list)
+    for run in runs:
+        for node, times in run["nodes"].items():
+            nodes[node].extend(times)
+    wall = [run["wall_seconds"] for run in runs]
+    checkpoint = [run["checkpoint_seconds"] for run in runs]
+    first_day = [run["first_day_seconds"] for run in runs if run["first_day_seconds"] is not None]
+    shown = [run["itinerary_shown_seconds"] for run in runs if run["itinerary_shown_seconds"] is not None]
+    return {
+        "wall_ms": {
+            "median": statistics.median(wall) * 1000,
+            "min": min(wall) * 1000,
+            "max": max(wall) * 1000,
+        },
+        "nodes": {
+            node: {
+                "calls_per_run": len(times) / len(runs),
+                "mean_ms": statistics.fmean(times) * 1000,
+                "total_ms_per_run": sum(times) / len(runs) * 1000,
+            }
+            for node, times in sorted(nodes.items())
+        },
+        "checkpoint": {
+            "ms_per_run": statistics.fmean(checkpoint) * 1000,
+            "share_of_wall": statistics.fmean(c / w for c, w in zip(checkpoint, wall)),
+            "calls_per_run": runs[-1]["checkpoint_calls"],
+            "bytes": runs[-1]["checkpoint_bytes"],
+        },
+        "first_day_ms": statistics.median(first_day) * 1000 if first_day else None,
+        "itinerary_shown_ms": statistics.median(shown) * 1000 if shown else None,
+        "state_bytes": runs[-1]["state_bytes"],
+        "usage": runs[-1]["usage"],
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    }
+
+
+def main(
+    runs: int,
+    llm_latency: float,
+    output: Path,
+    trace: Path | None = None,
+    structured_cache: bool = False,
+    research_categories: list[str] | None = None,
+    background_review: bool = False,
+    llm_review: str = "when_unsure",
+    fused_intake: bool = False,
+) -> dict[str, Any]:
+    model = ScriptedChatModel(latency=llm_latency)
+    graph_module.get_llm = lambda: model
+    # The real counter needs tiktoken's encoding download; stay offline.
+    graph_module.get_token_counter = lambda: count_tokens_approximately
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Every run replays the same conversation, so cached structured
+        # responses would hide the model calls unless that is what is measured.
+        configurable = {
+            "cache_path": str(Path(tmp) / "cache.sqlite"),
+            "structured_cache": {"*": {"enabled": structured_cache}},
+            "research_categories": research_categories or [],
+            "background_review": background_review,
+            "llm_review": llm_review,
+            "fused_intake": fused_intake,
+        }
+        cassette = use_cassette(Path(tmp) / "unused.json", "replay")
+        cassette.seed("query_google_places", places_fixture(SAMPLE))
+        cassette.seed("tavily_web_search", web_fixture)
+        cassette.seed("lookup_places", lambda args: {"places": [], "unknown_ids": []})
+
+        async def run_all() -> list[dict[str, Any]]:
+            await run_once(model, "warmup", configurable)
+            return [await run_once(model, f"run-{i}", configurable) for i in range(runs)]
+
+        if trace is None:
+            results = asyncio.run(run_all())
+        else:
+            with trace_to(trace):
+                results = asyncio.run(run_all())
+        use_cassette(None)
+
+    report = {
+        "benchmark": "graph",
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "runs": runs,
+        "llm_latency_seconds": llm_latency,
+        "traced": trace is not None,
+        "structured_cache": structured_cache,
+        "research_categories": research_categories or [],
+        "background_review": background_review,
+        "llm_review": llm_review,
+        "fused_intake": fused_intake,
+        **summarize(results),
+    }
+
+    print(f"wall (median)   {report['wall_ms']['median']:8.1f} ms over {runs} runs")
+    for node, stats in report["nodes"].items():
+        print(f"  {node:<22}{stats['total_ms_per_run']:8.1f} ms  ({stats['calls_per_run']:.0f} calls)")
+    checkpoint = report["checkpoint"]
+    print(
+        f"checkpointer    {checkpoint['ms_per_run']:8.1f} ms "
+        f"({checkpoint['share_of_wall']:.1%} of wall), {checkpoint['bytes']} bytes held"
+    )
+    if report["first_day_ms"] is not None:
+        print(f"first day       {report['first_day_ms']:8.1f} ms after format_itinerary starts")
+    if report["itinerary_shown_ms"] is not None:
+        print(f"itinerary shown {report['itinerary_shown_ms']:8.1f} ms after format_itinerary starts")
+    print(f"final state     {report['state_bytes']:8d} bytes")
+    usage = report["usage"]
+    print(
+        f"tokens          {usage.get('input_tokens', 0):8d} in / {usage.get('output_tokens', 0)} out "
+        f"over {usage.get('calls', 0)} calls, ~${usage.get('cost_usd', 0.0):.4f}"
+    )
+    print(f"peak RSS        {report['peak_rss_mb']:8.1f} MB")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("a") as f:
+        f.write(json.dumps(report) + "\n")
+    print(f"appended to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--trace", type=Path, default=None, help="export spans to this JSONL file")
+    parser.add_argument(
+        "--structured-cache", action="store_true", help="cache structured-output responses"
+    )
+    parser.add_argument(
+        "--research-categories",
+        nargs="*",
+        default=None,
+        help="research with one sub-agent per category (default: attractions dining tips)",
+    )
+    parser.add_argument(
+        "--background-review", action="store_true", help="show the itinerary while it is reviewed"
+    )
+    parser.add_argument(
+        "--llm-review", choices=["always", "when_unsure", "never"], default="when_unsure"
+    )
+    parser.add_argument(
+        "--fused-intake", action="store_true", help="validate and extract the profile in one call"
+    )
+    args = parser.parse_args()
+    categories = args.research_categories
+    if categories is not None and not categories:
+        categories = list(RESEARCH_CATEGORY_FOCUS)
+    main(
+        args.runs,
+        args.llm_latency,
+        args.output,
+        args.trace,
+        args.structured_cache,
+        categories,
+        args.background_review,
+        args.llm_review,
+        args.fused_intake,
+    )
@@ -0,0 +1,118 @@
+"""Compare per-call sessions against the shared connection pool.
+
+Starts a local stub of the Places `searchText` endpoint and drives
+`query_google_places` through it twice: once with a brand-new
+`aiohttp.ClientSession` per call (the previous behaviour) and once through the
+pooled client. The stub speaks plain HTTP, so the numbers only include the TCP
+connect and DNS savings; against the real HTTPS endpoints the TLS handshake
+makes the gap larger.
+
+Usage:
+    python benchmarks/bench_http_pool.py --requests 500 --concurrency 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import aiohttp
+from aiohttp import web
+
+from react_agent import http_client, tools
+
+SAMPLE = Path(__file__).resolve().parent.parent / "our_sample.json"
+
+
+def _stub_app(payload: dict, delay: float) -> web.Application:
+    async def search_text(request: web.Request) -> web.Response:
+        await request.read()
+        if delay:
+            await asyncio.sleep(delay)
+        return web.json_response(payload)
+
+    app = web.Application()
+    app.router.add_post("/v1/places:searchText", search_text)
+    return app
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _drive(
+    call: Callable[[str], Awaitable[dict]], requests: int, concurrency: int
+) -> list[float]:
+    latencies: list[float] = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with gate:
+            start = time.perf_counter()
+            await call(f"restaurants in Colombo {i}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies
+
+
+async def main(requests: int, concurrency: int, delay: float) -> None:
+    payload = {"places": json.loads(SAMPLE.read_text())["places"][:5]}
+    runner = web.AppRunner(_stub_app(payload, delay))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    base_url = f"http://127.0.0.1:{port}/v1"
+
+    tools.GOOGLE_PLACES_URL = base_url
+    config = {"configurable": {"google_places_api_key": "stub"}}
+
+    async def fresh_session(query: str) -> dict:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{base_url}/places:searchText",
+                headers={"X-Goog-Api-Key": "stub"},
+                json={"textQuery": query, "pageSize": 5},
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+
+    async def pooled(query: str) -> dict:
+        return await tools.query_google_places(query, config=config)
+
+    try:
+        # Warm up both paths so import and first-connection costs are excluded.
+        await _drive(fresh_session, 10, 1)
+        await _drive(pooled, 10, 1)
+
+        results = {
+            "per_call_session": await _drive(fresh_session, requests, concurrency),
+            "pooled": await _drive(pooled, requests, concurrency),
+        }
+    finally:
+        await http_client.shutdown()
+        await runner.cleanup()
+
+    print(f"{'mode':<18}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for mode, samples in results.items():
+        print(
+            f"{mode:<18}{_percentile(samples, 50):>10.2f}"
+            f"{_percentile(samples, 99):>10.2f}{statistics.fmean(samples):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.0, help="stub server delay (s)")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.delay))
@@ -0,0 +1,72 @@
+"""Measure cold import time of the agent modules and fail on regressions.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+with no API keys in the environment, `--runs` times; the best run is
+reported together with the slowest imports it pulled in. The script exits with
+status 1 when a module exceeds `--max-ms` or imports one of the provider SDKs
+that are meant to load only on first use.
+
+Usage:
+    python benchmarks/bench_import_time.py --max-ms 2500 --runs 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = ["react_agent", "react_agent.tools", "react_agent.graph"]
+DEFERRED = ["openai", "langchain_openai", "tavily", "exa_py", "langchain_community"]
+KEYS = ["OPENAI_API_KEY", "EXA_API_KEY", "TAVILY_API_KEY", "GOOGLE_PLACES_API_KEY"]
+
+
+def import_profile(module: str) -> dict[str, int]:
+    """Return cumulative import time in microseconds for every module loaded."""
+    env = {k: v for k, v in os.environ.items() if k not in KEYS}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def main(max_ms: float, runs: int, top: int) -> int:
+    failed = False
+    for module in MODULES:
+        profiles = [import_profile(module) for _ in range(runs)]
+        best = min(profiles, key=lambda p: p[module])
+        total_ms = best[module] / 1000
+        deferred = [name for name in DEFERRED if name in best]
+        status = "ok"
+        if total_ms > max_ms or deferred:
+            status, failed = "FAIL", True
+        print(f"{module:<22}{total_ms:>9.1f} ms  {status}")
+        if deferred:
+            print(f"  imported eagerly: {', '.join(deferred)}")
+        slowest = sorted(
+            ((ms, name) for name, ms in best.items() if name != module and "." not in name),
+            reverse=True,
+        )[:top]
+        for cumulative, name in slowest:
+            print(f"  {name:<30}{cumulative / 1000:>9.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-ms", type=float, default=2500.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(main(args.max_ms, args.runs, args.top))
@@ -0,0 +1,150 @@
+"""Benchmark intake latency with per-node model routing.
+
+Drives the compiled graph from the user's first message to the start of
+research. That covers `validate_user_query`, and `update_user_profile`
+unless the intake is fused. The setups compared are:
+
+- current: every node on the flagship model, as before routing existed;
+- routed: the defaults in `react_agent.models`, with the small model for
+  the intake check;
+- routed + fused: the same, with `fused_intake`, so the small model also
+  extracts the profile;
+- small model failing: routed, but the small model raises every time, so
+  each call falls back to the flagship model.
+
+The models are simulated: `react_agent.models.chat_model` is replaced so each
+model name maps to a chat model with a time to first token and a decoding
+time per output token. The defaults approximate a flagship and a small
+hosted model; change them with the flags below.
+
+Usage:
+    python benchmarks/bench_model_routing.py --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from react_agent import models
+
+# `react_agent.graph` the attribute is the compiled graph; we need the module.
+graph_module = importlib.import_module("react_agent.graph")
+
+REQUEST = "Plan 3 days in Colombo for 2 adults, budget 500 USD. We love food and culture."
+PROFILE = {
+    "destination": "Colombo", "number_of_people": 2, "number_of_adults": 2, "number_of_days": 3,
+    "budget": 500, "currency": "USD", "preferences": ["food", "culture"],
+}
+
+
+class LatencyModel(BaseChatModel):
+    """Answers the intake requests after a simulated generation time."""
+
+    first_token_seconds: float
+    seconds_per_token: float
+    fail: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "latency"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        if self.fail:
+            raise TimeoutError("model unavailable")
+        name = kwargs["tools"][0]["function"]["name"]
+        args: dict[str, Any] = PROFILE
+        if name == "validation_schema":
+            args = {"is_valid": True, "response_message": ""}
+        elif name == "intake_schema":
+            args = {"is_valid": True, "response_message": "", "profile": PROFILE}
+        message = AIMessage("", tool_calls=[{"name": name, "args": args, "id": f"call_{name}"}])
+        time.sleep(self.first_token_seconds + count_tokens_approximately([message]) * self.seconds_per_token)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+SETUPS: dict[str, dict[str, Any]] = {
+    "current": {"node_models": {"validate_user_query": "openai/gpt-4o", "validate_itinerary": "openai/gpt-4o"}},
+    "routed": {},
+    "routed + fused": {"fused_intake": True},
+    "small model failing": {},
+}
+
+
+def intake_once(setup: str, cache_path: str) -> float:
+    config = {
+        "configurable": {
+            "thread_id": f"{setup}-{time.perf_counter_ns()}",
+            "cache_path": cache_path,
+            "structured_cache": {"*": {"enabled": False}},
+            **SETUPS[setup],
+        }
+    }
+    start = time.perf_counter()
+    graph_module.graph.invoke(
+        {"itinerary_messages": [HumanMessage(REQUEST)]},
+        config,
+        interrupt_before=["research_itinerary", "research_category"],
+    )
+    elapsed = time.perf_counter() - start
+    if graph_module.graph.get_state(config).values["user_profile"]["destination"] != "Colombo":
+        raise RuntimeError(f"{setup}: the profile was not extracted")
+    return elapsed
+
+
+def main(runs: int, flagship: tuple[float, float], small: tuple[float, float]) -> dict[str, float]:
+    instances = {
+        "openai/gpt-4o": LatencyModel(first_token_seconds=flagship[0] / 1000, seconds_per_token=flagship[1] / 1000),
+        "openai/gpt-4o-mini": LatencyModel(first_token_seconds=small[0] / 1000, seconds_per_token=small[1] / 1000),
+    }
+    failing = LatencyModel(first_token_seconds=0, seconds_per_token=0, fail=True)
+    original = models.chat_model
+
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = str(Path(tmp) / "cache.sqlite")
+        try:
+            for setup in SETUPS:
+                broken = {"openai/gpt-4o-mini": failing} if setup == "small model failing" else {}
+                models.chat_model = lambda spec, timeout=None: {**instances, **broken}[spec]
+                times = [intake_once(setup, cache_path) for _ in range(runs)]
+                results[setup] = statistics.median(times) * 1000
+        finally:
+            models.chat_model = original
+
+    baseline = results["current"]
+    print(f"{'setup':<22}{'intake ms':>11}{'vs current':>12}")
+    for setup, ms in results.items():
+        print(f"{setup:<22}{ms:>11.1f}{baseline / ms:>11.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--flagship-first-token-ms", type=float, default=450.0)
+    parser.add_argument("--flagship-ms-per-token", type=float, default=12.0)
+    parser.add_argument("--small-first-token-ms", type=float, default=250.0)
+    parser.add_argument("--small-ms-per-token", type=float, default=5.0)
+    args = parser.parse_args()
+    main(
+        args.runs,
+        (args.flagship_first_token_ms, args.flagship_ms_per_token),
+        (args.small_first_token_ms, args.small_ms_per_token),
+    )
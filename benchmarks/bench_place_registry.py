@@ -0,0 +1,71 @@
+"""Replay a recorded research session through the place registry.
+
+Reads a cassette (see `react_agent.cassette`) and passes every recorded
+`query_google_places` response through a fresh registry, once per simulated
+thread, as the tool does with `dedupe_places` on. Prints the dedupe rate, the
+bytes sent to the model with and without references, and the registry's memory
+footprint.
+
+Record the cassette with `dedupe_places` off, so responses hold full places:
+places the recording already replaced by a reference are skipped and counted.
+The dedupe counts do not depend on the order the responses are replayed in.
+
+Usage:
+    REACT_AGENT_CASSETTE=session.json REACT_AGENT_CASSETTE_MODE=record langgraph dev
+    python benchmarks/bench_place_registry.py session.json --threads 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from react_agent.registry import PlaceRegistry
+
+
+def recorded_pages(path: Path) -> list[list[dict[str, Any]]]:
+    """Return the places of every recorded `query_google_places` response."""
+    entries = json.loads(path.read_text()).get("entries", {})
+    return [
+        entry["response"].get("places") or []
+        for responses in entries.values()
+        for entry in responses
+        if entry.get("name") == "query_google_places"
+    ]
+
+
+def main(cassette: Path, threads: int) -> None:
+    pages = recorded_pages(cassette)
+    full = [[place for place in page if "ref" not in place] for page in pages]
+    skipped = sum(len(page) for page in pages) - sum(len(page) for page in full)
+    if not any(full):
+        raise SystemExit(f"{cassette} has no recorded query_google_places places")
+    registry = PlaceRegistry()
+
+    for thread in range(threads):
+        for page in full:
+            registry.dedupe(page, f"thread-{thread}")
+
+    stats = registry.stats
+    print(f"cassette               {cassette}")
+    print(f"threads x queries      {threads} x {len(full)}")
+    print(f"recorded references    {skipped} (skipped)")
+    print(f"places returned        {stats.places_seen}")
+    print(f"replaced by reference  {stats.references} ({stats.dedupe_rate:.1%})")
+    print(f"bytes without registry {stats.bytes_before}")
+    print(
+        f"bytes with registry    {stats.bytes_after} "
+        f"({1 - stats.bytes_after / stats.bytes_before:.1%} saved)"
+    )
+    print(f"registry places        {len(registry)}")
+    print(f"registry memory        ~{registry.memory_bytes() / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--threads", type=int, default=50)
+    args = parser.parse_args()
+    main(args.cassette, args.threads)
@@ -0,0 +1,52 @@
+"""Measure how much the Places projection shrinks tool output.
+
+Projects `our_sample.json` (20 places) as a whole and as four 5-place pages,
+which is what `query_google_places` returns per call, and prints bytes, tokens
+and projection time for each.
+
+Usage:
+    python benchmarks/bench_places_projection.py --review-snippets 2 --review-chars 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from react_agent.projection import compact_places
+
+SAMPLE = Path(__file__).resolve().parent.parent / "our_sample.json"
+
+
+def main(review_snippets: int, review_chars: int, repeat: int) -> None:
+    payload = json.loads(SAMPLE.read_text())
+    places = payload["places"]
+    cases = {"full sample (20 places)": payload}
+    for page, start in enumerate(range(0, len(places), 5), start=1):
+        cases[f"page {page} (5 places)"] = {"places": places[start : start + 5]}
+
+    print(
+        f"{'payload':<26}{'raw B':>10}{'slim B':>9}{'saved':>8}"
+        f"{'raw tok':>10}{'slim tok':>10}{'ms':>8}"
+    )
+    for label, case in cases.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            _, report = compact_places(case, review_snippets, review_chars)
+        elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+        print(
+            f"{label:<26}{report.raw_bytes:>10}{report.projected_bytes:>9}"
+            f"{report.bytes_saved / report.raw_bytes:>8.1%}"
+            f"{report.raw_tokens:>10}{report.projected_tokens:>10}{elapsed_ms:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--review-snippets", type=int, default=2)
+    parser.add_argument("--review-chars", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.review_snippets, args.review_chars, args.repeat)
@@ -0,0 +1,162 @@
+"""Benchmark `update_user_profile` over many rounds of itinerary feedback.
+
+Drives the compiled graph through one intake extraction and then `--rounds`
+revision rounds. In each round the conversation gains what a real round adds:
+research notes, the "Does this look good" message with the itinerary, the
+user's feedback and the approval check. Only `update_user_profile` runs.
+The graph stops before research.
+
+The chat model is simulated and records the approximate input tokens of
+every profile extraction. With `incremental_profile` the prompt only holds
+the current profile and the new feedback, so it stays flat. With full
+re-extraction it holds every message the user has sent. Both modes have to
+end with the same profile.
+
+Usage:
+    python benchmarks/bench_profile_rounds.py --rounds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import re
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from react_agent.intake import with_defaults
+
+# `react_agent.graph` the attribute is the compiled graph; we need the module.
+graph_module = importlib.import_module("react_agent.graph")
+
+FIRST_REQUEST = "Plan 3 days in Colombo for 2 adults, budget 500 USD. We love food and culture."
+DAYS = re.compile(r"make it (\d+) days")
+
+
+def feedback(round_number: int) -> str:
+    """Return the user's feedback in one revision round; every round changes the trip length."""
+    return (
+        f"Round {round_number}: swap the museum on day 2 for a beach and add a street food tour "
+        f"in the evening. Also make it {3 + round_number % 4} days."
+    )
+
+
+def itinerary_text(days: int) -> str:
+    """Return an itinerary roughly the size of a formatted one."""
+    return json.dumps({
+        "destination": "Colombo",
+        "days": [
+            {"day_number": day, "attractions": [f"Attraction {day}.{i}" for i in range(3)],
+             "dining": [f"Restaurant {day}.{i}" for i in range(2)], "daily_cost_estimate": 120}
+            for day in range(1, days + 1)
+        ],
+    })
+
+
+class ProfileModel(BaseChatModel):
+    """Extracts the trip length from the user's messages and records the prompt size."""
+
+    input_tokens: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "profile"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        name = kwargs["tools"][0]["function"]["name"]
+        self.input_tokens.append(count_tokens_approximately(messages))
+        human = [str(m.content) for m in messages if isinstance(m, HumanMessage)]
+        days = [int(match[1]) for text in human for match in DAYS.finditer(text)]
+        if name == "profile_update_schema":
+            # Only what the new messages say.
+            args: dict[str, Any] = {"number_of_days": days[-1]} if days else {}
+            if any("Colombo" in text for text in human):
+                args.update(destination="Colombo", budget=500, currency="USD", number_of_people=2,
+                            number_of_adults=2, preferences=["food", "culture"], number_of_days=3)
+        else:
+            # Every field, filled with the schema's defaults where the user said nothing.
+            args = with_defaults({
+                "destination": "Colombo", "budget": 500, "currency": "USD", "number_of_people": 2,
+                "number_of_adults": 2, "preferences": ["food", "culture"],
+                "number_of_days": days[-1] if days else 3,
+            })
+        call = {"name": name, "args": args, "id": f"call_{name}"}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage("", tool_calls=[call]))])
+
+
+def run_rounds(rounds: int, incremental: bool, cache_path: str) -> tuple[list[int], dict]:
+    """Return the input tokens of every profile extraction and the final profile."""
+    model = ProfileModel(input_tokens=[])
+    graph_module.get_llm = lambda: model
+    graph = graph_module.graph
+    config = {
+        "configurable": {
+            "thread_id": f"profile-rounds-{incremental}",
+            "incremental_profile": incremental,
+            "cache_path": cache_path,
+            "structured_cache": {"*": {"enabled": False}},
+        }
+    }
+    stop = ["research_itinerary", "research_category"]
+
+    graph.update_state(
+        config,
+        {"itinerary_messages": [HumanMessage(FIRST_REQUEST), AIMessage(json.dumps({"is_valid": True}))]},
+        as_node="validate_user_query",
+    )
+    graph.invoke(None, config, interrupt_before=stop)
+    for round_number in range(1, rounds + 1):
+        days = graph.get_state(config).values["user_profile"]["number_of_days"]
+        graph.update_state(
+            config,
+            {
+                "itinerary_messages": [
+                    AIMessage(f"<FINAL_OUTPUT>{'Research notes for the trip. ' * 60}</FINAL_OUTPUT>"),
+                    AIMessage(f"Does this look good to you? \n\n{itinerary_text(days)}"),
+                    HumanMessage(feedback(round_number)),
+                    AIMessage(json.dumps({"is_approved": False, "valid_feedback": True})),
+                ]
+            },
+            as_node="validate_itinerary",
+        )
+        graph.invoke(None, config, interrupt_before=stop)
+    return model.input_tokens, graph.get_state(config).values["user_profile"]
+
+
+def main(rounds: int) -> dict[str, list[int]]:
+    results: dict[str, list[int]] = {}
+    profiles = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = str(Path(tmp) / "cache.sqlite")
+        for label, incremental in (("full", False), ("incremental", True)):
+            results[label], profiles[label] = run_rounds(rounds, incremental, cache_path)
+
+    shown = sorted({0, 1, rounds // 4, rounds // 2, 3 * rounds // 4, rounds})
+    print(f"{'round':>6}{'full tokens':>14}{'incremental':>14}")
+    for index in shown:
+        print(f"{index:>6}{results['full'][index]:>14}{results['incremental'][index]:>14}")
+    print(f"{'total':>6}{sum(results['full']):>14}{sum(results['incremental']):>14}")
+    for label, tokens in results.items():
+        print(f"{label:<12} round {rounds} / round 1 prompt size: {tokens[rounds] / tokens[1]:.2f}x")
+    print(f"final profiles match: {profiles['full'] == profiles['incremental']}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    main(args.rounds)
@@ -0,0 +1,83 @@
+"""Report how much of each node's system prompt a provider can cache.
+
+Renders every node's system prompt for two different users (profile,
+itinerary, feedback and date all differ) and measures the prefix the two
+share. That prefix is what a provider-side prompt cache can reuse across
+users and across `research_itinerary` loop iterations. OpenAI only caches
+prompts of at least 1024 tokens, in 128-token steps; the last column applies
+that rule to the shared prefix alone.
+
+Usage:
+    python benchmarks/bench_prompt_prefix.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+
+from react_agent.state import State
+from react_agent.utils import estimate_tokens
+
+# `react_agent.graph` the attribute is the compiled graph; we need the module.
+graph_module = importlib.import_module("react_agent.graph")
+
+MIN_CACHED_TOKENS = 1024
+CACHE_STEP_TOKENS = 128
+
+
+def sample_states() -> tuple[State, State]:
+    """Return two states for different users at different points of a conversation."""
+    first = State(
+        itinerary_messages=[],
+        hotel_messages=[],
+        user_profile={"destination": "Colombo", "number_of_days": 3, "budget": 500},
+    )
+    second = State(
+        itinerary_messages=[],
+        hotel_messages=[],
+        user_profile={"destination": "Kandy", "number_of_days": 5, "is_vegetarian": True},
+        itinerary={"days": [{"day_number": 1, "attractions": [{"name": "Temple of the Tooth"}]}]},
+        itinerary_feedback="Add more time at the botanical gardens.",
+    )
+    return first, second
+
+
+def cacheable_tokens(prefix_tokens: int) -> int:
+    """Apply the provider's minimum length and step size to a shared prefix."""
+    if prefix_tokens < MIN_CACHED_TOKENS:
+        return 0
+    return prefix_tokens - prefix_tokens % CACHE_STEP_TOKENS
+
+
+def report() -> dict[str, dict[str, int]]:
+    """Return prompt and shared-prefix sizes per node."""
+    first, second = sample_states()
+    rows = {}
+    for node, build in graph_module.NODE_PROMPTS.items():
+        a, b = build(first), build(second)
+        prefix = os.path.commonprefix([a, b])
+        rows[node] = {
+            "prompt_bytes": len(a.encode()),
+            "prefix_bytes": len(prefix.encode()),
+            "prompt_tokens": estimate_tokens(a),
+            "prefix_tokens": estimate_tokens(prefix),
+            "cacheable_tokens": cacheable_tokens(estimate_tokens(prefix)),
+        }
+    return rows
+
+
+def main() -> None:
+    print(f"{'node':<22}{'prompt':>10}{'prefix':>10}{'share':>8}{'cacheable':>12}  (tokens)")
+    for node, row in report().items():
+        share = row["prefix_tokens"] / row["prompt_tokens"]
+        print(
+            f"{node:<22}{row['prompt_tokens']:>10}{row['prefix_tokens']:>10}"
+            f"{share:>8.0%}{row['cacheable_tokens']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+    main()
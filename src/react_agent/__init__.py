@@ -5,5 +5,6 @@ It invokes tools in a simple loop.
 """
 
 from react_agent.graph import graph
+from react_agent.http_client import shutdown, startup
 
-__all__ = ["graph"]
+__all__ = ["graph", "shutdown", "startup"]
@@ -0,0 +1,266 @@
+"""Per-thread token and cost accounting carried in graph state.
+
+`research_itinerary` can go round the `tools` loop many times, re-sending the
+trimmed history on every round, so a single conversation can use far more
+tokens than its final output suggests. Nodes wrapped with `metered` collect
+the usage reported by every chat model call they make and add it to
+`State.usage`, whose reducer (`merge_usage`) keeps running totals for the
+thread and per node:
+
+    {"input_tokens": ..., "output_tokens": ..., "cached_tokens": ...,
+     "calls": ..., "cost_usd": ..., "nodes": {"research_itinerary": {...}}}
+
+Costs are estimates from per-million-token prices (`DEFAULT_PRICES`, overridable
+with the `token_prices` configuration field). Interrupt payloads built with
+`with_usage` include the totals so far, so a client can see what a
+conversation has cost before it answers.
+
+LangGraph drops a node's state updates when it is interrupted, and the node
+runs again on resume, often answering its earlier calls from the structured
+output cache. So the usage of calls made before an interrupt is held, keyed by
+thread and task, and added to the node's usage when that task resumes. This
+hold is process-local, like the other per-thread memos.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import replace
+from typing import Any, Callable, Optional, TypeVar
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import ensure_config
+from langchain_core.tracers.context import register_configure_hook
+from langgraph.errors import GraphInterrupt
+from langgraph.types import Command
+
+from react_agent.configuration import Configuration
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+COUNTERS = ("input_tokens", "output_tokens", "cached_tokens", "calls")
+
+# USD per million tokens.
+DEFAULT_PRICES: dict[str, dict[str, float]] = {
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+    "gpt-4.1": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+}
+
+
+def price_for(
+    model: Optional[str], overrides: Optional[dict[str, dict[str, float]]] = None
+) -> Optional[dict[str, float]]:
+    """Return the prices of `model`, matching dated snapshots by their longest prefix."""
+    if not model:
+        return None
+    prices = {**DEFAULT_PRICES, **(overrides or {})}
+    model = model.split("/")[-1]
+    matches = [name for name in prices if model.startswith(name)]
+    return prices[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(
+    model: Optional[str],
+    input_tokens: int,
+    output_tokens: int,
+    cached_tokens: int = 0,
+    overrides: Optional[dict[str, dict[str, float]]] = None,
+) -> float:
+    """Return the estimated USD cost of one call, or 0.0 for models without a price."""
+    prices = price_for(model, overrides)
+    if prices is None:
+        return 0.0
+    uncached = max(0, input_tokens - cached_tokens)
+    cost = (
+        uncached * prices["input"]
+        + cached_tokens * prices.get("cached_input", prices["input"])
+        + output_tokens * prices["output"]
+    )
+    return cost / 1_000_000
+
+
+def empty_usage() -> dict[str, Any]:
+    """Return zeroed counters."""
+    return {**{key: 0 for key in COUNTERS}, "cost_usd": 0.0}
+
+
+def _add(left: dict[str, Any], right: dict[str, Any]) -> dict[str, Any]:
+    merged = empty_usage()
+    for key in COUNTERS:
+        merged[key] = left.get(key, 0) + right.get(key, 0)
+    merged["cost_usd"] = round(left.get("cost_usd", 0.0) + right.get("cost_usd", 0.0), 6)
+    return merged
+
+
+def merge_usage(left: Optional[dict[str, Any]], right: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """Reducer for `State.usage`: add thread totals and per-node totals."""
+    left, right = left or {}, right or {}
+    if not right:
+        return left
+    merged = _add(left, right)
+    nodes = dict(left.get("nodes") or {})
+    for node, counters in (right.get("nodes") or {}).items():
+        nodes[node] = _add(nodes.get(node) or {}, counters)
+    merged["nodes"] = nodes
+    return merged
+
+
+class UsageCallback(BaseCallbackHandler):
+    """Callback handler that adds up the usage reported by chat model calls."""
+
+    run_inline = True
+
+    def __init__(self, prices: Optional[dict[str, dict[str, float]]] = None) -> None:
+        """Price calls with `prices` on top of `DEFAULT_PRICES`."""
+        self.prices = prices
+        self.usage = empty_usage()
+        self._models: dict[UUID, str] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Remember which model a run uses, for pricing."""
+        model = (metadata or {}).get("ls_model_name")
+        if model:
+            self._models[run_id] = model
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """Add the usage of a finished call."""
+        model = self._models.pop(run_id, None) or (response.llm_output or {}).get("model_name")
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                model = (getattr(message, "response_metadata", None) or {}).get("model_name") or model
+                input_tokens = usage.get("input_tokens", 0)
+                output_tokens = usage.get("output_tokens", 0)
+                cached = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+                cost = estimate_cost(model, input_tokens, output_tokens, cached, self.prices)
+                with self._lock:
+                    self.usage = _add(
+                        self.usage,
+                        {
+                            "input_tokens": input_tokens,
+                            "output_tokens": output_tokens,
+                            "cached_tokens": cached,
+                            "calls": 1,
+                            "cost_usd": cost,
+                        },
+                    )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Forget a failed call."""
+        self._models.pop(run_id, None)
+
+
+_meter: ContextVar[Optional[UsageCallback]] = ContextVar("react_agent_usage_meter", default=None)
+
+register_configure_hook(_meter, True)
+
+# Usage of interrupted tasks, keyed by (thread_id, checkpoint_ns), until they resume.
+_interrupted: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+_interrupted_lock = threading.Lock()
+MAX_INTERRUPTED_TASKS = 1024
+
+
+def node_usage(node: str, usage: dict[str, Any]) -> dict[str, Any]:
+    """Return a `State.usage` update attributing `usage` to `node`."""
+    return {**usage, "nodes": {node: dict(usage)}}
+
+
+def with_usage(state: Any, payload: dict[str, Any]) -> dict[str, Any]:
+    """Add the thread's usage so far, including the running node's calls, to `payload`."""
+    usage = (state.get("usage") if isinstance(state, dict) else getattr(state, "usage", None)) or {}
+    meter = _meter.get()
+    if meter is not None:
+        usage = merge_usage(usage, meter.usage)
+    return {**payload, "usage": usage or empty_usage()}
+
+
+def _task_key() -> Optional[tuple[str, str]]:
+    configurable = ensure_config().get("configurable") or {}
+    thread_id, namespace = configurable.get("thread_id"), configurable.get("checkpoint_ns")
+    return (str(thread_id), str(namespace)) if thread_id is not None and namespace else None
+
+
+def _hold(key: Optional[tuple[str, str]], meter: UsageCallback) -> None:
+    if key is None or not meter.usage["calls"]:
+        return
+    with _interrupted_lock:
+        _interrupted[key] = meter.usage
+        _interrupted.move_to_end(key)
+        while len(_interrupted) > MAX_INTERRUPTED_TASKS:
+            _interrupted.popitem(last=False)
+
+
+def _attach(node: str, result: Any, meter: UsageCallback) -> Any:
+    if not meter.usage["calls"]:
+        return result
+    update = {"usage": node_usage(node, meter.usage)}
+    if isinstance(result, Command):
+        current = result.update if isinstance(result.update, dict) else {}
+        return replace(result, update={**current, **update})
+    if isinstance(result, dict):
+        return {**result, **update}
+    return result
+
+
+def metered(func: F) -> F:
+    """Record the model usage of a graph node in `State.usage`.
+
+    Calls made before the node is interrupted are recorded when it resumes.
+    """
+    node = func.__name__
+
+    def start() -> tuple[UsageCallback, Any, Optional[tuple[str, str]]]:
+        meter = UsageCallback(Configuration.from_runnable_config().token_prices)
+        key = _task_key()
+        if key is not None:
+            with _interrupted_lock:
+                meter.usage = _interrupted.pop(key, meter.usage)
+        return meter, _meter.set(meter), key
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            meter, token, key = start()
+            try:
+                result = await func(*args, **kwargs)
+            except GraphInterrupt:
+                _hold(key, meter)
+                raise
+            finally:
+                _meter.reset(token)
+            return _attach(node, result, meter)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        meter, token, key = start()
+        try:
+            result = func(*args, **kwargs)
+        except GraphInterrupt:
+            _hold(key, meter)
+            raise
+        finally:
+            _meter.reset(token)
+        return _attach(node, result, meter)
+
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,204 @@
+"""Two-tier TTL cache shared by upstream tools.
+
+The first tier is an in-process LRU that answers repeat lookups without leaving
+the interpreter. The second tier is a SQLite file so results survive restarts
+and are shared between worker processes on the same host. Every entry carries
+its own expiry per tier, so callers can pick TTLs per request from
+`Configuration`.
+
+Values must be JSON serializable; they are stored as JSON text on disk.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+_PUNCTUATION = re.compile(r"[,.;:!?\"'`]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a free-text query so trivially different spellings share a key."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", query)).strip().casefold()
+
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a single cache."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+
+    @property
+    def hits(self) -> int:
+        """Total hits across both tiers."""
+        return self.memory_hits + self.disk_hits
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters as a plain dict."""
+        return {**asdict(self), "hits": self.hits}
+
+
+class TieredCache:
+    """An LRU memory tier in front of an optional SQLite tier."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        disk_path: Optional[str] = None,
+    ) -> None:
+        """Create a cache namespace, opening the SQLite file if a path is given."""
+        self.name = name
+        self.max_entries = max_entries
+        self.disk_path = disk_path or None
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if self.disk_path:
+            directory = os.path.dirname(self.disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " value TEXT NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value or None when absent or expired.
+
+        `ttl` is the memory-tier lifetime applied when a disk hit is promoted.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, value FROM cache_entries"
+                    " WHERE namespace = ? AND key = ?",
+                    (self.name, key),
+                ).fetchone()
+                if row is not None:
+                    expires_at, raw = row
+                    if expires_at > now:
+                        value = json.loads(raw)
+                        memory_expiry = min(expires_at, now + ttl) if ttl else expires_at
+                        self._remember(key, memory_expiry, value)
+                        self.stats.disk_hits += 1
+                        return value
+                    self._db.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                        (self.name, key),
+                    )
+                    self._db.commit()
+
+            self.stats.misses += 1
+            return None
+
+    def set(
+        self, key: str, value: Any, ttl: float, disk_ttl: Optional[float] = None
+    ) -> None:
+        """Store a value for `ttl` seconds in memory and `disk_ttl` seconds on disk."""
+        now = time.time()
+        with self._lock:
+            if ttl > 0:
+                self._remember(key, now + ttl, value)
+            if self._db is not None and disk_ttl and disk_ttl > 0:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache_entries"
+                    " (namespace, key, expires_at, value) VALUES (?, ?, ?, ?)",
+                    (self.name, key, now + disk_ttl, json.dumps(value)),
+                )
+                self._db.commit()
+            self.stats.writes += 1
+
+    def clear(self) -> None:
+        """Drop every entry in this namespace from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ?", (self.name,)
+                )
+                self._db.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired disk entries and return how many were removed."""
+        if self._db is None:
+            return 0
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+                (self.name, time.time()),
+            )
+            self._db.commit()
+            return cursor.rowcount
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+_caches: dict[tuple[str, Optional[str], int], TieredCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(
+    name: str, disk_path: Optional[str] = None, max_entries: int = 1024
+) -> TieredCache:
+    """Return the process-wide cache for `name`, creating it on first use.
+
+    Callers asking for a different `max_entries` get their own memory tier,
+    sharing the disk tier.
+    """
+    key = (name, disk_path or None, max_entries)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = TieredCache(name, max_entries, disk_path)
+        return cache
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Return hit/miss counters for every cache created in this process."""
+    totals: dict[str, dict[str, int]] = {}
+    for (name, _, _), cache in list(_caches.items()):
+        current = totals.setdefault(name, CacheStats().as_dict())
+        for counter, value in cache.stats.as_dict().items():
+            current[counter] += value
+    return totals
@@ -0,0 +1,404 @@
+"""Record and replay chat model and tool calls.
+
+Running the graph for real means live OpenAI, Tavily and Places requests:
+results are noisy, cost money and need network access. A cassette records
+each request and its response to a JSON file once, then answers the same
+requests from that file, offline and deterministically.
+
+- `CassetteChatModel` wraps the chat model from `graph.get_llm()`. Tool binding
+  and structured output are delegated to the wrapped model, so the requests it
+  would send are exactly the ones recorded.
+- `cassette_tool` wraps a tool function; `tools.TOOLS` is built from wrapped
+  tools, which call straight through while no cassette is active.
+
+Requests are keyed by their content with message ids, usage metadata and ISO
+dates removed, so a cassette recorded on one day still replays on the next. A
+request seen several times replays its responses in recorded order.
+
+Cassettes are enabled with `use_cassette(...)` or, for `langgraph dev` and
+`app.py`, with the environment variables `REACT_AGENT_CASSETTE` (file path),
+`REACT_AGENT_CASSETTE_MODE` (`replay`, `record` or `auto`) and
+`REACT_AGENT_CASSETTE_LATENCY` (see `LatencyModel.parse`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import itertools
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence, Union
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import (
+    Runnable,
+    RunnableBinding,
+    RunnableParallel,
+    RunnableSequence,
+)
+from langchain_core.tools import InjectedToolArg
+
+from react_agent.cache import make_key
+from react_agent.projection import compact_places
+
+MODES = ("replay", "record", "auto")
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode for a request the cassette has no response for."""
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """How long a replayed response takes to arrive.
+
+    Kinds:
+        none: respond immediately.
+        recorded: wait as long as the original call took, times `scale`.
+        fixed: wait `seconds`.
+        lognormal: wait a log-normal sample with median `seconds` and shape `sigma`.
+    """
+
+    kind: str = "none"
+    seconds: float = 0.0
+    sigma: float = 0.5
+    scale: float = 1.0
+    seed: int = 0
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> LatencyModel:
+        """Parse `none`, `recorded[:SCALE]`, `fixed:SECONDS` or `lognormal:MEDIAN,SIGMA`."""
+        if not spec:
+            return cls()
+        kind, _, args = spec.partition(":")
+        values = [float(v) for v in args.split(",") if v]
+        if kind == "recorded":
+            return cls("recorded", scale=values[0] if values else 1.0)
+        if kind == "fixed":
+            return cls("fixed", seconds=values[0])
+        if kind == "lognormal":
+            sigma = values[1] if len(values) > 1 else 0.5
+            return cls("lognormal", seconds=values[0], sigma=sigma)
+        if kind == "none":
+            return cls()
+        raise ValueError(f"unknown latency model {spec!r}")
+
+    def sampler(self) -> Callable[[float], float]:
+        """Return a seeded function mapping a recorded latency to a delay."""
+        rng = random.Random(self.seed)
+        if self.kind == "recorded":
+            return lambda recorded: recorded * self.scale
+        if self.kind == "fixed":
+            return lambda recorded: self.seconds
+        if self.kind == "lognormal":
+            mu = math.log(max(self.seconds, 1e-6))
+            return lambda recorded: rng.lognormvariate(mu, self.sigma)
+        return lambda recorded: 0.0
+
+
+def _scrub(value: Any) -> Any:
+    if isinstance(value, str):
+        return _ISO_DATE.sub("<date>", value)
+    if isinstance(value, dict):
+        return {k: _scrub(v) for k, v in value.items() if k not in _VOLATILE_MESSAGE_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [_scrub(v) for v in value]
+    return value
+
+
+def request_key(kind: str, name: str, payload: Any) -> str:
+    """Return the cassette key for a request, ignoring ids, usage data and dates."""
+    return make_key(kind, name, _scrub(json.loads(json.dumps(payload, default=str))))
+
+
+class Cassette:
+    """A file of recorded responses keyed by request."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        mode: str = "replay",
+        latency: Optional[LatencyModel] = None,
+    ) -> None:
+        """Open `path` in `mode`; record mode starts from an empty cassette."""
+        if mode not in MODES:
+            raise ValueError(f"cassette mode must be one of {MODES}, got {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency or LatencyModel()
+        self._delay = self.latency.sampler()
+        self._entries: dict[str, list[dict[str, Any]]] = {}
+        self._cursor: dict[str, int] = {}
+        self._fallbacks: dict[str, Callable[[dict[str, Any]], Any]] = {}
+        self._lock = threading.Lock()
+        if mode != "record" and self.path.exists():
+            self._entries = json.loads(self.path.read_text()).get("entries", {})
+
+    def __len__(self) -> int:
+        """Return the number of recorded responses."""
+        return sum(len(responses) for responses in self._entries.values())
+
+    def seed(self, name: str, fallback: Callable[[dict[str, Any]], Any]) -> None:
+        """Answer unrecorded calls to tool `name` with `fallback(args)` when replaying."""
+        self._fallbacks[name] = fallback
+
+    def lookup(self, key: str) -> Optional[dict[str, Any]]:
+        """Return the next recorded entry for `key`, repeating the last one when exhausted."""
+        with self._lock:
+            responses = self._entries.get(key)
+            if not responses:
+                return None
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            return responses[min(index, len(responses) - 1)]
+
+    def record(self, key: str, name: str, response: Any, latency: float) -> None:
+        """Store a response and write the cassette file."""
+        with self._lock:
+            self._entries.setdefault(key, []).append(
+                {"name": name, "latency": round(latency, 4), "response": response}
+            )
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({"version": 1, "entries": self._entries}, indent=1))
+
+    def delay(self, entry: dict[str, Any]) -> float:
+        """Return the simulated latency for replaying `entry`."""
+        return max(0.0, self._delay(entry.get("latency", 0.0)))
+
+    def fallback(self, name: str, args: dict[str, Any]) -> Any:
+        """Return the seeded response for tool `name`, or raise `CassetteMiss`."""
+        if name not in self._fallbacks:
+            raise CassetteMiss(f"no recorded response for {name}({args}) in {self.path}")
+        return self._fallbacks[name](args)
+
+
+_active: Optional[Cassette] = None
+_env_loaded = False
+
+
+def use_cassette(
+    path: Union[str, Path, None],
+    mode: str = "replay",
+    latency: Optional[LatencyModel] = None,
+) -> Optional[Cassette]:
+    """Activate a process-wide cassette, or deactivate with `path=None`.
+
+    Chat models are cached, so call `models.chat_model.cache_clear()` after
+    switching if the graph has already run.
+    """
+    global _active, _env_loaded
+    _env_loaded = True
+    _active = Cassette(path, mode, latency) if path is not None else None
+    return _active
+
+
+def active_cassette() -> Optional[Cassette]:
+    """Return the active cassette, reading the environment on first use."""
+    global _env_loaded
+    if not _env_loaded:
+        _env_loaded = True
+        path = os.getenv("REACT_AGENT_CASSETTE")
+        if path:
+            use_cassette(
+                path,
+                os.getenv("REACT_AGENT_CASSETTE_MODE", "replay"),
+                LatencyModel.parse(os.getenv("REACT_AGENT_CASSETTE_LATENCY")),
+            )
+    return _active
+
+
+def replay_model_kwargs() -> dict[str, Any]:
+    """Return extra chat model arguments needed to build the model for replay.
+
+    A replaying model is never called, but building it still requires an API key.
+    """
+    cassette = active_cassette()
+    if cassette is not None and cassette.mode == "replay" and not os.getenv("OPENAI_API_KEY"):
+        return {"api_key": "cassette-replay"}
+    return {}
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model that records or replays another chat model's responses."""
+
+    inner: BaseChatModel
+    cassette: Cassette
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cassette-{self.inner._llm_type}"
+
+    def _key(self, messages: list[BaseMessage], stop: Optional[list[str]], kwargs: dict[str, Any]) -> str:
+        payload = {
+            "model": self.inner._identifying_params,
+            "messages": messages_to_dict(messages),
+            "stop": stop,
+            "kwargs": kwargs,
+        }
+        return request_key("llm", self.inner._llm_type, payload)
+
+    @staticmethod
+    def _to_entry(result: ChatResult) -> dict[str, Any]:
+        return {
+            "messages": messages_to_dict([g.message for g in result.generations]),
+            "llm_output": result.llm_output,
+        }
+
+    @staticmethod
+    def _from_entry(response: dict[str, Any]) -> ChatResult:
+        return ChatResult(
+            generations=[
+                ChatGeneration(message=message)
+                for message in messages_from_dict(response["messages"])
+            ],
+            llm_output=response.get("llm_output"),
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        if self.cassette.mode != "record" and (entry := self.cassette.lookup(key)):
+            time.sleep(self.cassette.delay(entry))
+            return self._from_entry(entry["response"])
+        if self.cassette.mode == "replay":
+            raise CassetteMiss(f"no recorded chat response in {self.cassette.path}")
+        started = time.monotonic()
+        result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        self.cassette.record(key, "llm", self._to_entry(result), time.monotonic() - started)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        if self.cassette.mode != "record" and (entry := self.cassette.lookup(key)):
+            await asyncio.sleep(self.cassette.delay(entry))
+            return self._from_entry(entry["response"])
+        if self.cassette.mode == "replay":
+            raise CassetteMiss(f"no recorded chat response in {self.cassette.path}")
+        started = time.monotonic()
+        result = await self.inner._agenerate(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+        self.cassette.record(key, "llm", self._to_entry(result), time.monotonic() - started)
+        return result
+
+    def _rebind(self, runnable: Runnable[Any, Any]) -> Runnable[Any, Any]:
+        # Point every binding of the wrapped model at this wrapper instead.
+        if isinstance(runnable, RunnableBinding) and runnable.bound is self.inner:
+            return self.bind(**runnable.kwargs)
+        if isinstance(runnable, RunnableSequence):
+            return RunnableSequence(*(self._rebind(step) for step in runnable.steps))
+        if isinstance(runnable, RunnableParallel):
+            return RunnableParallel({k: self._rebind(v) for k, v in runnable.steps__.items()})
+        return runnable
+
+    def bind_tools(
+        self, tools: Sequence[Any], **kwargs: Any
+    ) -> Runnable[LanguageModelInput, BaseMessage]:
+        """Bind tools the way the wrapped model would."""
+        return self._rebind(self.inner.bind_tools(tools, **kwargs))
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Runnable[Any, Any]:
+        """Request structured output the way the wrapped model would."""
+        return self._rebind(self.inner.with_structured_output(schema, **kwargs))
+
+
+def wrap_chat_model(model: BaseChatModel) -> BaseChatModel:
+    """Wrap `model` with the active cassette, if there is one."""
+    cassette = active_cassette()
+    return CassetteChatModel(inner=model, cassette=cassette) if cassette else model
+
+
+def _tool_args(
+    signature: inspect.Signature, args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> dict[str, Any]:
+    bound = signature.bind_partial(*args, **kwargs)
+    return {
+        name: value
+        for name, value in bound.arguments.items()
+        if not any(
+            m is InjectedToolArg or isinstance(m, InjectedToolArg)
+            for m in getattr(signature.parameters[name].annotation, "__metadata__", ())
+        )
+    }
+
+
+def cassette_tool(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a tool function so the active cassette records or replays its results."""
+    signature = inspect.signature(fn)
+    name = fn.__name__
+
+    async def call(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+        result = fn(*args, **kwargs)
+        return await result if inspect.isawaitable(result) else result
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        cassette = active_cassette()
+        if cassette is None:
+            return await call(args, kwargs)
+
+        tool_args = _tool_args(signature, args, kwargs)
+        key = request_key("tool", name, tool_args)
+        if cassette.mode != "record" and (entry := cassette.lookup(key)):
+            await asyncio.sleep(cassette.delay(entry))
+            return entry["response"]
+        if cassette.mode == "replay":
+            return cassette.fallback(name, tool_args)
+        started = time.monotonic()
+        result = await call(args, kwargs)
+        cassette.record(key, name, result, time.monotonic() - started)
+        return result
+
+    return wrapper
+
+
+def places_fixture(
+    path: Union[str, Path], page_size: int = 5
+) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """Return a replay fallback serving a saved Places response page by page.
+
+    `our_sample.json` is a raw `places:searchText` response; each unrecorded
+    `query_google_places` call gets its next `page_size` places, projected as the
+    tool would, cycling back to the start when the sample runs out.
+    """
+    places = json.loads(Path(path).read_text())["places"]
+    pages: Iterator[int] = itertools.cycle(range(0, len(places), page_size))
+    lock = threading.Lock()
+
+    def fallback(args: dict[str, Any]) -> dict[str, Any]:
+        with lock:
+            start = next(pages)
+        projected, _ = compact_places({"places": places[start : start + page_size]})
+        return projected
+
+    return fallback
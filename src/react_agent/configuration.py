@@ -3,7 +3,7 @@
 from __future__ import annotations
 import os
 from dataclasses import dataclass, field, fields
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
 
 from langchain_core.runnables import RunnableConfig, ensure_config
 
@@ -18,12 +18,34 @@ class Configuration:
     """The configuration for the agent."""
 
     model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = field(
-        default="openai/gpt-4o-mini",
+        default="openai/gpt-4o",
         metadata={
             "description": "The name of the language model to use for the agent's main interactions. "
             "Should be in the form: provider/model-name."
         },
     )
+    node_models: dict[str, str] = field(
+        default_factory=dict,
+        metadata={
+            "description": "Per-node model overrides, keyed by graph node name, in the form "
+            "provider/model-name. validate_user_query and validate_itinerary default to "
+            "openai/gpt-4o-mini; other nodes use `model`."
+        },
+    )
+    model_fallbacks: list[str] = field(
+        default_factory=list,
+        metadata={
+            "description": "Models to try, in order, when a node's model raises an error or times "
+            "out. `model` is always tried last."
+        },
+    )
+    model_timeout: Optional[float] = field(
+        default=None,
+        metadata={
+            "description": "Seconds before a model request times out and the next model in the "
+            "fallback chain is tried. None uses the provider's default."
+        },
+    )
     google_places_api_key: str = field(
         default=GPLACES_API_KEY
     )
@@ -38,6 +60,219 @@ class Configuration:
         },
     )
 
+    places_cache_ttl_seconds: int = field(
+        default=3600,
+        metadata={
+            "description": "How long Google Places results stay in the in-process cache. "
+            "Set to 0 to disable caching."
+        },
+    )
+    places_cache_disk_ttl_seconds: int = field(
+        default=7 * 24 * 3600,
+        metadata={
+            "description": "How long Google Places results stay in the on-disk cache. "
+            "Set to 0 to keep results in memory only."
+        },
+    )
+    places_cache_max_entries: int = field(
+        default=1024,
+        metadata={
+            "description": "Maximum number of Google Places results kept in memory."
+        },
+    )
+    places_projection: bool = field(
+        default=True,
+        metadata={
+            "description": "Reduce Google Places results to the fields the itinerary needs "
+            "before they are added to the message history."
+        },
+    )
+    places_review_snippets: int = field(
+        default=2,
+        metadata={
+            "description": "Number of review snippets kept per place when projecting results."
+        },
+    )
+    places_review_chars: int = field(
+        default=200,
+        metadata={
+            "description": "Maximum characters kept per review snippet when projecting results."
+        },
+    )
+    dedupe_tool_calls: bool = field(
+        default=True,
+        metadata={
+            "description": "Share one upstream request between identical concurrent tool calls "
+            "and reuse results of queries already run in the same thread."
+        },
+    )
+    dedupe_places: bool = field(
+        default=True,
+        metadata={
+            "description": "Replace places already returned earlier in the same thread with "
+            "a short reference (id and name) instead of repeating the full record."
+        },
+    )
+    thread_memo_max_entries: int = field(
+        default=128,
+        metadata={
+            "description": "Maximum number of tool results memoized per conversation thread."
+        },
+    )
+    rate_limits: dict[str, dict[str, Any]] = field(
+        default_factory=dict,
+        metadata={
+            "description": "Per-upstream overrides for the request limiter, keyed by "
+            "'google_places', 'tavily' or 'booking'. Supported keys: rate, burst, "
+            "max_concurrency, min_concurrency, latency_target, max_attempts."
+        },
+    )
+    tool_policies: dict[str, dict[str, Any]] = field(
+        default_factory=dict,
+        metadata={
+            "description": "Per-tool overrides for hedging and retries, keyed by tool name. "
+            "Supported keys: hedge, hedge_percentile, hedge_min_delay, hedge_default_delay, "
+            "max_retries, base_backoff, max_backoff."
+        },
+    )
+    retry_budget_ratio: float = field(
+        default=0.1,
+        metadata={
+            "description": "Extra attempts (retries and hedges) allowed per successful "
+            "upstream call, shared across all tools."
+        },
+    )
+    retry_budget_min_reserve: float = field(
+        default=10.0,
+        metadata={
+            "description": "Extra attempts available before any traffic has earned budget."
+        },
+    )
+    plan_day_clusters: bool = field(
+        default=True,
+        metadata={
+            "description": "Group the places found during research into one geographic "
+            "cluster per trip day before the itinerary is formatted."
+        },
+    )
+    plan_day_routes: bool = field(
+        default=True,
+        metadata={
+            "description": "Order each day's attractions and dining to minimise travel and "
+            "attach estimated travel times between stops."
+        },
+    )
+    stream_itinerary_days: bool = field(
+        default=True,
+        metadata={
+            "description": "Stream the formatted itinerary and write each day to the graph's "
+            "custom stream as soon as the model has finished it."
+        },
+    )
+    fused_intake: bool = field(
+        default=False,
+        metadata={
+            "description": "Validate the query and extract the user profile in one model call "
+            "per intake turn, keeping the partial profile in state between questions."
+        },
+    )
+    incremental_profile: bool = field(
+        default=True,
+        metadata={
+            "description": "Send `update_user_profile` only the user's messages since the last "
+            "extraction and the current profile, instead of every message in the conversation."
+        },
+    )
+    research_categories: list[str] = field(
+        default_factory=list,
+        metadata={
+            "description": "Research these categories (e.g. attractions, dining, tips) with "
+            "concurrent sub-agents instead of one research loop. Empty uses the single loop."
+        },
+    )
+    research_split_cities: bool = field(
+        default=False,
+        metadata={
+            "description": "Also give each city in a multi-city destination its own sub-agents."
+        },
+    )
+    research_tool_rounds: int = field(
+        default=3,
+        metadata={
+            "description": "Maximum tool rounds per research sub-agent before it must answer."
+        },
+    )
+    research_history_tokens: int = field(
+        default=20000,
+        metadata={
+            "description": "Token limit of the message history each research sub-agent sends."
+        },
+    )
+    format_parallelism: int = field(
+        default=1,
+        metadata={
+            "description": "Number of concurrent calls that format the itinerary. Above 1, "
+            "the trip is split into that many ranges of days, formatted in parallel and merged."
+        },
+    )
+    max_review_iterations: int = field(
+        default=1,
+        metadata={
+            "description": "How many times the reviewer may send an itinerary back to research "
+            "before it is shown to the user. 0 disables the review."
+        },
+    )
+    llm_review: str = field(
+        default="when_unsure",
+        metadata={
+            "description": "When the LLM reviewer runs after the deterministic checks: "
+            "'always', 'never', or 'when_unsure' (the checks only raised warnings)."
+        },
+    )
+    background_review: bool = field(
+        default=False,
+        metadata={
+            "description": "Show the formatted itinerary to the user straight away and review it "
+            "concurrently. Problems found are streamed as a notice and added to the user's feedback."
+        },
+    )
+    review_min_attractions: int = field(
+        default=2,
+        metadata={"description": "Fewest attractions a day may have before review asks for more."},
+    )
+    review_min_dining: int = field(
+        default=2,
+        metadata={"description": "Fewest dining options a day may have before review asks for more."},
+    )
+    travel_speed_kmh: float = field(
+        default=25.0,
+        metadata={
+            "description": "Average door-to-door travel speed used for travel time estimates."
+        },
+    )
+    structured_cache: dict[str, dict[str, Any]] = field(
+        default_factory=dict,
+        metadata={
+            "description": "Per-node overrides for caching structured-output model responses, "
+            "keyed by node name or '*' for every node. Supported keys: enabled, ttl_seconds, "
+            "disk_ttl_seconds."
+        },
+    )
+    token_prices: dict[str, dict[str, float]] = field(
+        default_factory=dict,
+        metadata={
+            "description": "Per-model overrides for cost estimates, in USD per million tokens, "
+            "keyed by model name prefix. Supported keys: input, cached_input, output."
+        },
+    )
+    cache_path: str = field(
+        default=os.getenv("REACT_AGENT_CACHE_PATH", ".cache/react_agent.sqlite"),
+        metadata={
+            "description": "SQLite file backing the persistent cache tier. "
+            "Leave empty to disable the disk tier."
+        },
+    )
+
     @classmethod
     def from_runnable_config(
         cls, config: Optional[RunnableConfig] = None
@@ -0,0 +1,176 @@
+"""Coalesce identical tool calls and memoize them per conversation thread.
+
+Two layers sit in front of an upstream request:
+
+1. A per-thread memo: a query the agent already ran earlier in the same thread
+   (including in a previous turn) is answered from memory.
+2. A singleflight group: identical calls that are in flight at the same time,
+   from the same or different threads, share one upstream request. Cancelling
+   the caller that started it only cancels that caller; one of the others
+   takes the request over.
+
+Both layers are process-local. `dedupe_stats()` reports how many upstream calls
+each of them saved.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+
+@dataclass
+class DedupeStats:
+    """Counters for a single tool."""
+
+    calls: int = 0
+    upstream_calls: int = 0
+    coalesced: int = 0
+    memo_hits: int = 0
+
+    @property
+    def saved(self) -> int:
+        """Upstream calls avoided by coalescing and memoization."""
+        return self.coalesced + self.memo_hits
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters as a plain dict."""
+        return {**asdict(self), "saved": self.saved}
+
+
+class SingleFlight:
+    """Share one in-flight awaitable between concurrent callers with the same key."""
+
+    def __init__(self) -> None:
+        """Create an empty group."""
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+
+    def inflight(self, key: str) -> bool:
+        """Return whether a call for `key` is currently running on this loop."""
+        future = self._inflight.get(key)
+        return (
+            future is not None
+            and not future.done()
+            and future.get_loop() is asyncio.get_running_loop()
+        )
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Run `fn` unless a call for `key` is in flight; return (result, shared).
+
+        If the leader is cancelled, its followers are not: the first of them to
+        wake up runs `fn` again and the rest follow that call instead.
+        """
+        while self.inflight(key):
+            leader = self._inflight[key]
+            try:
+                # Shield so a cancelled follower does not cancel the leader's request.
+                return await asyncio.shield(leader), True
+            except asyncio.CancelledError:
+                if not leader.cancelled():
+                    raise
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting on it.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+
+class ThreadMemo:
+    """Bounded per-thread memo of tool results."""
+
+    def __init__(self, max_threads: int = 1024) -> None:
+        """Create a memo that keeps at most `max_threads` threads."""
+        self.max_threads = max_threads
+        self._threads: OrderedDict[str, OrderedDict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id: str, key: str) -> Optional[Any]:
+        """Return the memoized result for `key` in `thread_id`, if any."""
+        with self._lock:
+            entries = self._threads.get(thread_id)
+            if entries is None or key not in entries:
+                return None
+            self._threads.move_to_end(thread_id)
+            entries.move_to_end(key)
+            return entries[key]
+
+    def set(self, thread_id: str, key: str, value: Any, max_entries: int) -> None:
+        """Remember `value` for `key` in `thread_id`."""
+        with self._lock:
+            entries = self._threads.setdefault(thread_id, OrderedDict())
+            self._threads.move_to_end(thread_id)
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+
+    def forget(self, thread_id: str) -> None:
+        """Drop everything memoized for `thread_id`."""
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+
+_flight = SingleFlight()
+_memo = ThreadMemo()
+_stats: dict[str, DedupeStats] = {}
+
+
+async def dedupe(
+    tool: str,
+    key: str,
+    fn: Callable[[], Awaitable[Any]],
+    thread_id: Optional[str] = None,
+    memo_entries: int = 128,
+) -> Any:
+    """Run `fn` at most once per in-flight `key`, memoizing the result per thread.
+
+    Pass `memo_entries=0` to only coalesce concurrent calls.
+    """
+    stats = _stats.setdefault(tool, DedupeStats())
+    stats.calls += 1
+    scoped_key = f"{tool}:{key}"
+
+    if thread_id and memo_entries > 0:
+        memoized = _memo.get(thread_id, scoped_key)
+        if memoized is not None:
+            stats.memo_hits += 1
+            return memoized
+
+    if not _flight.inflight(scoped_key):
+        stats.upstream_calls += 1
+    result, shared = await _flight.do(scoped_key, fn)
+    if shared:
+        stats.coalesced += 1
+
+    if thread_id and memo_entries > 0 and result is not None:
+        _memo.set(thread_id, scoped_key, result, memo_entries)
+    return result
+
+
+def dedupe_stats() -> dict[str, dict[str, int]]:
+    """Return per-tool counters, including how many upstream calls were saved."""
+    return {tool: stats.as_dict() for tool, stats in _stats.items()}
+
+
+def forget_thread(thread_id: str) -> None:
+    """Drop the memo for a finished conversation thread."""
+    _memo.forget(thread_id)
@@ -0,0 +1,112 @@
+"""Format long itineraries as concurrent chunks of days.
+
+One structured-output call for the whole trip takes time in proportion to
+`number_of_days`, because the model writes every day in turn. With
+`format_parallelism` above 1, `format_itinerary` splits the trip into up to
+that many contiguous day ranges (`day_chunks`) and sends each one to its own
+`format_days` run with LangGraph's `Send`, so the ranges are written
+concurrently. `merge_itinerary` then joins the parts with `merge_chunks` into
+one `ITINERARY_SCHEMA` document.
+
+The merge does not depend on the order the parts finish in:
+
+- parts are ordered by their first day and days are renumbered from it, so a
+  chunk that numbered its days from 1 still lands in the right place;
+- each chunk keeps at most as many days as its range holds;
+- an attraction or restaurant already used on an earlier day is dropped;
+- `general_tips` fields are taken from the earliest part that has them, and
+  `must_try_dishes` is the union over all parts;
+- `total_estimated_cost` is the sum of the daily estimates when every day has
+  one, else the sum of the parts' totals.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+
+def day_chunks(days: int, parallelism: int) -> list[tuple[int, int]]:
+    """Split days `1..days` into at most `parallelism` contiguous, balanced ranges.
+
+    Ranges are inclusive `(first_day, last_day)` pairs, longest first.
+    """
+    days = max(1, int(days))
+    count = max(1, min(int(parallelism), days))
+    size, extra = divmod(days, count)
+    chunks = []
+    first = 1
+    for index in range(count):
+        last = first + size - 1 + (1 if index < extra else 0)
+        chunks.append((first, last))
+        first = last + 1
+    return chunks
+
+
+def merge_parts(
+    left: Optional[list[dict[str, Any]]], right: Optional[list[dict[str, Any]]]
+) -> list[dict[str, Any]]:
+    """Reducer for lists of `Send` results, such as `State.itinerary_parts`.
+
+    Appends the results, or clears the list on `None`.
+    """
+    if right is None:
+        return []
+    return (left or []) + right
+
+
+def _name_key(item: dict[str, Any]) -> str:
+    return " ".join(str(item.get("name") or "").casefold().split())
+
+
+def _merge_tips(parts: Sequence[dict[str, Any]]) -> dict[str, Any]:
+    tips: dict[str, Any] = {}
+    dishes: list[str] = []
+    for part in parts:
+        for key, value in (part.get("general_tips") or {}).items():
+            if key == "must_try_dishes":
+                dishes.extend(dish for dish in value or [] if dish not in dishes)
+            elif value and key not in tips:
+                tips[key] = value
+    if dishes:
+        tips["must_try_dishes"] = dishes
+    return tips
+
+
+def merge_chunks(parts: Sequence[dict[str, Any]], trip_days: int) -> dict[str, Any]:
+    """Join the itineraries written for each day range into one itinerary."""
+    ordered = sorted(parts, key=lambda part: part["first_day"])
+    itinerary: dict[str, Any] = {"destination": "", "country": "", "trip_duration": trip_days}
+    for field in ("destination", "country"):
+        itinerary[field] = next((p["itinerary"][field] for p in ordered if p["itinerary"].get(field)), "")
+
+    days: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for part in ordered:
+        length = part["last_day"] - part["first_day"] + 1
+        for offset, day in enumerate((part["itinerary"].get("days") or [])[:length]):
+            day = {**day, "day_number": part["first_day"] + offset}
+            for section in ("attractions", "dining"):
+                kept = []
+                for item in day.get(section) or []:
+                    key = _name_key(item)
+                    if key and key in seen:
+                        continue
+                    seen.add(key)
+                    kept.append(item)
+                day[section] = kept
+            days.append(day)
+    itinerary["days"] = days
+
+    tips = _merge_tips([part["itinerary"] for part in ordered])
+    if tips:
+        itinerary["general_tips"] = tips
+
+    daily = [day.get("daily_cost_estimate") for day in days]
+    if days and all(isinstance(cost, (int, float)) for cost in daily):
+        itinerary["total_estimated_cost"] = sum(daily)
+    else:
+        totals = [p["itinerary"].get("total_estimated_cost") for p in ordered]
+        totals = [cost for cost in totals if isinstance(cost, (int, float))]
+        if totals:
+            itinerary["total_estimated_cost"] = sum(totals)
+    return itinerary
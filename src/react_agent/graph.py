@@ -2,38 +2,242 @@
 
 Works with a chat model with tool calling support.
 """
-import json 
-import os
+import json
 
 from datetime import datetime
-from typing import Dict, List, Literal
+from functools import cache
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Literal, Optional, Union, cast
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage, trim_messages
-from langchain_core.runnables import RunnableConfig
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, START, END
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, trim_messages
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.graph import StateGraph
 from langgraph.prebuilt import ToolNode
-from langgraph.types import interrupt, Command
-from langchain_core.messages.base import BaseMessage
-from datetime import datetime 
-
-from pydantic import BaseModel, Field
+from langgraph.types import interrupt, Command, Send
 
+from react_agent.accounting import metered, with_usage
+from react_agent.cassette import replay_model_kwargs
 from react_agent.configuration import Configuration
-from react_agent.state import InputState, State
+from react_agent.fanout import day_chunks, merge_chunks
+from react_agent.intake import follow_up_question, merge_profile, missing_fields
+from react_agent.llm_cache import invoke_structured
+from react_agent.models import ChatModel, model_for
+from react_agent.planning import (
+    DayCluster,
+    candidate_places,
+    cluster_days,
+    opening_windows,
+    order_route,
+    plan_routes,
+    render_day_plan,
+)
+from react_agent.profile import INTAKE_SOURCE, UNTRACKED_SOURCE, merge_extracted, new_human_messages
+from react_agent.research import (
+    RESEARCH_SCOPE,
+    merge_notes,
+    research_scope,
+    research_tasks,
+    sort_notes,
+    tool_exchanges,
+    tool_rounds,
+)
+from react_agent.review import check_itinerary, errors, needs_llm_review, render_feedback
+from react_agent.state import CategoryState, DayChunk, InputState, ResearchTask, State
+from react_agent.streaming import REVIEW_EVENT, invoke_streaming_days, stream_writer
 from react_agent.tools import TOOLS
-from react_agent.prompts import VALIDATE_INPUT_PROMPT, GENERATE_ITINERARY_PROMPT, FORMAT_ITINERARY_PROMPT, REFLECTION_ITINERARY_PROMPT, USER_ACCOMODATIONS_INPUT_PROMPT
-from react_agent.schemas import ITINERARY_SCHEMA, USER_SCHEMA, ACCOMMODATION_SCHEMA, REFLECTION_SCHEMA
+from react_agent.utils import get_message_text
+from react_agent.prompts import (
+    FORMAT_DAYS_CONTEXT,
+    FORMAT_ITINERARY_CONTEXT,
+    FORMAT_ITINERARY_PROMPT,
+    GENERATE_ITINERARY_CONTEXT,
+    GENERATE_ITINERARY_PROMPT,
+    INTAKE_CONTEXT,
+    INTAKE_PROMPT,
+    PROFILE_UPDATE_CONTEXT,
+    PROFILE_UPDATE_PROMPT,
+    REFLECTION_ITINERARY_CONTEXT,
+    REFLECTION_ITINERARY_PROMPT,
+    RESEARCH_CATEGORY_CONTEXT,
+    RESEARCH_CATEGORY_PROMPT,
+    UPDATE_PROFILE_CONTEXT,
+    UPDATE_PROFILE_PROMPT,
+    VALIDATE_INPUT_CONTEXT,
+    VALIDATE_INPUT_PROMPT,
+    build_prompt,
+)
+from react_agent.schemas import (
+    INTAKE_SCHEMA,
+    ITINERARY_SCHEMA,
+    PROFILE_UPDATE_SCHEMA,
+    REFLECTION_SCHEMA,
+    USER_SCHEMA,
+)
 from langgraph.checkpoint.memory import MemorySaver
 
-llm = init_chat_model("gpt-4o", model_provider="openai")
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+
+def get_llm() -> ChatModel:
+    """Return the chat model configured for the running node (see `react_agent.models`)."""
+    return model_for()
+
+
+@cache
+def get_token_counter() -> "BaseChatModel":
+    """Return the model used to count tokens when trimming the research history."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model="gpt-4o", **replay_model_kwargs())
+
+
+def validate_prompt(state: State) -> str:
+    """Return the system prompt of `validate_user_query`."""
+    return build_prompt(
+        VALIDATE_INPUT_PROMPT,
+        VALIDATE_INPUT_CONTEXT,
+        todays_date=datetime.today().date().isoformat(),
+    )
+
+
+def intake_prompt(state: State) -> str:
+    """Return the system prompt of `validate_user_query` with `fused_intake`."""
+    return build_prompt(
+        INTAKE_PROMPT,
+        INTAKE_CONTEXT,
+        todays_date=datetime.today().date().isoformat(),
+        PROFILE=state.user_profile or "Nothing yet.",
+        MISSING=", ".join(missing_fields(state.user_profile)) or "nothing",
+    )
+
+
+def profile_prompt(state: State) -> str:
+    """Return the system prompt of `update_user_profile`."""
+    return build_prompt(
+        UPDATE_PROFILE_PROMPT,
+        UPDATE_PROFILE_CONTEXT,
+        todays_date=datetime.today().date().isoformat(),
+    )
 
 
-def validate_user_query(state: State) -> dict:
+def profile_update_prompt(state: State) -> str:
+    """Return the system prompt of `update_user_profile` with `incremental_profile`."""
+    return build_prompt(
+        PROFILE_UPDATE_PROMPT,
+        PROFILE_UPDATE_CONTEXT,
+        todays_date=datetime.today().date().isoformat(),
+        PROFILE=state.user_profile or "Nothing yet.",
+    )
+
+
+def research_prompt(state: State) -> str:
+    """Return the system prompt of `research_itinerary`."""
+    return build_prompt(
+        GENERATE_ITINERARY_PROMPT,
+        GENERATE_ITINERARY_CONTEXT,
+        todays_date=datetime.today().date(),
+        USER_PROFILE=state.user_profile,
+        FEEDBACK=state.itinerary_feedback,
+        CURRENT_ITINERARY=state.itinerary,
+    )
+
+
+def research_category_prompt(task: ResearchTask) -> str:
+    """Return the system prompt of a `research_category` sub-agent."""
+    return build_prompt(
+        RESEARCH_CATEGORY_PROMPT,
+        RESEARCH_CATEGORY_CONTEXT,
+        todays_date=datetime.today().date(),
+        FOCUS=task["focus"],
+        CITY=task["city"],
+        USER_PROFILE=task["user_profile"],
+        CURRENT_ITINERARY=task["itinerary"],
+        FEEDBACK=task["feedback"],
+    )
+
+
+def format_prompt(state: State, day_plan: str) -> str:
+    """Return the system prompt of `format_itinerary`."""
+    return build_prompt(
+        FORMAT_ITINERARY_PROMPT,
+        FORMAT_ITINERARY_CONTEXT,
+        USER_PROFILE=state.user_profile,
+        DAY_PLAN=day_plan,
+    )
+
+
+def format_days_prompt(chunk: DayChunk) -> str:
+    """Return the system prompt of `format_days` for one range of days."""
+    return build_prompt(
+        FORMAT_ITINERARY_PROMPT,
+        FORMAT_ITINERARY_CONTEXT + FORMAT_DAYS_CONTEXT,
+        USER_PROFILE=chunk["user_profile"],
+        DAY_PLAN=chunk["day_plan"],
+        FIRST_DAY=chunk["first_day"],
+        LAST_DAY=chunk["last_day"],
+        TRIP_DAYS=chunk["trip_days"],
+    )
+
+
+def review_prompt(state: State) -> str:
+    """Return the system prompt of `review_itinerary`."""
+    return build_prompt(
+        REFLECTION_ITINERARY_PROMPT,
+        REFLECTION_ITINERARY_CONTEXT,
+        USER_PROFILE=state.user_profile,
+        PREVIOUS_FEEDBACK=state.itinerary_feedback,
+    )
+
+
+# Each prompt builder, keyed by the node that sends it.
+NODE_PROMPTS = {
+    "validate_user_query": validate_prompt,
+    "update_user_profile": profile_update_prompt,
+    "research_itinerary": research_prompt,
+    "format_itinerary": lambda state: format_prompt(state, "No pre-clustered days available."),
+    "review_itinerary": review_prompt,
+}
+
+
+def intake_user_query(state: State) -> dict[str, Any]:
+    """Validate the query and extract the user profile in one call (`fused_intake`)."""
+    response = invoke_structured(
+        get_llm(),
+        INTAKE_SCHEMA,
+        [SystemMessage(content=intake_prompt(state))] + state.itinerary_messages,
+        "validate_user_query",
+    )
+    profile = merge_profile(state.user_profile, response.get("profile"))
+    missing = missing_fields(profile)
+
+    if not response.get("is_valid") or missing:
+        message = "" if response.get("is_valid") else response.get("response_message")
+        message = message or follow_up_question(missing)
+        user_response = interrupt(with_usage(state, {"prompt": message, "missing_fields": missing}))
+        return {
+            "itinerary_messages": [AIMessage(content=message), HumanMessage(content=user_response)],
+            "user_profile": profile,
+        }
+    profile, sources = merge_extracted(None, None, profile, INTAKE_SOURCE)
+    human = new_human_messages(state.itinerary_messages, None)
+    return {
+        "itinerary_messages": [AIMessage(content=json.dumps({"is_valid": True}))],
+        "user_profile": profile,
+        "profile_sources": sources,
+        # Later feedback rounds only extract what the user says after the intake.
+        "profile_cursor": human[-1].id if human else "",
+    }
+
+
+@metered
+def validate_user_query(state: State, config: RunnableConfig) -> dict[str, Any]:
     """Request more information from the user when the query is incomplete."""
 
-    llm_json = llm.with_structured_output({
+    if Configuration.from_runnable_config(config).fused_intake:
+        return intake_user_query(state)
+
+    validation_schema = {
         "$schema": "https://json-schema.org/draft/2020-12/schema",
         "title": "validation_schema",
         "$id": "https://example.com/product.schema.json",
@@ -49,14 +253,19 @@ def validate_user_query(state: State) -> dict:
             }
         },
         "required": ["is_valid", "response_message"]
-    })
-    
-    response = llm_json.invoke([SystemMessage(content=VALIDATE_INPUT_PROMPT)] + state.itinerary_messages)
+    }
+
+    response = invoke_structured(
+        get_llm(),
+        validation_schema,
+        [SystemMessage(content=validate_prompt(state))] + state.itinerary_messages,
+        "validate_user_query",
+    )
 
     if not response.get('is_valid'):
 
         # Interrupt the flow to get user input
-        user_response = interrupt({"prompt": response.get('response_message')})
+        user_response = interrupt(with_usage(state, {"prompt": response.get('response_message')}))
         
         # Add the user's response to messages and directly return to validation
         # This is crucial - we're using a direct return instead of a Command
@@ -70,53 +279,54 @@ def validate_user_query(state: State) -> dict:
         "itinerary_messages": [AIMessage(content=json.dumps(response))]
     }
 
-def update_user_profile(state: State) -> dict:
-
-    llm_json = llm.with_structured_output(USER_SCHEMA)
-    response = llm_json.invoke(
-        [SystemMessage(
-            content=f"""
-            Use the message history to update the user profile. 
-            Do not make any assumptions and be accurate at ALL TIMES.
-            
-            Here is the schema with its default values:
-            {USER_SCHEMA}
-
-            Use the default values for the fields if the user hasn't provided theirs.
-            Assume all people are adults unless mentioned otherwise.
-
-            Make sure to double check if user info doesn't have any typos.
-            If currency not given, assume currency of destination.
-
-            Today is {datetime.today().date().isoformat()}
-            """
-        ),
-        ] +
-        [msg for msg in state.itinerary_messages if isinstance(msg, HumanMessage)]
+@metered
+def update_user_profile(state: State, config: RunnableConfig) -> dict[str, Any]:
+    """Extract the user profile from the user's messages."""
+
+    if Configuration.from_runnable_config(config).incremental_profile:
+        messages = new_human_messages(state.itinerary_messages, state.profile_cursor)
+        if not messages:
+            return {}
+        response = invoke_structured(
+            get_llm(),
+            PROFILE_UPDATE_SCHEMA,
+            [SystemMessage(content=profile_update_prompt(state))] + messages,
+            "update_user_profile",
+        )
+        last_id = messages[-1].id
+        profile, sources = merge_extracted(
+            state.user_profile, state.profile_sources, response, last_id or UNTRACKED_SOURCE
+        )
+        # Without an id there is nothing to resume from, so the cursor stays put.
+        cursor = last_id or state.profile_cursor
+        return {"user_profile": profile, "profile_sources": sources, "profile_cursor": cursor}
+
+    response = invoke_structured(
+        get_llm(),
+        USER_SCHEMA,
+        [SystemMessage(content=profile_prompt(state))] +
+        [msg for msg in state.itinerary_messages if isinstance(msg, HumanMessage)],
+        "update_user_profile",
     )
 
     return {"user_profile": response}
 
+@metered
 async def research_itinerary(
     state: State
 ):
     """An agent that researches a travel itinerary based on users query."""  # noqa: D202, D415
 
-    system_message = GENERATE_ITINERARY_PROMPT.format(
-        todays_date=datetime.today().date(),
-        USER_PROFILE=state.user_profile,
-        FEEDBACK=state.itinerary_feedback,
-        CURRENT_ITINERARY=state.itinerary
-    )
+    system_message = research_prompt(state)
 
-    llm_tools = llm.bind_tools(TOOLS)
+    llm_tools = get_llm().bind_tools(TOOLS)
 
     trimmed_messages = trim_messages(
         messages=state.itinerary_messages,
         include_system=False,
         max_tokens=50000,
         allow_partial=False,
-        token_counter=ChatOpenAI(model="gpt-4o"),
+        token_counter=get_token_counter(),
     )
     
     ai_msg = await llm_tools.ainvoke(
@@ -130,74 +340,296 @@ async def research_itinerary(
         "itinerary_messages": [ai_msg]
     }
 
-def format_itinerary(
-        state: State
-) -> dict:
-    # print(state.itinerary_messages)
-    system_message = FORMAT_ITINERARY_PROMPT.format(
-        USER_PROFILE=state.user_profile
+def plan_days(
+    state: State, configuration: Configuration
+) -> tuple[list[dict[str, Any]], list[DayCluster]]:
+    """Return the candidate places found during research and their day clusters."""
+    places: list[dict[str, Any]] = []
+    if configuration.plan_day_clusters or configuration.plan_day_routes:
+        places = candidate_places(state.itinerary_messages)
+
+    clusters: list[DayCluster] = []
+    if configuration.plan_day_clusters and places:
+        clusters = cluster_days(places, (state.user_profile or {}).get("number_of_days") or 1)
+        if configuration.plan_day_routes:
+            for cluster in clusters:
+                route = order_route(
+                    cluster.places,
+                    windows=opening_windows(cluster.places),
+                    speed_kmh=configuration.travel_speed_kmh,
+                )
+                cluster.places = [cluster.places[i] for i in route.order]
+    return places, clusters
+
+
+def invoke_itinerary(
+    messages: list[BaseMessage], configuration: Configuration, **kwargs: Any
+) -> dict[str, Any]:
+    """Ask the model for an `ITINERARY_SCHEMA` document, streaming days if configured."""
+    llm_json = get_llm().with_structured_output(ITINERARY_SCHEMA)
+    if configuration.stream_itinerary_days:
+        response = invoke_streaming_days(llm_json, messages, **kwargs)
+    else:
+        response = llm_json.invoke(messages)
+    # A JSON schema (rather than a pydantic model) gets a plain dict back.
+    return cast(dict[str, Any], response)
+
+
+# How `add_conditional_edges` types its routers. Lists are invariant, so to mypy the
+# `list[Send]` that fans research out is not a `list[Hashable]`.
+EdgeRouter = Callable[..., Union[Hashable, list[Hashable]]]
+
+
+def route_research(
+    state: State, config: RunnableConfig, feedback: Optional[str] = None
+) -> Union[Literal["research_itinerary"], list[Send]]:
+    """Send the research to one sub-agent per category, or to the single research loop."""
+    configuration = Configuration.from_runnable_config(config)
+    if not configuration.research_categories:
+        return "research_itinerary"
+    tasks = research_tasks(
+        state.user_profile, configuration.research_categories, configuration.research_split_cities
     )
+    return [
+        Send("research_category", {
+            **task,
+            "user_profile": state.user_profile,
+            "itinerary": state.itinerary,
+            "feedback": state.itinerary_feedback if feedback is None else feedback,
+        })
+        for task in tasks
+    ]
+
+async def research_agent(state: CategoryState, config: RunnableConfig) -> dict[str, Any]:
+    """One step of a research sub-agent; tools are withdrawn once its budget is used."""
+    configuration = Configuration.from_runnable_config(config)
+    llm: Runnable[LanguageModelInput, BaseMessage]
+    if tool_rounds(state["messages"]) < configuration.research_tool_rounds:
+        llm = get_llm().bind_tools(TOOLS)
+    else:
+        llm = get_llm()
 
-    llm_json = llm.with_structured_output(ITINERARY_SCHEMA)
-    response = llm_json.invoke(
-            [SystemMessage(content=system_message)] +
-            [state.itinerary_messages[-1]]
+    trimmed_messages = trim_messages(
+        messages=state["messages"],
+        include_system=False,
+        max_tokens=configuration.research_history_tokens,
+        allow_partial=False,
+        token_counter=get_token_counter(),
     )
 
+    ai_msg = await llm.ainvoke(
+        [SystemMessage(content=research_category_prompt(state))] + trimmed_messages
+    )
+    return {"messages": [ai_msg]}
+
+def route_research_agent(state: CategoryState) -> Literal["tools", "__end__"]:
+    """Run the requested tools, or finish when the sub-agent has answered."""
+    last_message = state["messages"][-1]
+    if isinstance(last_message, AIMessage) and last_message.tool_calls:
+        return "tools"
+    return "__end__"
+
+category_builder = StateGraph(CategoryState)
+category_builder.add_node("agent", research_agent)
+category_builder.add_node("tools", ToolNode(TOOLS))
+category_builder.add_edge("__start__", "agent")
+category_builder.add_conditional_edges("agent", route_research_agent)
+category_builder.add_edge("tools", "agent")
+# The sub-agent's scratch history is not checkpointed; its notes are, by the parent.
+category_graph = category_builder.compile(checkpointer=False)
+
+@metered
+async def research_category(task: ResearchTask, config: RunnableConfig) -> dict[str, Any]:
+    """Research one category (and city) with its own sub-agent."""
+    configurable = {**config.get("configurable", {}), RESEARCH_SCOPE: research_scope(task)}
+    result = await category_graph.ainvoke(
+        {**task, "messages": [HumanMessage(content=f"Research this for my trip: {task['focus']}")]},
+        {**config, "configurable": configurable},
+    )
+    note = {
+        "category": task["category"],
+        "city": task["city"],
+        "findings": get_message_text(result["messages"][-1]),
+        "messages": tool_exchanges(result["messages"]),
+    }
+    return {"research_notes": [note]}
+
+def merge_research(state: State, config: RunnableConfig) -> dict[str, Any]:
+    """Combine the research sub-agents' findings for `format_itinerary`."""
+    configuration = Configuration.from_runnable_config(config)
+    notes = sort_notes(state.research_notes, configuration.research_categories)
+    exchanges = [message for note in notes for message in note["messages"]]
+    summary = AIMessage(content=merge_notes(notes, configuration.research_categories))
     return {
-        "itinerary": response
+        "itinerary_messages": exchanges + [summary],
+        "research_notes": None,
     }
 
-def review_itinerary(
-    state: State
-) -> Command[Literal['validate_itinerary', 'research_itinerary']]:
-    """ Reflect on the web search agent output and return feedback."""
+def after_format(configuration: Configuration) -> Union[str, list[str]]:
+    """Return where a formatted itinerary goes: to review, or to review and the user at once."""
+    if configuration.background_review:
+        return ["review_itinerary", "validate_itinerary"]
+    return "review_itinerary"
 
-    llm_json = llm.with_structured_output(
-        REFLECTION_SCHEMA
+@metered
+def format_itinerary(
+        state: State,
+        config: RunnableConfig
+) -> Command[Literal["format_days", "review_itinerary"]]:
+    configuration = Configuration.from_runnable_config(config)
+    places, clusters = plan_days(state, configuration)
+
+    trip_days = (state.user_profile or {}).get("number_of_days") or 1
+    chunks = day_chunks(trip_days, configuration.format_parallelism)
+    if len(chunks) > 1:
+        return Command(
+            goto=[
+                Send("format_days", {
+                    "user_profile": state.user_profile,
+                    "research": state.itinerary_messages[-1],
+                    "day_plan": render_day_plan(clusters[first - 1:last]) if clusters
+                    else "No pre-clustered days available.",
+                    "first_day": first,
+                    "last_day": last,
+                    "trip_days": trip_days,
+                })
+                for first, last in chunks
+            ],
+            update={"itinerary_parts": None},
+        )
+
+    day_plan = render_day_plan(clusters) if clusters else "No pre-clustered days available."
+    system_message = format_prompt(state, day_plan)
+    response = invoke_itinerary(
+        [SystemMessage(content=system_message)] + [state.itinerary_messages[-1]], configuration
     )
 
-    response = llm_json.invoke(
-        [
-            SystemMessage(content=REFLECTION_ITINERARY_PROMPT.format(
-                ITINERARY_SCHEMA=ITINERARY_SCHEMA,
-                USER_PROFILE=state.user_profile,
-                PREVIOUS_FEEDBACK=state.itinerary_feedback
-            )), 
-            state.itinerary_messages[-1]
-        ]
+    if configuration.plan_day_routes and places:
+        response = plan_routes(response, places, speed_kmh=configuration.travel_speed_kmh)
+
+    return Command(
+        goto=after_format(configuration),
+        update={"itinerary": response, "review_feedback": ""}
     )
 
-    counter = state.iteration_counter
+@metered
+def format_days(chunk: DayChunk, config: RunnableConfig) -> dict[str, Any]:
+    """Format one range of days; `format_itinerary` sends one run per range."""
+    configuration = Configuration.from_runnable_config(config)
+    write = stream_writer()
+
+    def write_day(event: dict[str, Any]) -> None:
+        write({**event, "day_index": event["day_index"] + chunk["first_day"] - 1})
+
+    response = invoke_itinerary(
+        [SystemMessage(content=format_days_prompt(chunk)), chunk["research"]],
+        configuration,
+        writer=write_day,
+    )
+    part = {"first_day": chunk["first_day"], "last_day": chunk["last_day"], "itinerary": response}
+    return {"itinerary_parts": [part]}
+
+def merge_itinerary(
+    state: State, config: RunnableConfig
+) -> Command[Literal["review_itinerary", "validate_itinerary"]]:
+    """Join the ranges of days written by `format_days` into one itinerary."""
+    configuration = Configuration.from_runnable_config(config)
+    trip_days = (state.user_profile or {}).get("number_of_days") or 1
+    response = merge_chunks(state.itinerary_parts, trip_days)
+
+    if configuration.plan_day_routes:
+        places = candidate_places(state.itinerary_messages)
+        if places:
+            response = plan_routes(response, places, speed_kmh=configuration.travel_speed_kmh)
+
+    return Command(
+        goto=after_format(configuration),
+        update={"itinerary": response, "review_feedback": ""}
+    )
 
-    if response['is_satisfactory'] or counter >= 0:
+@metered
+def review_itinerary(
+    state: State,
+    config: RunnableConfig
+) -> Command[Literal['validate_itinerary', 'research_itinerary', 'research_category']]:
+    """Check the itinerary, and send it back to research with feedback if it needs work.
+
+    Deterministic checks run first; the LLM reviewer only runs when they leave
+    a quality question (see `react_agent.review`).
+
+    With `background_review` the user already has the itinerary, so a problem
+    is reported instead: as an `itinerary_review` event on the custom stream
+    and in `review_feedback`, which `validate_itinerary` adds to the user's
+    own feedback.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    counter = state.iteration_counter
+    if counter >= configuration.max_review_iterations:
         return Command(
-            goto='validate_itinerary'
+            goto=() if configuration.background_review else 'validate_itinerary'
         )
-    else:
+
+    findings = check_itinerary(
+        state.itinerary,
+        state.user_profile,
+        min_attractions=configuration.review_min_attractions,
+        min_dining=configuration.review_min_dining,
+    )
+    feedback = render_feedback(errors(findings)) if errors(findings) else None
+
+    if feedback is None and needs_llm_review(findings, configuration.llm_review):
+        warnings = "\n".join(f"- {finding.message}" for finding in findings) or "None"
+        response = invoke_structured(
+            get_llm(),
+            REFLECTION_SCHEMA,
+            [
+                SystemMessage(content=review_prompt(state)),
+                HumanMessage(
+                    content=f"Itinerary:\n{json.dumps(state.itinerary)}\n\n"
+                    f"Possible problems found by the automatic checks:\n{warnings}"
+                ),
+            ],
+            "review_itinerary",
+        )
+        if not response.get('is_satisfactory') and response.get('feedback'):
+            feedback = response['feedback']
+
+    if configuration.background_review:
+        if feedback is None:
+            return Command()
+        stream_writer()({"type": REVIEW_EVENT, "feedback": feedback})
+        return Command(update={"review_feedback": feedback})
+
+    if feedback is None:
         return Command(
-            goto='research_itinerary',
-            update={
-                "itinerary_feedback": response['feedback'],
-                "iteration_counter": counter + 1,
-                "itinerary_messages": [AIMessage(content=f'FEEDBACK based on last itinerary: {response['feedback']}')]
-            }
+            goto='validate_itinerary'
         )
+    return Command(
+        goto=route_research(state, config, feedback=feedback),
+        update={
+            "itinerary_feedback": feedback,
+            "iteration_counter": counter + 1,
+            "itinerary_messages": [AIMessage(content=f'FEEDBACK based on last itinerary: {feedback}')]
+        }
+    )
 
-def validate_itinerary(state: State) -> dict:
+@metered
+def validate_itinerary(state: State, config: RunnableConfig) -> dict[str, Any]:
     """Request more information from the user when the query is incomplete."""
 
+    configuration = Configuration.from_runnable_config(config)
     last_message = state.itinerary_messages[-1]
 
     if not isinstance(last_message, HumanMessage):
         # Interrupt the flow to get user input
-        user_response = interrupt({
+        user_response = interrupt(with_usage(state, {
             "prompt": f'Does this look good to you? \n\n{state.itinerary} \n\nReply with Yes to continue or provide some feedback to improve on',
+            "review_pending": configuration.background_review,
             }
-        )
+        ))
 
     if isinstance(last_message, HumanMessage):
-        llm_json = llm.with_structured_output({
+        approval_schema = {
             "$schema": "https://json-schema.org/draft/2020-12/schema",
             "title": "itinerary_validation_schema",
             "$id": "https://example.com/product.schema.json",
@@ -218,9 +650,11 @@ def validate_itinerary(state: State) -> dict:
             },
 
             "required": ["is_approved"]
-        })
-        
-        response = llm_json.invoke(
+        }
+
+        response = invoke_structured(
+            get_llm(),
+            approval_schema,
             [
                 SystemMessage(
                 content="""Y
@@ -229,18 +663,25 @@ def validate_itinerary(state: State) -> dict:
                 IF there is no feedback prompt the user kindly for more feedback and set valid_feedback to false
                 """),
                 state.itinerary_messages[-1]
-            ]
+            ],
+            "validate_itinerary",
         )
         
         if not response.get('is_approved') and response.get('valid_feedback'):
 
-            state.itinerary_feedback = last_message.content
+            feedback = get_message_text(last_message)
+            if state.review_feedback:
+                # Problems the background review found while the user was reading.
+                feedback = f"{feedback}\n\nReviewer feedback:\n{state.review_feedback}"
+            state.itinerary_feedback = feedback
 
             print(f'ITINERARY FEEDBACK UPDATED: {last_message.content}')
 
             return {
                 "itinerary_messages": [AIMessage(content=json.dumps(response))],
-                "itinerary_feedback": last_message.content
+                "itinerary_feedback": feedback,
+                # A new draft for the user's feedback gets its own review rounds.
+                "iteration_counter": 0
             }
         
         return {
@@ -267,7 +708,7 @@ def validate_itinerary(state: State) -> dict:
 #             })
 
     
-#     llm_json = llm.with_structured_output({
+#     llm_json = get_llm().with_structured_output({
 #         "$schema": "https://json-schema.org/draft/2020-12/schema",
 #         "title": "validation_schema",
 #         "$id": "https://example.com/product.schema.json",
@@ -284,7 +725,7 @@ def validate_itinerary(state: State) -> dict:
 #         },
 #         "required": ["is_valid", "response_message"]
 #     })
-#     response = llm.invoke(
+#     response = get_llm().invoke(
 #             [SystemMessage(content=USER_ACCOMODATIONS_INPUT_PROMPT.format(
 #                 ITINERARY=state.itinerary,
 #                 USER_PROFILE=state.user_profile,
@@ -309,7 +750,11 @@ builder.add_node(validate_user_query)
 builder.add_node(update_user_profile)
 
 builder.add_node(research_itinerary)
+builder.add_node(research_category)
+builder.add_node(merge_research)
 builder.add_node(format_itinerary)
+builder.add_node(format_days)
+builder.add_node(merge_itinerary)
 builder.add_node(review_itinerary)
 builder.add_node(validate_itinerary)
 # builder.add_node(get_accomodations_info)
@@ -317,7 +762,9 @@ builder.add_node("tools", ToolNode(TOOLS, messages_key="itinerary_messages"))
 
 builder.add_edge("__start__", "validate_user_query")
 
-def route_validation_logic(state: State) -> Literal["update_user_profile", "validate_user_query"]:
+def route_validation_logic(
+    state: State, config: RunnableConfig
+) -> Union[Literal["update_user_profile", "validate_user_query", "research_itinerary"], list[Send]]:
     """Determine the next node based on the model's output."""
     last_message = state.itinerary_messages[-1]
 
@@ -326,13 +773,17 @@ def route_validation_logic(state: State) -> Literal["update_user_profile", "vali
 
         # If last message is Ai and is_valid then pass
         if val_resp.get('is_valid'):
+            # The fused intake has already extracted the profile.
+            if Configuration.from_runnable_config(config).fused_intake:
+                return route_research(state, config)
             return "update_user_profile"
         
     return 'validate_user_query'
     
 builder.add_conditional_edges(
     "validate_user_query",
-    route_validation_logic,
+    cast(EdgeRouter, route_validation_logic),
+    ["update_user_profile", "validate_user_query", "research_itinerary", "research_category"],
 )
 
 def route_model_output(state: State) -> Literal["format_itinerary", "tools"]:
@@ -394,9 +845,15 @@ builder.add_conditional_edges(
 #     route_accomodation_validation_logic
 # )
 
-builder.add_edge("update_user_profile", "research_itinerary")
+builder.add_conditional_edges(
+    "update_user_profile",
+    cast(EdgeRouter, route_research),
+    ["research_itinerary", "research_category"],
+)
+builder.add_edge("research_category", "merge_research")
+builder.add_edge("merge_research", "format_itinerary")
 builder.add_edge("tools", "research_itinerary")
-builder.add_edge("format_itinerary", "review_itinerary")
+builder.add_edge("format_days", "merge_itinerary")
 
 checkpointer = MemorySaver()
 
@@ -0,0 +1,71 @@
+"""Single-pass intake: validate the query and extract the profile in one call.
+
+By default every intake turn makes two structured-output calls, one after
+the other. `validate_user_query` checks that the query is complete. Then
+`update_user_profile` extracts the profile from the user's messages.
+With `fused_intake`, `validate_user_query` makes one call with
+`INTAKE_SCHEMA`, which returns validity, a follow-up message and the profile
+fields stated so far.
+
+The partial profile is merged into `State.user_profile` on every turn, so it
+survives the interrupt that asks the user for more. Each question is aimed at
+the fields in `REQUIRED_FIELDS` that are still missing. Once they are all
+known, the remaining fields get their `USER_SCHEMA` defaults, and the graph
+goes straight to research without running `update_user_profile`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence, cast
+
+from react_agent.schemas import USER_SCHEMA
+
+# What the intake needs before research can start; other fields have defaults.
+REQUIRED_FIELDS = ("destination", "budget", "number_of_days")
+
+_PROFILE_FIELDS = cast(dict[str, dict[str, Any]], USER_SCHEMA["properties"])
+_LABELS = {
+    "number_of_days": "how many days you'd like to travel",
+    "budget": "your budget",
+}
+
+
+def _stated(value: Any) -> bool:
+    return value is not None and value != "" and value != []
+
+
+def merge_profile(
+    current: Optional[dict[str, Any]], extracted: Optional[dict[str, Any]]
+) -> dict[str, Any]:
+    """Return `current` updated with the known `USER_SCHEMA` fields stated in `extracted`."""
+    merged = dict(current or {})
+    for name, value in (extracted or {}).items():
+        if name in _PROFILE_FIELDS and _stated(value):
+            merged[name] = value
+    return merged
+
+
+def missing_fields(profile: Optional[dict[str, Any]]) -> list[str]:
+    """Return the `REQUIRED_FIELDS` that `profile` does not have yet."""
+    return [name for name in REQUIRED_FIELDS if not _stated((profile or {}).get(name))]
+
+
+def with_defaults(profile: dict[str, Any]) -> dict[str, Any]:
+    """Fill the fields the user did not state with their `USER_SCHEMA` defaults."""
+    defaults = {
+        name: field["default"]
+        for name, field in _PROFILE_FIELDS.items()
+        if "default" in field
+    }
+    return {**defaults, **profile}
+
+
+def follow_up_question(missing: Sequence[str]) -> str:
+    """Return a short question asking for the `missing` fields."""
+    if not missing:
+        return "Could you tell me a bit more about the trip you are planning?"
+    labels = [_LABELS.get(name, f"your {name.replace('_', ' ')}") for name in missing]
+    listed = (
+        labels[0] if len(labels) == 1 else ", ".join(labels[:-1]) + " and " + labels[-1]
+    )
+    return f"Could you tell me {listed}?"
@@ -0,0 +1,136 @@
+"""Response cache for structured-output model calls.
+
+`validate_user_query`, `update_user_profile`, `review_itinerary` and the
+approval check in `validate_itinerary` classify or extract from inputs that
+repeat a lot: the same opening message, a plain "Yes", the same itinerary
+reviewed again. `invoke_structured` answers those from a `TieredCache` (LRU
+memory tier plus the shared SQLite file) without calling the model.
+
+The key is built from the model, the output schema and the messages. Message
+text is only normalized where that cannot change the answer: whitespace is
+collapsed, and in system prompts the "today is ..." date becomes a
+placeholder. Human and AI text is otherwise kept verbatim, since trip dates,
+budgets ("1.500" vs "1,500") and the like are exactly what these nodes read.
+
+Each node has its own settings (`DEFAULT_NODE_SETTINGS`), overridable per run
+with the `structured_cache` configuration field, keyed by node name or "*" for
+every node.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+
+from react_agent.cache import get_cache, make_key
+from react_agent.configuration import Configuration
+from react_agent.tracing import annotate
+from react_agent.utils import get_message_text
+
+if TYPE_CHECKING:
+    from react_agent.models import ChatModel
+
+STRUCTURED_CACHE = "structured_output"
+
+# The current date as the prompts state it ("Today is ...", "### Today's date:\n...").
+_TODAY = re.compile(r"(today(?:'?s date)?(?: is|:)\s*)\d{4}-\d{2}-\d{2}", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class StructuredCacheSettings:
+    """Whether and for how long one node's structured responses are cached."""
+
+    enabled: bool = False
+    ttl_seconds: float = 3600.0
+    disk_ttl_seconds: float = 24 * 3600.0
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> StructuredCacheSettings:
+        """Build settings from a (possibly partial) dict, ignoring unknown keys."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in values.items() if k in known})
+
+
+DEFAULT_NODE_SETTINGS: dict[str, dict[str, Any]] = {
+    "validate_user_query": {"enabled": True},
+    "update_user_profile": {"enabled": True},
+    "review_itinerary": {"enabled": True, "disk_ttl_seconds": 3600.0},
+    "validate_itinerary": {"enabled": True, "disk_ttl_seconds": 7 * 24 * 3600.0},
+}
+
+
+def settings_for(
+    node: str, overrides: Optional[dict[str, dict[str, Any]]] = None
+) -> StructuredCacheSettings:
+    """Merge the default settings for `node` with the "*" and per-node overrides."""
+    overrides = overrides or {}
+    values = {
+        **DEFAULT_NODE_SETTINGS.get(node, {}),
+        **(overrides.get("*") or {}),
+        **(overrides.get(node) or {}),
+    }
+    return StructuredCacheSettings.from_dict(values)
+
+
+def normalize_message(message: BaseMessage) -> tuple[str, str]:
+    """Return a message's type and its text with volatile details removed.
+
+    Only whitespace is normalized, plus the current date in system prompts;
+    anything else may change the response.
+    """
+    text = get_message_text(message)
+    if message.type == "system":
+        text = _TODAY.sub(r"\1<today>", text)
+    return message.type, _WHITESPACE.sub(" ", text).strip()
+
+
+def model_id(llm: ChatModel) -> str:
+    """Return a name identifying the model behind `llm`, looking through wrappers."""
+    model = getattr(llm, "runnable", llm)
+    model = getattr(model, "inner", model)
+    return str(
+        getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+    )
+
+
+def structured_key(llm: ChatModel, schema: Any, messages: Sequence[BaseMessage]) -> str:
+    """Return the cache key for a structured-output request."""
+    if hasattr(schema, "model_json_schema"):
+        schema = schema.model_json_schema()
+    return make_key(model_id(llm), schema, [normalize_message(m) for m in messages])
+
+
+def invoke_structured(
+    llm: ChatModel,
+    schema: Any,
+    messages: Sequence[BaseMessage],
+    node: str,
+    config: Optional[RunnableConfig] = None,
+) -> Any:
+    """Call `llm.with_structured_output(schema)` unless the cache has the answer.
+
+    Only JSON-serializable, non-empty responses are stored.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    settings = settings_for(node, configuration.structured_cache)
+    runnable = llm.with_structured_output(schema)
+    if not settings.enabled:
+        return runnable.invoke(list(messages))
+
+    cache = get_cache(STRUCTURED_CACHE, disk_path=configuration.cache_path)
+    key = structured_key(llm, schema, messages)
+    cached = cache.get(key, ttl=settings.ttl_seconds)
+    if cached is not None:
+        annotate(cache="hit")
+        return cached
+
+    annotate(cache="miss")
+    response = runnable.invoke(list(messages))
+    if isinstance(response, dict) and response:
+        cache.set(key, response, ttl=settings.ttl_seconds, disk_ttl=settings.disk_ttl_seconds)
+    return response
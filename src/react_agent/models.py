@@ -0,0 +1,112 @@
+"""Per-node chat model selection with cached instances and fallbacks.
+
+Every node used to share one hard-coded flagship model, so short
+classification calls paid flagship latency too. These are the intake check in
+`validate_user_query` and the approval check in `validate_itinerary`. Now
+each node's model comes from `Configuration`:
+
+- `node_models[node]` names a node's model, on top of `DEFAULT_NODE_MODELS`;
+- other nodes use `Configuration.model`;
+- `model_fallbacks`, and then `Configuration.model`, are tried in order when
+  a model raises, which includes hitting `model_timeout`.
+
+Models are named "provider/model-name" (or just "model-name" for the
+provider to be inferred) and built with `init_chat_model`, so any provider
+LangChain supports works once its integration package is installed. Each
+model is built once per process and reused.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING, Any, Optional, Sequence, Union
+
+from langchain_core.runnables import RunnableWithFallbacks, ensure_config
+
+from react_agent.cassette import replay_model_kwargs, wrap_chat_model
+from react_agent.configuration import Configuration
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+# Cheap classification steps that do not need the flagship model.
+DEFAULT_NODE_MODELS = {
+    "validate_user_query": "openai/gpt-4o-mini",
+    "validate_itinerary": "openai/gpt-4o-mini",
+}
+
+# Providers whose chat models report token usage when streaming only if asked.
+_STREAM_USAGE_PROVIDERS = {"openai", "azure_openai", "anthropic"}
+
+
+class ModelFallbacks(RunnableWithFallbacks[Any, Any]):
+    """A chat model with fallbacks that keeps them through `bind_tools` and the like.
+
+    `RunnableWithFallbacks` finds such methods from their return type hints,
+    which fails for models using `BaseChatModel.with_structured_output`.
+    """
+
+    def _chained(self, name: str, *args: Any, **kwargs: Any) -> ModelFallbacks:
+        return self.__class__(
+            runnable=getattr(self.runnable, name)(*args, **kwargs),
+            fallbacks=[getattr(fallback, name)(*args, **kwargs) for fallback in self.fallbacks],
+            exceptions_to_handle=self.exceptions_to_handle,
+        )
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> ModelFallbacks:
+        """Bind `tools` to the model and to each fallback."""
+        return self._chained("bind_tools", tools, **kwargs)
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> ModelFallbacks:
+        """Ask the model and each fallback for output matching `schema`."""
+        return self._chained("with_structured_output", schema, **kwargs)
+
+
+# What `model_for` returns: a chat model, or one with fallbacks.
+ChatModel = Union["BaseChatModel", ModelFallbacks]
+
+
+def split_model(spec: str) -> tuple[Optional[str], str]:
+    """Split "provider/model-name" into its provider (None if absent) and model name."""
+    provider, _, name = spec.partition("/")
+    return (provider, name) if name else (None, spec)
+
+
+@cache
+def chat_model(spec: str, timeout: Optional[float] = None) -> BaseChatModel:
+    """Return the chat model named by `spec`, creating it on first use.
+
+    Building a model imports the provider SDK and reads its API key, so it is
+    deferred until a node actually runs instead of happening at import time.
+    """
+    from langchain.chat_models import init_chat_model
+
+    provider, name = split_model(spec)
+    kwargs = {**replay_model_kwargs()}
+    if provider in _STREAM_USAGE_PROVIDERS:
+        kwargs["stream_usage"] = True
+    if timeout:
+        kwargs["timeout"] = timeout
+    return wrap_chat_model(init_chat_model(name, model_provider=provider, **kwargs))
+
+
+def model_chain(node: Optional[str], configuration: Configuration) -> list[str]:
+    """Return the models to try for `node`, in order and without repeats."""
+    routes = {**DEFAULT_NODE_MODELS, **configuration.node_models}
+    primary = routes.get(node or "", configuration.model)
+    return list(dict.fromkeys([primary, *configuration.model_fallbacks, configuration.model]))
+
+
+def model_for(node: Optional[str] = None, configuration: Optional[Configuration] = None) -> ChatModel:
+    """Return the model for `node`, falling back along its `model_chain` on errors.
+
+    Without arguments, the node and configuration are those of the graph node
+    that is running.
+    """
+    config = ensure_config()
+    node = node or config.get("metadata", {}).get("langgraph_node")
+    configuration = configuration or Configuration.from_runnable_config(config)
+    models = [chat_model(spec, configuration.model_timeout) for spec in model_chain(node, configuration)]
+    if len(models) == 1:
+        return models[0]
+    return ModelFallbacks(runnable=models[0], fallbacks=models[1:])
@@ -0,0 +1,462 @@
+"""Deterministic day planning over the candidate places found during research.
+
+Asking the model to make each day "geographically feasible" is slow and often
+wrong, while every Places result already carries coordinates. This module
+groups the candidate places into one geographic cluster per trip day before
+`format_itinerary` runs, so the model only has to write up days that are
+already compact and evenly loaded.
+
+Clustering is a balanced k-medoids over a haversine distance matrix:
+
+1. farthest-first seeding picks `days` well-spread medoids;
+2. places are assigned nearest-medoid first, subject to a per-day cap on the
+   number of places and on their estimated cost;
+3. each day's medoid moves to the member with the smallest total distance to
+   the rest, and steps 2-3 repeat until the medoids stop changing.
+
+Once the model has written up the days, `plan_routes` orders each day's
+attractions and dining to minimise travel (nearest-neighbour seed, then 2-opt,
+keeping to the opening hours the Places results carry) and attaches an
+estimated travel time to every leg.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import numpy as np
+from langchain_core.messages import BaseMessage, ToolMessage
+
+from react_agent.projection import project_place
+from react_agent.registry import place_registry
+
+EARTH_RADIUS_KM = 6371.0088
+
+PRICE_LEVEL_COST: dict[str, float] = {
+    "free": 0.0,
+    "inexpensive": 1.0,
+    "moderate": 2.0,
+    "expensive": 3.0,
+    "very_expensive": 4.0,
+}
+DEFAULT_PLACE_COST = 1.0
+
+_PLACES_TOOLS = ("query_google_places", "lookup_places")
+
+
+@dataclass
+class DayCluster:
+    """Places assigned to one trip day."""
+
+    day_number: int
+    places: list[dict[str, Any]] = field(default_factory=list)
+    cost: float = 0.0
+    spread_km: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cluster as a plain dict."""
+        return {
+            "day_number": self.day_number,
+            "places": self.places,
+            "cost": self.cost,
+            "spread_km": round(self.spread_km, 2),
+        }
+
+
+def haversine_matrix(
+    lat: np.ndarray,
+    lng: np.ndarray,
+    other_lat: Optional[np.ndarray] = None,
+    other_lng: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Return great-circle distances in km between two sets of points (degrees).
+
+    Without `other_lat`/`other_lng` the full pairwise matrix of the first set is
+    returned.
+    """
+    lat1 = np.radians(np.asarray(lat, dtype=np.float64))
+    lng1 = np.radians(np.asarray(lng, dtype=np.float64))
+    if other_lat is None or other_lng is None:
+        lat2, lng2 = lat1, lng1
+    else:
+        lat2 = np.radians(np.asarray(other_lat, dtype=np.float64))
+        lng2 = np.radians(np.asarray(other_lng, dtype=np.float64))
+    dlat = lat1[:, None] - lat2[None, :]
+    dlng = lng1[:, None] - lng2[None, :]
+    a = (
+        np.sin(dlat / 2) ** 2
+        + np.cos(lat1)[:, None] * np.cos(lat2)[None, :] * np.sin(dlng / 2) ** 2
+    )
+    distances: np.ndarray = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return distances
+
+
+def place_cost(place: dict[str, Any]) -> float:
+    """Return a relative cost weight for a projected place from its price level."""
+    return PRICE_LEVEL_COST.get(str(place.get("price_level") or "").lower(), DEFAULT_PLACE_COST)
+
+
+def _coordinates(places: Sequence[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+    lat = np.fromiter((p["location"]["lat"] for p in places), dtype=np.float64, count=len(places))
+    lng = np.fromiter((p["location"]["lng"] for p in places), dtype=np.float64, count=len(places))
+    return lat, lng
+
+
+def _seed_medoids(distances: np.ndarray, k: int) -> np.ndarray:
+    # Start from the most peripheral place, then repeatedly take the place
+    # farthest from every medoid chosen so far.
+    medoids = [int(np.argmax(distances.sum(axis=1)))]
+    nearest = distances[medoids[0]].copy()
+    for _ in range(1, k):
+        candidate = int(np.argmax(nearest))
+        medoids.append(candidate)
+        np.minimum(nearest, distances[candidate], out=nearest)
+    return np.array(medoids)
+
+
+def _balanced_assign(
+    distances: np.ndarray, medoids: np.ndarray, costs: np.ndarray, cost_slack: float
+) -> np.ndarray:
+    n, k = distances.shape[0], len(medoids)
+    max_count = math.ceil(n / k)
+    max_cost = costs.sum() / k * (1 + cost_slack) + costs.max(initial=0.0)
+    to_medoid = distances[:, medoids]
+
+    labels = np.full(n, -1)
+    counts = np.zeros(k, dtype=int)
+    loads = np.zeros(k)
+    # Visit (place, day) pairs from closest to farthest; each place takes the
+    # closest day that still has room for it.
+    for flat in np.argsort(to_medoid, axis=None, kind="stable"):
+        place, day = divmod(int(flat), k)
+        if labels[place] >= 0 or counts[day] >= max_count:
+            continue
+        if loads[day] + costs[place] > max_cost:
+            continue
+        labels[place] = day
+        counts[day] += 1
+        loads[day] += costs[place]
+
+    # Places that fit nowhere under the cost cap go to the least loaded open day.
+    for place in np.flatnonzero(labels < 0).tolist():
+        open_days = np.flatnonzero(counts < max_count)
+        day = int(open_days[np.argmin(loads[open_days])])
+        labels[place] = day
+        counts[day] += 1
+        loads[day] += costs[place]
+    return labels
+
+
+def cluster_days(
+    places: Sequence[dict[str, Any]],
+    days: int,
+    *,
+    max_iterations: int = 10,
+    cost_slack: float = 0.25,
+) -> list[DayCluster]:
+    """Group projected places with coordinates into `days` compact, balanced days.
+
+    Args:
+        places: Projected places (see `react_agent.projection`); places without a
+            location are ignored.
+        days: Number of trip days.
+        max_iterations: Upper bound on assignment/medoid rounds.
+        cost_slack: How far above an even share of the estimated cost a day may go.
+    """
+    located = [p for p in places if p.get("location")]
+    days = max(1, int(days))
+    if not located:
+        return [DayCluster(day + 1) for day in range(days)]
+
+    lat, lng = _coordinates(located)
+    distances = haversine_matrix(lat, lng)
+    costs = np.array([place_cost(p) for p in located])
+    k = min(days, len(located))
+
+    medoids = _seed_medoids(distances, k)
+    for _ in range(max_iterations):
+        labels = _balanced_assign(distances, medoids, costs, cost_slack)
+        updated = medoids.copy()
+        for day in range(k):
+            members = np.flatnonzero(labels == day)
+            if len(members):
+                within = distances[np.ix_(members, members)].sum(axis=1)
+                updated[day] = members[int(np.argmin(within))]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+
+    # Number days west to east so consecutive days are also close to each other.
+    order = np.argsort(lng[medoids], kind="stable")
+    clusters = []
+    for day_number, day in enumerate(order, start=1):
+        members = np.flatnonzero(labels == day)
+        spread = float(distances[np.ix_(members, members)].max()) if len(members) else 0.0
+        clusters.append(
+            DayCluster(
+                day_number=day_number,
+                places=[located[i] for i in members],
+                cost=float(costs[members].sum()),
+                spread_km=spread,
+            )
+        )
+    clusters.extend(DayCluster(day + 1) for day in range(k, days))
+    return clusters
+
+
+@dataclass
+class Leg:
+    """Travel between two consecutive stops of a day."""
+
+    origin: str
+    destination: str
+    distance_km: float
+    travel_minutes: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the leg in the itinerary's `route` format."""
+        return {
+            "from": self.origin,
+            "to": self.destination,
+            "distance_km": round(self.distance_km, 2),
+            "travel_minutes": round(self.travel_minutes),
+        }
+
+
+@dataclass
+class Route:
+    """Visiting order for one day's stops and the legs between them."""
+
+    order: list[int]
+    legs: list[Leg]
+    late_stops: int = 0
+
+    @property
+    def distance_km(self) -> float:
+        """Total travel distance."""
+        return sum(leg.distance_km for leg in self.legs)
+
+    @property
+    def travel_minutes(self) -> float:
+        """Total travel time."""
+        return sum(leg.travel_minutes for leg in self.legs)
+
+
+def travel_minutes(
+    distances_km: np.ndarray, speed_kmh: float = 25.0, detour: float = 1.3
+) -> np.ndarray:
+    """Estimate door-to-door travel minutes from straight-line distances."""
+    return distances_km * detour / speed_kmh * 60.0
+
+
+def _path_length(order: Sequence[int], minutes: np.ndarray) -> float:
+    return float(minutes[order[:-1], order[1:]].sum()) if len(order) > 1 else 0.0
+
+
+def _late_stops(
+    order: Sequence[int],
+    minutes: np.ndarray,
+    windows: Sequence[Optional[tuple[float, float]]],
+    start_minute: float,
+    dwell_minutes: float,
+) -> int:
+    # Walk the day: wait for places that are not open yet, count the ones
+    # reached after they close.
+    clock, late, previous = start_minute, 0, None
+    for stop in order:
+        if previous is not None:
+            clock += minutes[previous, stop]
+        window = windows[stop]
+        if window is not None:
+            opens, closes = window
+            clock = max(clock, opens)
+            if clock + dwell_minutes > closes:
+                late += 1
+        clock += dwell_minutes
+        previous = stop
+    return late
+
+
+def opening_window(place: dict[str, Any]) -> Optional[tuple[float, float]]:
+    """Return a projected place's daily opening window in minutes after midnight.
+
+    Places without known hours get None. A window that runs past midnight closes
+    after minute 1440.
+    """
+    try:
+        opens, closes = (
+            int(hour) * 60 + int(minute)
+            for hour, minute in (clock.split(":") for clock in str(place["hours"]).split("-"))
+        )
+    except (KeyError, ValueError):
+        return None
+    if closes <= opens:
+        closes += 24 * 60
+    return float(opens), float(closes)
+
+
+def opening_windows(
+    places: Sequence[dict[str, Any]],
+) -> Optional[list[Optional[tuple[float, float]]]]:
+    """Return `order_route` windows for `places`, or None if no hours are known."""
+    windows = [opening_window(place) for place in places]
+    return windows if any(window is not None for window in windows) else None
+
+
+def _nearest_neighbour(minutes: np.ndarray, start: int) -> list[int]:
+    n = minutes.shape[0]
+    order = [start]
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start] = False
+    for _ in range(n - 1):
+        row = np.where(unvisited, minutes[order[-1]], np.inf)
+        nearest = int(np.argmin(row))
+        order.append(nearest)
+        unvisited[nearest] = False
+    return order
+
+
+def _two_opt(order: list[int], cost: Callable[[Sequence[int]], Any]) -> list[int]:
+    # Open path, so reversing a prefix or suffix is also a valid move.
+    best, best_cost = order, cost(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(best) - 1):
+            for j in range(i + 1, len(best)):
+                candidate = best[:i] + best[i : j + 1][::-1] + best[j + 1 :]
+                candidate_cost = cost(candidate)
+                if candidate_cost < best_cost:
+                    best, best_cost, improved = candidate, candidate_cost, True
+    return best
+
+
+def order_route(
+    places: Sequence[dict[str, Any]],
+    *,
+    windows: Optional[Sequence[Optional[tuple[float, float]]]] = None,
+    start_minute: float = 9 * 60,
+    dwell_minutes: float = 60.0,
+    speed_kmh: float = 25.0,
+) -> Route:
+    """Order one day's stops to minimise travel time.
+
+    The route is an open path seeded by nearest neighbour from every possible
+    start and improved with 2-opt. With `windows` (opening and closing minute of
+    the day per place, or None for no constraint) the number of stops reached
+    after closing is minimised first and travel time second.
+
+    Args:
+        places: Projected places with a `location`.
+        windows: Optional opening-hour window per place, in minutes after midnight.
+        start_minute: When the day starts, in minutes after midnight.
+        dwell_minutes: Time spent at each stop.
+        speed_kmh: Average travel speed used for the time estimates.
+    """
+    n = len(places)
+    if n == 0:
+        return Route(order=[], legs=[])
+    lat, lng = _coordinates(places)
+    distances = haversine_matrix(lat, lng)
+    minutes = travel_minutes(distances, speed_kmh)
+    windows = list(windows) if windows is not None else [None] * n
+
+    constrained = any(window is not None for window in windows)
+
+    def cost(order: Sequence[int]) -> tuple[int, float]:
+        late = 0
+        if constrained:
+            late = _late_stops(order, minutes, windows, start_minute, dwell_minutes)
+        return late, _path_length(order, minutes)
+
+    seeds = [_nearest_neighbour(minutes, start) for start in range(n)]
+    order = _two_opt(min(seeds, key=cost), cost)
+    legs = [
+        Leg(
+            origin=str(places[a].get("name") or places[a].get("id") or ""),
+            destination=str(places[b].get("name") or places[b].get("id") or ""),
+            distance_km=float(distances[a, b]),
+            travel_minutes=float(minutes[a, b]),
+        )
+        for a, b in zip(order, order[1:])
+    ]
+    return Route(order=order, legs=legs, late_stops=cost(order)[0])
+
+
+def _name_key(name: Any) -> str:
+    return " ".join(str(name or "").casefold().split())
+
+
+def plan_routes(
+    itinerary: dict[str, Any], places: Sequence[dict[str, Any]], **kwargs: Any
+) -> dict[str, Any]:
+    """Order each day's attractions and dining by travel time and attach its route.
+
+    Stops are matched to `places` by name; stops without a known location keep
+    their position at the end of their list and are left out of the route. The
+    places' opening hours become the route's windows. Each day gains a `route`
+    list of legs. `kwargs` are passed to `order_route`.
+    """
+    by_name = {_name_key(p.get("name")): p for p in places if p.get("location")}
+    for day in itinerary.get("days") or []:
+        stops = [
+            item for section in ("attractions", "dining") for item in day.get(section) or []
+        ]
+        located = [item for item in stops if _name_key(item.get("name")) in by_name]
+        if len(located) < 2:
+            continue
+        day_places = [by_name[_name_key(item.get("name"))] for item in located]
+        route = order_route(day_places, windows=opening_windows(day_places), **kwargs)
+        rank = {id(located[stop]): position for position, stop in enumerate(route.order)}
+        for section in ("attractions", "dining"):
+            if day.get(section):
+                day[section] = sorted(day[section], key=lambda item: rank.get(id(item), len(rank)))
+        day["route"] = [leg.as_dict() for leg in route.legs]
+    return itinerary
+
+
+def candidate_places(messages: Iterable[BaseMessage]) -> list[dict[str, Any]]:
+    """Collect the distinct places returned by Places tool calls in a message history.
+
+    References to places already listed earlier are resolved through the place
+    registry.
+    """
+    registry = place_registry()
+    found: dict[str, dict[str, Any]] = {}
+    for message in messages:
+        if not isinstance(message, ToolMessage) or message.name not in _PLACES_TOOLS:
+            continue
+        try:
+            payload = json.loads(message.content) if isinstance(message.content, str) else {}
+        except json.JSONDecodeError:
+            continue
+        for place in payload.get("places") or []:
+            if "displayName" in place:
+                place = project_place(place)
+            elif "ref" in place:
+                place = registry.get(place.get("id")) or place
+            if place.get("id") and place.get("location"):
+                found[place["id"]] = place
+    return list(found.values())
+
+
+def render_day_plan(clusters: Sequence[DayCluster]) -> str:
+    """Render day clusters as a compact prompt section."""
+    lines = []
+    for cluster in clusters:
+        lines.append(f"Day {cluster.day_number} (places within {cluster.spread_km:.1f} km):")
+        for place in cluster.places:
+            rating = place.get("rating")
+            hours = place.get("hours")
+            parts = [
+                place.get("type"),
+                place.get("address"),
+                rating and f"rating {rating}",
+                hours and f"open {hours}",
+            ]
+            details = ", ".join(str(value) for value in parts if value)
+            lines.append(f"- {place.get('name')}" + (f" ({details})" if details else ""))
+    return "\n".join(lines)
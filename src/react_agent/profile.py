@@ -0,0 +1,62 @@
+"""Incremental user-profile extraction with field-level provenance.
+
+`update_user_profile` used to send every human message in
+`itinerary_messages` to the model whenever it ran. It runs again after each
+round of itinerary feedback, so over a long session its prompt kept growing.
+With `incremental_profile`, it sends only the human messages after
+`State.profile_cursor` (the id of the last message already extracted),
+together with the current profile. The model returns only the fields those
+messages state or change.
+
+`merge_extracted` merges those fields into the profile. For each field,
+`State.profile_sources` records where the value came from: the id of the
+message it was extracted from (`UNTRACKED_SOURCE` for a message without an
+id), `INTAKE_SOURCE` when the fused intake extracted it, or `DEFAULT_SOURCE`
+for a `USER_SCHEMA` default. A value the user stated is never replaced by a
+default.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from react_agent.intake import merge_profile, with_defaults
+
+DEFAULT_SOURCE = "default"
+INTAKE_SOURCE = "intake"
+UNTRACKED_SOURCE = "message"
+
+
+def new_human_messages(messages: Sequence[BaseMessage], cursor: Optional[str]) -> list[BaseMessage]:
+    """Return the human messages after the message with id `cursor`.
+
+    All human messages are returned when there is no cursor, or when the
+    message it points to is no longer in `messages`.
+    """
+    start = 0
+    if cursor:
+        for index, message in enumerate(messages):
+            if message.id == cursor:
+                start = index + 1
+                break
+    return [message for message in messages[start:] if isinstance(message, HumanMessage)]
+
+
+def merge_extracted(
+    profile: Optional[dict[str, Any]],
+    sources: Optional[dict[str, str]],
+    extracted: Optional[dict[str, Any]],
+    source: str,
+) -> tuple[dict[str, Any], dict[str, str]]:
+    """Merge the fields stated in `extracted` into `profile`, attributing them to `source`.
+
+    Returns the new profile and its sources. Fields that have never been
+    stated get their `USER_SCHEMA` default.
+    """
+    current = dict(profile or {})
+    stated = merge_profile(None, extracted)
+    merged = with_defaults({**current, **stated})
+    defaults = {name: DEFAULT_SOURCE for name in merged if name not in current and name not in stated}
+    return merged, {**defaults, **(sources or {}), **{name: source for name in stated}}
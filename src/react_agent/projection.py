@@ -0,0 +1,198 @@
+"""Compact Google Places payloads before they reach the message history.
+
+A raw `places:searchText` response carries photos, address components,
+opening-hour calendars and full review bodies. None of that helps the research
+agent, yet the whole payload is re-sent to the model on every loop through
+`research_itinerary`. `compact_places` keeps only what the itinerary uses and
+reports how much was saved. Opening hours are reduced to the one window a place
+keeps on every day it opens, which is what route planning needs.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional, cast
+
+from react_agent.utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_PRICE_LEVEL_PREFIX = "PRICE_LEVEL_"
+
+
+@dataclass
+class ProjectionReport:
+    """Size of a Places payload before and after projection."""
+
+    raw_bytes: int
+    projected_bytes: int
+    raw_tokens: int
+    projected_tokens: int
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes removed from the payload."""
+        return self.raw_bytes - self.projected_bytes
+
+    @property
+    def tokens_saved(self) -> int:
+        """Tokens removed from the payload."""
+        return self.raw_tokens - self.projected_tokens
+
+
+@dataclass
+class ProjectionTotals:
+    """Running totals across every projected payload in this process."""
+
+    calls: int = 0
+    raw_bytes: int = 0
+    projected_bytes: int = 0
+    raw_tokens: int = 0
+    projected_tokens: int = 0
+
+    def add(self, report: ProjectionReport) -> None:
+        """Accumulate a single call's report."""
+        self.calls += 1
+        self.raw_bytes += report.raw_bytes
+        self.projected_bytes += report.projected_bytes
+        self.raw_tokens += report.raw_tokens
+        self.projected_tokens += report.projected_tokens
+
+
+PROJECTION_TOTALS = ProjectionTotals()
+
+
+def _text(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        return cast(Optional[str], value.get("text"))
+    return cast(Optional[str], value)
+
+
+def _price_range(price_range: Optional[dict[str, Any]]) -> Optional[str]:
+    if not price_range:
+        return None
+    start = price_range.get("startPrice") or {}
+    end = price_range.get("endPrice") or {}
+    currency = start.get("currencyCode") or end.get("currencyCode") or ""
+    low, high = start.get("units"), end.get("units")
+    if low and high:
+        return f"{currency} {low}-{high}".strip()
+    if low or high:
+        return f"{currency} {low or high}".strip()
+    return None
+
+
+def _clock(minutes: int) -> str:
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+
+
+def _opening_hours(hours: Optional[dict[str, Any]]) -> Optional[str]:
+    # Span of each weekday's periods, then the part of it shared by every day
+    # the place opens. Always-open places have a period without a close.
+    spans: dict[int, tuple[int, int]] = {}
+    for period in (hours or {}).get("periods") or []:
+        start, end = period.get("open"), period.get("close")
+        if not start or not end:
+            return None
+        opens = start.get("hour", 0) * 60 + start.get("minute", 0)
+        closes = end.get("hour", 0) * 60 + end.get("minute", 0)
+        closes += (end.get("day", 0) - start.get("day", 0)) % 7 * 24 * 60
+        if closes <= opens:
+            closes += 7 * 24 * 60
+        day = start.get("day", 0)
+        first, last = spans.get(day, (opens, closes))
+        spans[day] = (min(first, opens), max(last, closes))
+    if not spans:
+        return None
+    opens = max(first for first, _ in spans.values())
+    closes = min(last for _, last in spans.values())
+    if closes <= opens or closes - opens >= 24 * 60:
+        return None
+    return f"{_clock(opens)}-{_clock(closes)}"
+
+
+def _review_snippets(reviews: list[dict[str, Any]], max_reviews: int, max_chars: int) -> list[str]:
+    snippets = []
+    for review in reviews[:max_reviews]:
+        text = _text(review.get("originalText")) or _text(review.get("text")) or ""
+        text = " ".join(text.split())
+        if not text:
+            continue
+        if len(text) > max_chars:
+            text = text[: max_chars - 1].rstrip() + "…"
+        rating = review.get("rating")
+        snippets.append(f"{rating}/5: {text}" if rating is not None else text)
+    return snippets
+
+
+def project_place(
+    place: dict[str, Any], max_reviews: int = 2, max_review_chars: int = 200
+) -> dict[str, Any]:
+    """Reduce a single Places record to the fields the itinerary needs."""
+    location = place.get("location") or {}
+    price_level = place.get("priceLevel")
+    if isinstance(price_level, str) and price_level.startswith(_PRICE_LEVEL_PREFIX):
+        price_level = price_level[len(_PRICE_LEVEL_PREFIX) :].lower()
+
+    projected = {
+        "id": place.get("id"),
+        "name": _text(place.get("displayName")),
+        "type": _text(place.get("primaryTypeDisplayName"))
+        or place.get("primaryType")
+        or next(iter(place.get("types") or []), None),
+        "address": place.get("shortFormattedAddress") or place.get("formattedAddress"),
+        "location": {"lat": location["latitude"], "lng": location["longitude"]}
+        if "latitude" in location and "longitude" in location
+        else None,
+        "rating": place.get("rating"),
+        "rating_count": place.get("userRatingCount"),
+        "price_level": price_level,
+        "price_range": _price_range(place.get("priceRange")),
+        "website": place.get("websiteUri"),
+        "maps_url": place.get("googleMapsUri")
+        or (place.get("googleMapsLinks") or {}).get("placeUri"),
+        "vegetarian": place.get("servesVegetarianFood"),
+        "good_for_children": place.get("goodForChildren"),
+        "hours": _opening_hours(place.get("regularOpeningHours")),
+        "reviews": _review_snippets(place.get("reviews") or [], max_reviews, max_review_chars),
+    }
+    return {key: value for key, value in projected.items() if value not in (None, [], "")}
+
+
+def project_places(
+    payload: dict[str, Any], max_reviews: int = 2, max_review_chars: int = 200
+) -> dict[str, Any]:
+    """Project every place in a `places:searchText` response."""
+    return {
+        "places": [
+            project_place(place, max_reviews, max_review_chars)
+            for place in payload.get("places") or []
+        ]
+    }
+
+
+def _size(payload: Any) -> tuple[int, int]:
+    text = json.dumps(payload, ensure_ascii=False)
+    return len(text.encode()), estimate_tokens(text)
+
+
+def compact_places(
+    payload: dict[str, Any], max_reviews: int = 2, max_review_chars: int = 200
+) -> tuple[dict[str, Any], ProjectionReport]:
+    """Project a Places response and measure the bytes and tokens saved."""
+    projected = project_places(payload, max_reviews, max_review_chars)
+    raw_bytes, raw_tokens = _size(payload)
+    projected_bytes, projected_tokens = _size(projected)
+    report = ProjectionReport(raw_bytes, projected_bytes, raw_tokens, projected_tokens)
+    PROJECTION_TOTALS.add(report)
+    logger.debug(
+        "Projected %d places: %d -> %d bytes, %d -> %d tokens",
+        len(projected["places"]),
+        raw_bytes,
+        projected_bytes,
+        raw_tokens,
+        projected_tokens,
+    )
+    return projected, report
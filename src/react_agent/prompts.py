@@ -1,4 +1,19 @@
-"""Prompts used by the agent."""
+"""Prompts used by the agent.
+
+Providers cache the longest prompt prefix they have seen recently, so every
+system prompt is split in two: a static `*_PROMPT` with the instructions (and
+any schema), which is byte-identical for every user and every loop iteration,
+and a `*_CONTEXT` template with the per-user data, appended last by
+`build_prompt`. Keep placeholders out of the `*_PROMPT` strings.
+"""
+
+from react_agent.schemas import ITINERARY_SCHEMA, USER_SCHEMA
+
+
+def build_prompt(prompt: str, context: str, **values: object) -> str:
+    """Return the static `prompt` followed by `context` filled in with `values`."""
+    return prompt + context.format(**values)
+
 
 VALIDATE_INPUT_PROMPT = """
 Your job is to perform the following checks:
@@ -14,31 +29,90 @@ How to response to the user:
 
 Be kind and respectful at all times to the user and keep your responses short. Asking only for what's needed. 
 
-Todays date is {todays_date}
 Respond in a JSON format.
 """
 
-GENERATE_ITINERARY_PROMPT = """
-You are an agent tasked with gathering detailed travel data to create a complete itinerary for a user.
-As well as revise your itinerary based on feedback from human or agent.
+VALIDATE_INPUT_CONTEXT = """
+Todays date is {todays_date}
+"""
 
-YOU MUST USE INVOKE BOTH TOOLS FOR WEB SEARCH AND GOOGLE PLACES SEARCH BEFORE FINAL RESULT.
+UPDATE_PROFILE_PROMPT = f"""
+Use the message history to update the user profile. 
+Do not make any assumptions and be accurate at ALL TIMES.
 
-Here is the user profile.
-### User Profile:
-{USER_PROFILE}
+Here is the schema with its default values:
+{USER_SCHEMA}
 
+Use the default values for the fields if the user hasn't provided theirs.
+Assume all people are adults unless mentioned otherwise.
 
-Here is the itinerary you generated:
-{CURRENT_ITINERARY}
+Make sure to double check if user info doesn't have any typos.
+If currency not given, assume currency of destination.
+"""
 
+UPDATE_PROFILE_CONTEXT = """
+Today is {todays_date}
+"""
 
-Here are is the feedback from the reviewer agent (if any) of your itinerary.
-Use this feedback to revise your itinerary only.
-DO NOT PROVIDE FEEDBACK BACK
-### Feedback:
-{FEEDBACK}
+PROFILE_UPDATE_PROMPT = """
+Update the user's travel profile from their latest messages.
+
+You get the profile as it is now and only the messages the user has sent since it was last updated.
+Return only the fields these messages state or change, using the schema's field names.
+Leave out every other field: it keeps its current value. If nothing changes, return an empty object.
+
+Do not make any assumptions and be accurate at ALL TIMES.
+Assume all people are adults unless mentioned otherwise.
+If the destination changes and no currency is given, use the currency of the new destination.
+Make sure to double check if user info doesn't have any typos.
+"""
 
+PROFILE_UPDATE_CONTEXT = """
+Current profile:
+{PROFILE}
+
+Today is {todays_date}
+"""
+
+INTAKE_PROMPT = """
+You are the intake step of a travel planner. In one answer, check the user's request and extract their travel profile.
+
+Checks:
+- The request must be about travelling.
+- The trip needs a destination, a budget and a number of days. The number of people is useful too.
+
+Profile:
+- Fill `profile` with what the user has said in the whole conversation, using the schema's field names.
+- Leave out anything the user has not said. Do not guess and do not use defaults.
+- Assume all people are adults unless mentioned otherwise. If the currency is not given, assume the currency of the destination.
+- Make sure to double check the user's info for typos.
+
+How to respond:
+- Set is_valid to true only when the request is about travelling and the destination, budget and number of days are all known.
+- Otherwise write response_message. If they start with a greeting, greet them back with a fun fact about Sri Lankan tourist attractions only the first time.
+- Ask only for the details listed as missing below, without using the words required or optional.
+
+Be kind and respectful at all times to the user and keep your responses short.
+
+Respond in a JSON format.
+"""
+
+INTAKE_CONTEXT = """
+Profile known so far:
+{PROFILE}
+
+Still missing: {MISSING}
+
+Today is {todays_date}
+"""
+
+GENERATE_ITINERARY_PROMPT = """
+You are an agent tasked with gathering detailed travel data to create a complete itinerary for a user.
+As well as revise your itinerary based on feedback from human or agent.
+
+YOU MUST USE INVOKE BOTH TOOLS FOR WEB SEARCH AND GOOGLE PLACES SEARCH BEFORE FINAL RESULT.
+
+The user profile, the itinerary you generated so far and the reviewer's feedback are at the end of these instructions.
 
 ### Steps:
 1. **User Query Understanding**:
@@ -123,18 +197,78 @@ Day 2:
 - Do **not** structure this in JSON format yet. This is the raw data that will be passed to the summarizer.
 - Keep the data in an easy-to-read, human-readable format (you can use bullet points or numbered lists for easy understanding).
 - FORMAT THE final response in <FINAL_OUTPUT></FINAL_OUTPUT> tags to signal the final response ALWAYS.
+"""
+
+GENERATE_ITINERARY_CONTEXT = """
+Here is the user profile.
+### User Profile:
+{USER_PROFILE}
+
+
+Here is the itinerary you generated:
+{CURRENT_ITINERARY}
+
+
+Here are is the feedback from the reviewer agent (if any) of your itinerary.
+Use this feedback to revise your itinerary only.
+DO NOT PROVIDE FEEDBACK BACK
+### Feedback:
+{FEEDBACK}
+
+
+### Today's date:
+{todays_date}
+"""
+
+RESEARCH_CATEGORY_PROMPT = """
+You are one of several research agents gathering travel data in parallel for the same trip.
+Each agent covers one part of the trip, and sometimes one city; your part is given at the end of these instructions.
+Stay within your part: the other agents cover the rest, and a summarizer combines all the findings afterwards.
+
+Use the web search and Google Places tools to collect accurate, relevant details. You have a limited number
+of tool rounds, so ask for everything you need in as few rounds as possible, calling several tools at once.
+
+For attractions and dining, collect for each place: name, type, location, cost, rating, a short review summary,
+website URL, image URL (from web search, not Google Places) and, for attractions, the seasonal weather and tips.
+For general tips, cover local transportation, must-try dishes, safety, cultural etiquette and useful phrases.
+
+### Final Output Format:
+- Do **not** structure this in JSON format. Keep it human-readable, using bullet points or numbered lists.
+- Suggest enough places for every day of the trip.
+- FORMAT THE final response in <FINAL_OUTPUT></FINAL_OUTPUT> tags to signal the final response ALWAYS.
+"""
+
+RESEARCH_CATEGORY_CONTEXT = """
+### Your part of the research:
+{FOCUS}
 
+### City:
+{CITY}
+
+### User Profile:
+{USER_PROFILE}
+
+Here is the itinerary generated so far (if any):
+{CURRENT_ITINERARY}
+
+Here is the reviewer's feedback on it (if any). Only revise what it asks for:
+{FEEDBACK}
 
 ### Today's date:
 {todays_date}
 """
 
+# What each research sub-agent covers, keyed by category name.
+RESEARCH_CATEGORY_FOCUS = {
+    "attractions": "Attractions: sights, activities and experiences that match the user's preferences.",
+    "dining": "Dining: restaurants and food spots that match the user's budget and dietary needs.",
+    "tips": "General tips: transportation, must-try dishes, safety, cultural etiquette and useful phrases.",
+}
+
 FORMAT_ITINERARY_PROMPT = """
 Your task is to summarize the detailed raw travel data into a structured itinerary for the user.
 
-Here is the user profile for context to keep the users preferences in mind.
-
-{USER_PROFILE} 
+The user profile and the places found during research are at the end of these instructions.
 
 ### Steps:
 1. **Day-by-Day Breakdown**:
@@ -148,7 +282,7 @@ Here is the user profile for context to keep the users preferences in mind.
     - Ensure the total cost of each day's activities (including attractions and dining) aligns with the user's budget. Provide a **rough cost breakdown** for each day in USD or the user's preferred currency.
 
 3. **Daily Structure**:
-    - Distribute activities and dining options evenly across the day (morning, afternoon, and evening). Ensure that the **attractions** and **dining** do not overlap in time and are geographically feasible for the user to visit.
+    - Distribute activities and dining options evenly across the day (morning, afternoon, and evening). Ensure that the **attractions** and **dining** do not overlap in time. Days listed below are already geographically compact and in visiting order, so keep that order.
     
 4. **Tips and Advice**:
     - Include any general **tips** for the destination or specific **tips** for visiting each attraction or dining spot.
@@ -165,17 +299,31 @@ Your output should be a **structured JSON format**.
 Ensure that all the required information (attractions, dining, tips, etc.) is included in the output.
 """
 
+FORMAT_ITINERARY_CONTEXT = """
+Here is the user profile for context to keep the users preferences in mind.
+
+{USER_PROFILE} 
+
+Here are the places found during research, already grouped into nearby places per day.
+Keep each group on its day and do not move places between days unless the user profile requires it.
+Places are listed in visiting order; travel times between them are added after you respond.
+If no groups are listed, group the places by day yourself.
+
+{DAY_PLAN}
+"""
+
+FORMAT_DAYS_CONTEXT = """
+Only write days {FIRST_DAY} to {LAST_DAY} of this {TRIP_DAYS}-day trip; the other days are written separately.
+Number them {FIRST_DAY} to {LAST_DAY}, set trip_duration to {TRIP_DAYS}, and leave places planned for other days to them.
+"""
+
 REFLECTION_ITINERARY_PROMPT = """
 You are tasked with evaluating the output of the generated travel itinerary based on the user’s profile/query.
 
-Here is the user profile:
-{USER_PROFILE}
-
 Here is what the ITINERARY_SCHEMA is supposed to look like:
-{ITINERARY_SCHEMA}
+""" + str(ITINERARY_SCHEMA) + """
 
-Here is what the feedback of the final itinerary from the user looks like:
-{PREVIOUS_FEEDBACK}
+The user profile and the user's feedback on the previous itinerary are at the end of these instructions.
 
 
 ### Points to Reflect On:
@@ -209,6 +357,14 @@ Here is what the feedback of the final itinerary from the user looks like:
 - If needed, suggest **adjustments to the activities** or **rearranging the itinerary** to better fit the user’s budget, preferences, or time constraints.
 """
 
+REFLECTION_ITINERARY_CONTEXT = """
+Here is the user profile:
+{USER_PROFILE}
+
+Here is what the feedback of the final itinerary from the user looks like:
+{PREVIOUS_FEEDBACK}
+"""
+
 USER_ACCOMODATIONS_INPUT_PROMPT = """
 Your job is to get additional information from the user to help with searching accomodations/hotels.
 
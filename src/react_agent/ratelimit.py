@@ -0,0 +1,261 @@
+"""Per-upstream rate limiting with adaptive concurrency.
+
+Each upstream (Google Places, Tavily, Booking) and API key pair gets its own
+`UpstreamLimiter`, made of:
+
+- a token bucket that spaces requests to the configured rate and burst, and
+- an AIMD concurrency window that halves on every 429 and grows by roughly one
+  slot per round trip while latency stays under target.
+
+Callers are admitted in arrival order. A throttled request is not surfaced as an
+error: the limiter backs off (honouring `Retry-After` when the upstream sends
+one) and tries again, giving up only after `max_attempts`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Throttled(Exception):
+    """Raised by a request function when the upstream answered 429."""
+
+    def __init__(self, retry_after: Optional[float] = None) -> None:
+        """Record the upstream's requested back-off, if it sent one."""
+        super().__init__(f"throttled (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request is still throttled after every allowed attempt."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a `Retry-After` header given in seconds."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class LimiterSettings:
+    """Quota and back-off settings for one upstream."""
+
+    rate: float = 10.0
+    burst: int = 10
+    max_concurrency: int = 16
+    min_concurrency: int = 1
+    latency_target: float = 5.0
+    max_attempts: int = 6
+    base_backoff: float = 0.5
+    max_backoff: float = 30.0
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> LimiterSettings:
+        """Build settings from a (possibly partial) dict, ignoring unknown keys."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in values.items() if k in known})
+
+
+DEFAULT_LIMITS: dict[str, dict[str, Any]] = {
+    "google_places": {"rate": 10.0, "burst": 10, "max_concurrency": 16},
+    "tavily": {"rate": 5.0, "burst": 5, "max_concurrency": 8},
+    "booking": {"rate": 5.0, "burst": 5, "max_concurrency": 4},
+}
+
+
+class TokenBucket:
+    """Token bucket implemented as virtual scheduling, so waiters stay in FIFO order."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Allow `rate` requests per second with bursts of up to `burst`."""
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tat = time.monotonic()
+
+    def reserve(self) -> float:
+        """Reserve the next slot and return how long the caller must wait for it."""
+        interval = 1.0 / self.rate
+        now = time.monotonic()
+        self._tat = max(self._tat, now)
+        delay = max(0.0, self._tat - now - (self.burst - 1) * interval)
+        self._tat += interval
+        return delay
+
+    async def acquire(self) -> float:
+        """Wait for a slot; return the time spent waiting."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every future reservation for at least `seconds`."""
+        interval = 1.0 / self.rate
+        resume = time.monotonic() + seconds + (self.burst - 1) * interval
+        self._tat = max(self._tat, resume)
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency window with a FIFO wait queue."""
+
+    def __init__(self, settings: LimiterSettings) -> None:
+        """Start with the full configured window."""
+        self.settings = settings
+        self.limit = float(settings.max_concurrency)
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    async def acquire(self) -> None:
+        """Take a slot, queueing behind earlier callers when the window is full."""
+        if not self._waiters and self.active < int(self.limit):
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled; give it back.
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        """Return a slot and admit queued callers that now fit the window."""
+        self.active -= 1
+        self._wake()
+
+    def on_success(self, latency: float) -> None:
+        """Grow additively while latency is on target, shrink gently when it is not."""
+        if latency > self.settings.latency_target:
+            self.limit = max(self.settings.min_concurrency, self.limit * 0.9)
+        else:
+            self.limit = min(self.settings.max_concurrency, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def on_throttle(self) -> None:
+        """Halve the window after a 429."""
+        self.limit = max(self.settings.min_concurrency, self.limit / 2)
+
+    def _wake(self) -> None:
+        while self._waiters and self.active < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+
+@dataclass
+class LimiterStats:
+    """Counters for one limiter."""
+
+    requests: int = 0
+    throttled: int = 0
+    failures: int = 0
+    queued_seconds: float = 0.0
+
+
+class UpstreamLimiter:
+    """Rate and concurrency limiter for a single upstream and API key."""
+
+    def __init__(self, name: str, settings: LimiterSettings) -> None:
+        """Create a limiter with a full bucket and window."""
+        self.name = name
+        self.settings = settings
+        self.bucket = TokenBucket(settings.rate, settings.burst)
+        self.concurrency = AdaptiveConcurrency(settings)
+        self.stats = LimiterStats()
+
+    def configure(self, settings: LimiterSettings) -> None:
+        """Apply new settings without losing the learned window."""
+        if settings == self.settings:
+            return
+        self.settings = settings
+        self.bucket.rate, self.bucket.burst = settings.rate, max(1, settings.burst)
+        self.concurrency.settings = settings
+        self.concurrency.limit = min(
+            max(self.concurrency.limit, settings.min_concurrency), settings.max_concurrency
+        )
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn` within the quota, retrying with back-off while it is throttled."""
+        settings = self.settings
+        for attempt in range(settings.max_attempts):
+            started = time.monotonic()
+            await self.bucket.acquire()
+            await self.concurrency.acquire()
+            self.stats.queued_seconds += time.monotonic() - started
+            self.stats.requests += 1
+            sent = time.monotonic()
+            try:
+                result = await fn()
+            except Throttled as exc:
+                self.stats.throttled += 1
+                self.concurrency.on_throttle()
+                backoff = exc.retry_after
+                if backoff is None:
+                    backoff = min(settings.max_backoff, settings.base_backoff * 2**attempt)
+                    backoff *= random.uniform(0.5, 1.0)
+                self.bucket.pause(backoff)
+                continue
+            finally:
+                self.concurrency.release()
+            self.concurrency.on_success(time.monotonic() - sent)
+            return result
+
+        self.stats.failures += 1
+        raise RateLimitExceeded(
+            f"{self.name} still throttled after {settings.max_attempts} attempts"
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return counters and the current window for monitoring."""
+        return {
+            **asdict(self.stats),
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "active": self.concurrency.active,
+            "queued": len(self.concurrency._waiters),
+        }
+
+
+_limiters: dict[tuple[str, str], UpstreamLimiter] = {}
+
+
+def settings_for(
+    upstream: str, overrides: Optional[dict[str, dict[str, Any]]] = None
+) -> LimiterSettings:
+    """Merge the default limits for `upstream` with per-run overrides."""
+    values = {**DEFAULT_LIMITS.get(upstream, {}), **((overrides or {}).get(upstream) or {})}
+    return LimiterSettings.from_dict(values)
+
+
+def get_limiter(
+    upstream: str, api_key: Optional[str], settings: Optional[LimiterSettings] = None
+) -> UpstreamLimiter:
+    """Return the process-wide limiter for an upstream and API key."""
+    key_id = hashlib.sha256((api_key or "").encode()).hexdigest()[:12]
+    settings = settings or settings_for(upstream)
+    limiter = _limiters.get((upstream, key_id))
+    if limiter is None:
+        limiter = _limiters[(upstream, key_id)] = UpstreamLimiter(upstream, settings)
+    else:
+        limiter.configure(settings)
+    return limiter
+
+
+def limiter_stats() -> dict[str, dict[str, Any]]:
+    """Return counters for every limiter, keyed by upstream and hashed API key."""
+    return {f"{name}:{key_id}": limiter.snapshot() for (name, key_id), limiter in _limiters.items()}
+
@@ -0,0 +1,174 @@
+"""Local registry of Google Places records keyed by place id.
+
+The same place comes back from many different queries ("cafes in Colombo",
+"things to do near Galle Face", ...). Every copy is serialized into a
+ToolMessage and read again by the model. The registry keeps one normalized
+record per place id and remembers which places each conversation thread has
+already been shown, so repeats can be replaced by a compact reference.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterable, Optional
+
+from react_agent.projection import project_place
+
+
+@dataclass
+class PlaceRecord:
+    """A normalized place and when it was first seen and last refreshed."""
+
+    id: str
+    data: dict[str, Any]
+    first_seen: float = field(default_factory=time.time)
+    last_refreshed: float = field(default_factory=time.time)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record as a plain dict."""
+        return {
+            **self.data,
+            "first_seen": self.first_seen,
+            "last_refreshed": self.last_refreshed,
+        }
+
+
+@dataclass
+class RegistryStats:
+    """Counters describing how much duplication the registry removed."""
+
+    places_seen: int = 0
+    references: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+    @property
+    def dedupe_rate(self) -> float:
+        """Share of returned places replaced by a reference."""
+        return self.references / self.places_seen if self.places_seen else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a plain dict."""
+        return {**asdict(self), "dedupe_rate": round(self.dedupe_rate, 3)}
+
+
+def _is_projected(place: dict[str, Any]) -> bool:
+    # Raw Places records carry `displayName`; projected ones carry `name` as text.
+    return "displayName" not in place
+
+
+def reference(record: PlaceRecord) -> dict[str, Any]:
+    """Return the compact stand-in used for a place the thread has already seen."""
+    return {
+        "id": record.id,
+        "name": record.data.get("name"),
+        "ref": "already listed earlier in this conversation",
+    }
+
+
+class PlaceRegistry:
+    """Normalized place records plus the set of place ids each thread has seen."""
+
+    def __init__(self, max_places: int = 10_000, max_threads: int = 1024) -> None:
+        """Create an empty registry with LRU bounds on places and threads."""
+        self.max_places = max_places
+        self.max_threads = max_threads
+        self.stats = RegistryStats()
+        self._records: OrderedDict[str, PlaceRecord] = OrderedDict()
+        self._seen: OrderedDict[str, set[str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of places held."""
+        return len(self._records)
+
+    def upsert(self, place: dict[str, Any]) -> Optional[PlaceRecord]:
+        """Add or refresh a place (raw or projected); return its record."""
+        data = place if _is_projected(place) else project_place(place)
+        place_id = data.get("id")
+        if not place_id:
+            return None
+        with self._lock:
+            record = self._records.get(place_id)
+            if record is None:
+                record = self._records[place_id] = PlaceRecord(place_id, data)
+            else:
+                record.data = data
+                record.last_refreshed = time.time()
+            self._records.move_to_end(place_id)
+            while len(self._records) > self.max_places:
+                self._records.popitem(last=False)
+            return record
+
+    def get(self, place_id: str) -> Optional[dict[str, Any]]:
+        """Return a single place record, or None if unknown."""
+        record = self._records.get(place_id)
+        return record.as_dict() if record else None
+
+    def get_many(self, place_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Return every known place among `place_ids`, keyed by id."""
+        return {
+            place_id: record.as_dict()
+            for place_id in place_ids
+            if (record := self._records.get(place_id)) is not None
+        }
+
+    def dedupe(self, places: list[dict[str, Any]], thread_id: Optional[str]) -> list[dict[str, Any]]:
+        """Register `places` and swap the ones `thread_id` has already seen for references."""
+        result = []
+        with self._lock:
+            seen = self._seen.setdefault(thread_id, set()) if thread_id else set()
+            if thread_id:
+                self._seen.move_to_end(thread_id)
+                while len(self._seen) > self.max_threads:
+                    self._seen.popitem(last=False)
+
+        for place in places:
+            record = self.upsert(place)
+            if record is None:
+                result.append(place)
+                continue
+            if record.id in seen:
+                result.append(reference(record))
+                self.stats.references += 1
+            else:
+                seen.add(record.id)
+                result.append(place)
+            self.stats.places_seen += 1
+
+        self.stats.bytes_before += len(json.dumps(places, ensure_ascii=False).encode())
+        self.stats.bytes_after += len(json.dumps(result, ensure_ascii=False).encode())
+        return result
+
+    def forget_thread(self, thread_id: str) -> None:
+        """Forget which places `thread_id` has seen."""
+        with self._lock:
+            self._seen.pop(thread_id, None)
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by records, as their serialized size."""
+        return sum(
+            len(json.dumps(record.data, ensure_ascii=False).encode()) + 64
+            for record in list(self._records.values())
+        ) + sum(len(ids) * 64 for ids in list(self._seen.values()))
+
+
+_registry = PlaceRegistry()
+
+
+def place_registry() -> PlaceRegistry:
+    """Return the process-wide place registry."""
+    return _registry
+
+
+def registry_stats() -> dict[str, Any]:
+    """Return dedupe counters and the registry's size."""
+    return {
+        **_registry.stats.as_dict(),
+        "places": len(_registry),
+        "memory_bytes": _registry.memory_bytes(),
+    }
@@ -0,0 +1,101 @@
+"""Split research into concurrent sub-agents, one per category and city.
+
+`research_itinerary` is one ReAct loop that looks up attractions, dining and
+general tips in turn, one tool round after another. When
+`research_categories` is set, `update_user_profile` (and a review asking for
+changes) instead sends one `research_category` run per category, and per city
+with `research_split_cities`. Each run is a small sub-agent graph with its own
+message history, trimmed to `research_history_tokens`, and at most
+`research_tool_rounds` tool rounds. Once the budget is used up, the model is
+asked for its findings without tools. The sub-agents run concurrently, so
+research takes about as long as the slowest one.
+
+`merge_research` adds the sub-agents' tool exchanges to the itinerary
+messages, in category and city order, so `candidate_places` still finds every
+Places result. It then adds one `<FINAL_OUTPUT>` message with all the
+findings, which is what `format_itinerary` reads.
+
+Each sub-agent runs under its own `RESEARCH_SCOPE`, so the tools remember
+what it has been shown (place references, memoized calls) apart from its
+siblings, whose message histories it never sees.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from react_agent.prompts import RESEARCH_CATEGORY_FOCUS
+
+_CITY_SEPARATORS = re.compile(r",|;|/|&|\band\b|\+", re.IGNORECASE)
+_FINAL_OUTPUT = re.compile(r"</?FINAL_OUTPUT>")
+
+# Configurable key naming the sub-agent a tool call comes from, e.g. "dining/Colombo".
+RESEARCH_SCOPE = "research_scope"
+
+
+def split_cities(destination: Any) -> list[str]:
+    """Return the distinct cities named in a destination such as "Colombo and Kandy"."""
+    cities: list[str] = []
+    for part in _CITY_SEPARATORS.split(str(destination or "")):
+        city = " ".join(part.split())
+        if city and city.casefold() not in (c.casefold() for c in cities):
+            cities.append(city)
+    return cities
+
+
+def research_tasks(
+    user_profile: dict[str, Any], categories: Sequence[str], split_by_city: bool = False
+) -> list[dict[str, Any]]:
+    """Return one sub-agent task per category, and per city when `split_by_city` is set.
+
+    Unknown categories are researched with their name as the focus.
+    """
+    destination = (user_profile or {}).get("destination") or ""
+    cities = split_cities(destination) if split_by_city else []
+    if len(cities) < 2:
+        cities = [str(destination)]
+    return [
+        {
+            "category": category,
+            "focus": RESEARCH_CATEGORY_FOCUS.get(category, category),
+            "city": city,
+        }
+        for category in categories
+        for city in cities
+    ]
+
+
+def research_scope(task: Any) -> str:
+    """Return the `RESEARCH_SCOPE` of a sub-agent task."""
+    return f"{task['category']}/{task['city']}"
+
+
+def tool_rounds(messages: Sequence[BaseMessage]) -> int:
+    """Return how many times the model has asked for tools in `messages`."""
+    return sum(1 for m in messages if isinstance(m, AIMessage) and m.tool_calls)
+
+
+def tool_exchanges(messages: Sequence[BaseMessage]) -> list[BaseMessage]:
+    """Return the tool-calling model messages and the tool results that answer them."""
+    return [
+        m for m in messages if isinstance(m, ToolMessage) or (isinstance(m, AIMessage) and m.tool_calls)
+    ]
+
+
+def sort_notes(notes: Sequence[dict[str, Any]], categories: Sequence[str]) -> list[dict[str, Any]]:
+    """Order sub-agent notes by configured category, then city, whatever order they finished in."""
+    rank = {category: index for index, category in enumerate(categories)}
+    return sorted(notes, key=lambda n: (rank.get(n["category"], len(rank)), n["category"], n["city"]))
+
+
+def merge_notes(notes: Sequence[dict[str, Any]], categories: Sequence[str]) -> str:
+    """Join the sub-agents' findings into one `<FINAL_OUTPUT>` research summary."""
+    sections = []
+    for note in sort_notes(notes, categories):
+        title = note["category"].capitalize() + (f" in {note['city']}" if note["city"] else "")
+        findings = _FINAL_OUTPUT.sub("", note["findings"]).strip()
+        sections.append(f"## {title}\n{findings}")
+    return "<FINAL_OUTPUT>\n" + "\n\n".join(sections) + "\n</FINAL_OUTPUT>"
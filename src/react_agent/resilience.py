@@ -0,0 +1,287 @@
+"""Tail-latency control for upstream tool calls: hedging and budgeted retries.
+
+`ToolNode` waits for every tool call before the model runs again, so one slow
+Tavily or Places request stalls the whole research loop. `resilient_call` wraps
+a single upstream call with:
+
+- optional hedging: if the call has not finished after the tool's recent
+  latency percentile, a duplicate is sent and whichever finishes first wins;
+- bounded retries with jittered exponential back-off for transient errors.
+
+Attempts can be run through a rate limiter (`admit`, e.g. `UpstreamLimiter.call`).
+The hedge delay and the latency samples then start once the limiter has
+admitted the attempt, so time spent queueing for quota never triggers a hedge.
+
+Retries and hedges both draw from one process-wide `RetryBudget`, which only
+refills as a fraction of normal traffic. During an outage the budget drains and
+extra attempts stop, so retries cannot amplify the load on a failing upstream.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+import httpx
+
+T = TypeVar("T")
+
+# Runs an attempt once it may be sent, like `UpstreamLimiter.call`.
+Admit = Callable[[Callable[[], Awaitable[T]]], Awaitable[T]]
+
+
+@dataclass(frozen=True)
+class ToolPolicy:
+    """Hedging and retry settings for one tool."""
+
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_delay: float = 0.2
+    hedge_default_delay: float = 2.0
+    hedge_min_samples: int = 20
+    max_retries: int = 2
+    base_backoff: float = 0.2
+    max_backoff: float = 2.0
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> ToolPolicy:
+        """Build a policy from a (possibly partial) dict, ignoring unknown keys."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in values.items() if k in known})
+
+
+DEFAULT_POLICIES: dict[str, dict[str, Any]] = {
+    "tavily_web_search": {"hedge": False, "max_retries": 2},
+    "query_google_places": {"hedge": False, "max_retries": 2},
+}
+
+
+def policy_for(tool: str, overrides: Optional[dict[str, dict[str, Any]]] = None) -> ToolPolicy:
+    """Merge the default policy for `tool` with per-run overrides."""
+    values = {**DEFAULT_POLICIES.get(tool, {}), **((overrides or {}).get(tool) or {})}
+    return ToolPolicy.from_dict(values)
+
+
+class RetryBudget:
+    """Token budget that allows extra attempts as a fraction of normal requests."""
+
+    def __init__(self, ratio: float = 0.1, min_reserve: float = 10.0) -> None:
+        """Earn `ratio` tokens per request, never holding less than `min_reserve` at start."""
+        self.ratio = ratio
+        self.min_reserve = min_reserve
+        self._tokens = min_reserve
+        self._lock = threading.Lock()
+
+    def configure(self, ratio: float, min_reserve: float) -> None:
+        """Update the earn rate and reserve."""
+        with self._lock:
+            self.ratio, self.min_reserve = ratio, min_reserve
+
+    def deposit(self) -> None:
+        """Credit one successful request."""
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, max(self.min_reserve, 1.0) * 10)
+
+    def try_withdraw(self) -> bool:
+        """Take one token for an extra attempt; return False when the budget is spent."""
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available."""
+        return self._tokens
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies for one tool."""
+
+    def __init__(self, window: int = 200) -> None:
+        """Keep the last `window` samples."""
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Add a sample."""
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the `pct` percentile, or None without samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+@dataclass
+class ResilienceStats:
+    """Counters for one tool."""
+
+    calls: int = 0
+    retries: int = 0
+    retries_denied: int = 0
+    hedges_sent: int = 0
+    hedges_won: int = 0
+    hedges_denied: int = 0
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return whether an error is transient enough to retry."""
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status >= 500 or exc.status == 408
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 408
+    if isinstance(exc, (aiohttp.ClientError, httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    # tavily raises its own TimeoutError type that does not subclass the builtin.
+    return type(exc).__name__ == "TimeoutError"
+
+
+_budget = RetryBudget()
+_latencies: dict[str, LatencyTracker] = {}
+_stats: dict[str, ResilienceStats] = {}
+
+
+def retry_budget() -> RetryBudget:
+    """Return the process-wide retry budget."""
+    return _budget
+
+
+def _backoff(policy: ToolPolicy, attempt: int) -> float:
+    # "Full jitter": a uniform delay up to the capped exponential back-off.
+    return random.uniform(0, min(policy.max_backoff, policy.base_backoff * 2**attempt))
+
+
+def hedge_delay(tool: str, policy: ToolPolicy) -> float:
+    """Return how long to wait before hedging a call to `tool`."""
+    tracker = _latencies.get(tool)
+    if tracker is None or len(tracker) < policy.hedge_min_samples:
+        return policy.hedge_default_delay
+    return max(policy.hedge_min_delay, tracker.percentile(policy.hedge_percentile) or 0.0)
+
+
+async def _timed(tool: str, fn: Callable[[], Awaitable[T]]) -> T:
+    started = time.monotonic()
+    result = await fn()
+    _latencies.setdefault(tool, LatencyTracker()).record(time.monotonic() - started)
+    return result
+
+
+async def _attempt(
+    tool: str,
+    fn: Callable[[], Awaitable[T]],
+    admit: Optional[Admit[T]],
+    admitted: Optional[asyncio.Event] = None,
+) -> T:
+    async def send() -> T:
+        if admitted is not None:
+            admitted.set()
+        return await _timed(tool, fn)
+
+    return await (admit(send) if admit is not None else send())
+
+
+async def _hedged(
+    tool: str, fn: Callable[[], Awaitable[T]], policy: ToolPolicy, admit: Optional[Admit[T]]
+) -> T:
+    stats = _stats[tool]
+    admitted = asyncio.Event()
+    primary = asyncio.ensure_future(_attempt(tool, fn, admit, admitted))
+    admission = asyncio.ensure_future(admitted.wait())
+    tasks: set[asyncio.Future[Any]] = {primary, admission}
+    try:
+        await asyncio.wait({primary, admission}, return_when=asyncio.FIRST_COMPLETED)
+        if not primary.done():
+            await asyncio.wait({primary}, timeout=hedge_delay(tool, policy))
+        if primary.done():
+            return primary.result()
+
+        if not _budget.try_withdraw():
+            stats.hedges_denied += 1
+            return await primary
+
+        stats.hedges_sent += 1
+        hedge = asyncio.ensure_future(_attempt(tool, fn, admit))
+        tasks.add(hedge)
+        pending: set[asyncio.Future[Any]] = {primary, hedge}
+        error: BaseException = asyncio.CancelledError()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    continue
+                exc = task.exception()
+                if exc is None:
+                    if task is hedge:
+                        stats.hedges_won += 1
+                    result: T = task.result()
+                    return result
+                error = exc
+        raise error
+    finally:
+        # Also reached when the caller is cancelled: nothing is left running.
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def resilient_call(
+    tool: str,
+    fn: Callable[[], Awaitable[T]],
+    policy: Optional[ToolPolicy] = None,
+    admit: Optional[Admit[T]] = None,
+) -> T:
+    """Call `fn` with the tool's hedging and retry policy.
+
+    Every attempt, hedges included, is run through `admit` when given.
+    """
+    policy = policy or policy_for(tool)
+    stats = _stats.setdefault(tool, ResilienceStats())
+    stats.calls += 1
+
+    attempt = 0
+    while True:
+        try:
+            if policy.hedge:
+                result = await _hedged(tool, fn, policy, admit)
+            else:
+                result = await _attempt(tool, fn, admit)
+        except Exception as exc:
+            if attempt >= policy.max_retries or not is_retryable(exc):
+                raise
+            if not _budget.try_withdraw():
+                stats.retries_denied += 1
+                raise
+            stats.retries += 1
+            await asyncio.sleep(_backoff(policy, attempt))
+            attempt += 1
+            continue
+        _budget.deposit()
+        return result
+
+
+def resilience_stats() -> dict[str, dict[str, Any]]:
+    """Return per-tool counters and recent latency percentiles."""
+    report: dict[str, dict[str, Any]] = {}
+    for tool, stats in _stats.items():
+        tracker = _latencies.get(tool) or LatencyTracker()
+        report[tool] = {
+            **stats.__dict__,
+            "p50_seconds": tracker.percentile(50),
+            "p95_seconds": tracker.percentile(95),
+        }
+    report["retry_budget"] = {"tokens": round(_budget.tokens, 2)}
+    return report
@@ -0,0 +1,271 @@
+"""Deterministic itinerary checks run before the LLM reviewer.
+
+Much of what `review_itinerary` used to ask the model can be checked exactly,
+and far more cheaply:
+
+- the itinerary against `ITINERARY_SCHEMA`, with a validator compiled once
+  from the subset of JSON Schema the repo's schemas use (`compile_schema`);
+- its cost against `user_profile.budget`, taken as the budget for the trip;
+- the number of days, and the attractions and dining options on each day;
+- places that appear more than once.
+
+`check_itinerary` returns `Finding`s. Errors are concrete enough to send back
+to research as feedback without asking the model. Warnings are quality
+questions, such as a cost close to the budget or a day without a cost
+estimate. With the default `llm_review="when_unsure"`, the LLM reflection
+only runs when there are warnings and no errors.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional, Protocol, Sequence
+
+from react_agent.schemas import ITINERARY_SCHEMA
+
+Check = Callable[[Any, str], Iterator[str]]
+
+
+class Validator(Protocol):
+    """A compiled schema, yielding `"path: problem"` messages for a value."""
+
+    def __call__(self, value: Any, path: str = "$") -> Iterator[str]:
+        """Check `value`, found at `path`."""
+        ...
+
+
+_TYPES: dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+def compile_schema(schema: dict[str, Any]) -> Validator:
+    """Compile a JSON schema into a function yielding `"path: problem"` messages.
+
+    Supports `type`, `properties`, `required`, `additionalProperties`,
+    `items`, `minimum`, `maximum`, `pattern` and `oneOf`. Other keywords,
+    such as `format`, are ignored.
+    """
+    checks: list[Check] = []
+
+    kind = schema.get("type")
+    if kind in _TYPES:
+        is_type = _TYPES[kind]
+
+        def check_type(value: Any, path: str) -> Iterator[str]:
+            if not is_type(value):
+                yield f"{path}: expected {kind}, got {type(value).__name__}"
+
+        checks.append(check_type)
+
+    if "minimum" in schema or "maximum" in schema:
+        low, high = schema.get("minimum"), schema.get("maximum")
+
+        def check_range(value: Any, path: str) -> Iterator[str]:
+            if not _TYPES["number"](value):
+                return
+            if low is not None and value < low:
+                yield f"{path}: {value} is below the minimum {low}"
+            if high is not None and value > high:
+                yield f"{path}: {value} is above the maximum {high}"
+
+        checks.append(check_range)
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+
+        def check_pattern(value: Any, path: str) -> Iterator[str]:
+            if isinstance(value, str) and not pattern.search(value):
+                yield f"{path}: {value!r} does not match {pattern.pattern}"
+
+        checks.append(check_pattern)
+
+    if "oneOf" in schema:
+        options = [compile_schema(option) for option in schema["oneOf"]]
+
+        def check_one_of(value: Any, path: str) -> Iterator[str]:
+            matches = sum(1 for option in options if next(option(value, path), None) is None)
+            if matches != 1:
+                yield f"{path}: matches {matches} of the allowed forms instead of exactly one"
+
+        checks.append(check_one_of)
+
+    required = tuple(schema.get("required") or ())
+    properties = {name: compile_schema(sub) for name, sub in (schema.get("properties") or {}).items()}
+    extra = schema.get("additionalProperties")
+    extra_check = compile_schema(extra) if isinstance(extra, dict) else None
+    if required or properties or extra_check or extra is False:
+
+        def check_object(value: Any, path: str) -> Iterator[str]:
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    yield f"{path}: missing required field {name!r}"
+            for name, item in value.items():
+                if name in properties:
+                    yield from properties[name](item, f"{path}.{name}")
+                elif extra is False:
+                    yield f"{path}: unexpected field {name!r}"
+                elif extra_check is not None:
+                    yield from extra_check(item, f"{path}.{name}")
+
+        checks.append(check_object)
+
+    if isinstance(schema.get("items"), dict):
+        item_check = compile_schema(schema["items"])
+
+        def check_items(value: Any, path: str) -> Iterator[str]:
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    yield from item_check(item, f"{path}[{index}]")
+
+        checks.append(check_items)
+
+    def validate(value: Any, path: str = "$") -> Iterator[str]:
+        for check in checks:
+            yield from check(value, path)
+
+    return validate
+
+
+validate_itinerary_schema = compile_schema(ITINERARY_SCHEMA)
+
+
+@dataclass(frozen=True)
+class Finding:
+    """One problem found in an itinerary."""
+
+    code: str
+    message: str
+    severity: str = "error"
+    day: Optional[int] = None
+
+
+def _cost(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = re.search(r"\d+(?:\.\d+)?", value.replace(",", ""))
+        return float(match.group()) if match else None
+    return None
+
+
+def _name_key(item: Any) -> str:
+    name = item.get("name") if isinstance(item, dict) else None
+    return " ".join(str(name or "").casefold().split())
+
+
+def trip_cost(itinerary: dict[str, Any]) -> Optional[float]:
+    """Return the itinerary's estimated cost: its total, else the sum of its days."""
+    total = _cost(itinerary.get("total_estimated_cost"))
+    if total is not None:
+        return total
+    daily = [_cost(day.get("daily_cost_estimate")) for day in itinerary.get("days") or []]
+    if daily and all(cost is not None for cost in daily):
+        return sum(daily)  # type: ignore[arg-type]
+    return None
+
+
+def check_itinerary(
+    itinerary: dict[str, Any],
+    user_profile: Optional[dict[str, Any]] = None,
+    min_attractions: int = 2,
+    min_dining: int = 2,
+    budget_warning_ratio: float = 0.9,
+) -> list[Finding]:
+    """Return the schema, budget, count and duplicate problems of `itinerary`."""
+    if not isinstance(itinerary, dict) or not itinerary:
+        return [Finding("empty", "No itinerary was produced.")]
+    profile = user_profile or {}
+    findings = [Finding("schema", problem) for problem in validate_itinerary_schema(itinerary)]
+
+    days = [day for day in itinerary.get("days") or [] if isinstance(day, dict)]
+    wanted_days = profile.get("number_of_days")
+    if isinstance(wanted_days, int) and len(days) != wanted_days:
+        findings.append(
+            Finding("day_count", f"The trip should have {wanted_days} days but has {len(days)}.")
+        )
+
+    seen: dict[str, int] = {}
+    for index, day in enumerate(days, start=1):
+        number = day.get("day_number", index)
+        attractions = [a for a in day.get("attractions") or [] if isinstance(a, dict)]
+        dining = [d for d in day.get("dining") or [] if isinstance(d, dict)]
+        if len(attractions) < min_attractions:
+            findings.append(Finding(
+                "attractions",
+                f"Day {number} has {len(attractions)} attractions; plan at least {min_attractions}.",
+                day=number,
+            ))
+        if len(dining) < min_dining:
+            findings.append(Finding(
+                "dining",
+                f"Day {number} has {len(dining)} dining options; plan at least {min_dining}.",
+                day=number,
+            ))
+        for item in attractions + dining:
+            key = _name_key(item)
+            if not key:
+                continue
+            if key in seen:
+                findings.append(Finding(
+                    "duplicate",
+                    f"{item.get('name')} is planned on day {seen[key]} and again on day {number}.",
+                    day=number,
+                ))
+            else:
+                seen[key] = number
+        if _cost(day.get("daily_cost_estimate")) is None:
+            findings.append(
+                Finding("daily_cost", f"Day {number} has no cost estimate.", "warning", number)
+            )
+
+    budget = _cost(profile.get("budget"))
+    cost = trip_cost(itinerary)
+    if budget and cost is not None:
+        if cost > budget:
+            findings.append(Finding(
+                "budget", f"The estimated cost {cost:g} is over the budget of {budget:g}."
+            ))
+        elif cost > budget * budget_warning_ratio:
+            findings.append(Finding(
+                "budget",
+                f"The estimated cost {cost:g} leaves little room in the budget of {budget:g}.",
+                "warning",
+            ))
+    return findings
+
+
+def errors(findings: Sequence[Finding]) -> list[Finding]:
+    """Return the findings that must be fixed."""
+    return [finding for finding in findings if finding.severity == "error"]
+
+
+def needs_llm_review(findings: Sequence[Finding], mode: str = "when_unsure") -> bool:
+    """Return whether the LLM reviewer should look at an itinerary with these findings.
+
+    `mode` is "always", "never" or "when_unsure" (only warnings were found).
+    """
+    if mode == "always":
+        return True
+    if mode == "never" or errors(findings):
+        return False
+    return any(finding.severity == "warning" for finding in findings)
+
+
+def render_feedback(findings: Sequence[Finding], limit: int = 20) -> str:
+    """Render findings as reviewer feedback for `research_itinerary`."""
+    lines = [f"- {finding.message}" for finding in findings[:limit]]
+    if len(findings) > limit:
+        lines.append(f"- ... and {len(findings) - limit} more problems of the same kind.")
+    return "Fix these problems in the itinerary:\n" + "\n".join(lines)
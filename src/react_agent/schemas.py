@@ -1,5 +1,7 @@
 """Schemas."""
 
+from typing import Any
+
 REFLECTION_SCHEMA={
   "$schema": "http://json-schema.org/draft-07/schema#",
   "title": "Destination",
@@ -165,7 +167,7 @@ ACCOMMODATION_SCHEMA = {
   ]
 }
 
-USER_SCHEMA = {
+USER_SCHEMA: dict[str, Any] = {
   "title": "user_schema",
   "$schema": "http://json-schema.org/draft-07/schema#",
   "type": "object",
@@ -190,3 +192,39 @@ USER_SCHEMA = {
   },
   "required": ["number_of_people", "budget", "number_of_days", "destination"]
 }
+
+# The profile fields without their defaults, so the model leaves unknown fields out.
+STATED_PROFILE_PROPERTIES = {
+  name: {key: value for key, value in field.items() if key != "default"}
+  for name, field in USER_SCHEMA["properties"].items()
+}
+
+INTAKE_SCHEMA = {
+  "title": "intake_schema",
+  "$schema": "http://json-schema.org/draft-07/schema#",
+  "type": "object",
+  "properties": {
+    "is_valid": {
+      "type": "boolean",
+      "description": "Whether the request is about travelling and gives destination, budget and number of days."
+    },
+    "response_message": {
+      "type": "string",
+      "description": "Only fill if the request is invalid: what to ask the user."
+    },
+    "profile": {
+      "type": "object",
+      "description": "Only the user profile fields the user has stated so far. No defaults or guesses.",
+      "properties": STATED_PROFILE_PROPERTIES
+    }
+  },
+  "required": ["is_valid", "response_message", "profile"]
+}
+
+PROFILE_UPDATE_SCHEMA = {
+  "title": "profile_update_schema",
+  "$schema": "http://json-schema.org/draft-07/schema#",
+  "type": "object",
+  "description": "Only the user profile fields that the new messages state or change.",
+  "properties": STATED_PROFILE_PROPERTIES
+}
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Sequence, List
+from typing import Any, Sequence, List, TypedDict
 
 from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
@@ -11,6 +11,9 @@ from langgraph.managed import IsLastStep
 from typing_extensions import Annotated
 from langchain_core.messages.base import BaseMessage
 
+from react_agent.accounting import merge_usage
+from react_agent.fanout import merge_parts
+
 
 @dataclass
 class InputState:
@@ -31,7 +34,41 @@ class State(InputState):
     """
     
     user_profile: dict = field(default_factory=dict)
+    profile_sources: dict[str, str] = field(default_factory=dict)
+    profile_cursor: str = field(default="")
     user_accomodation: dict = field(default_factory=dict)
     itinerary: dict = field(default_factory=dict)
     itinerary_feedback: str = field(default="")
     iteration_counter: int = field(default=0)
+    review_feedback: str = field(default="")
+    usage: Annotated[dict[str, Any], merge_usage] = field(default_factory=dict)
+    itinerary_parts: Annotated[list[dict[str, Any]], merge_parts] = field(default_factory=list)
+    research_notes: Annotated[list[dict[str, Any]], merge_parts] = field(default_factory=list)
+
+
+class DayChunk(TypedDict):
+    """A range of days sent to `format_days` when the itinerary is formatted in parallel."""
+
+    user_profile: dict[str, Any]
+    research: BaseMessage
+    day_plan: str
+    first_day: int
+    last_day: int
+    trip_days: int
+
+
+class ResearchTask(TypedDict):
+    """The part of the research sent to one `research_category` sub-agent."""
+
+    category: str
+    focus: str
+    city: str
+    user_profile: dict[str, Any]
+    itinerary: dict[str, Any]
+    feedback: str
+
+
+class CategoryState(ResearchTask):
+    """State of a `research_category` sub-agent."""
+
+    messages: Annotated[List[BaseMessage], add_messages]
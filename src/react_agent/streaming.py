@@ -0,0 +1,181 @@
+"""Stream itinerary days to clients while the structured output is generated.
+
+`format_itinerary` asks the model for the whole `ITINERARY_SCHEMA` object at
+once, which for a long trip is the slowest step a user waits on. With
+`invoke_streaming_days` the model streams its output instead. The raw JSON
+text (tool-call argument deltas, or message content for JSON-mode output) is
+fed through `DaysStreamParser`, a single-pass scanner. It hands back each
+entry of the top-level `days` array as soon as that entry's closing brace
+arrives.
+
+Each finished day is written to the graph's custom stream as
+
+    {"type": "itinerary_day", "day_index": 0, "day": {...}}
+
+so it reaches clients using `graph.astream(..., stream_mode="custom")`. The
+event carries the day exactly as the model wrote it. The state update at the
+end of the node is the final itinerary, with route legs and every later
+adjustment.
+
+With `background_review`, the itinerary is shown before it is reviewed. A
+problem the review finds afterwards is written to the same stream as
+`{"type": "itinerary_review", "feedback": "..."}`.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Optional, Sequence
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, ensure_config
+from langchain_core.runnables.config import merge_configs
+
+DAY_EVENT = "itinerary_day"
+REVIEW_EVENT = "itinerary_review"
+
+
+class DaysStreamParser:
+    """Incremental scanner that extracts completed items of a top-level JSON array.
+
+    Text can be fed in arbitrary pieces. Each character is looked at once, and
+    only the text of the item being read is kept. Items are parsed with
+    `json.loads` when they are complete.
+    """
+
+    def __init__(self, key: str = "days") -> None:
+        """Watch the array stored under `key` in the top-level object."""
+        self.key = key
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self.items = 0
+
+    def feed(self, chunk: str) -> list[Any]:
+        """Consume `chunk` and return the array items it completed."""
+        self.text += chunk
+        completed: list[Any] = []
+        text = self.text
+        for pos in range(self._pos, len(text)):
+            char = text[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start : pos]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos + 1
+            elif char == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif char == "," and self._depth == 1:
+                self._current_key = None
+            elif char in "{[":
+                if self._array_depth is not None and self._depth == self._array_depth:
+                    self._item_start = pos
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._current_key == self.key:
+                    self._array_depth = self._depth
+            elif char in "}]":
+                self._depth -= 1
+                if self._array_depth is not None:
+                    if self._depth < self._array_depth:
+                        self._array_depth = None
+                    elif self._depth == self._array_depth and self._item_start is not None:
+                        completed.append(json.loads(text[self._item_start : pos + 1]))
+                        self._item_start = None
+                        self.items += 1
+        # Drop text that no open item or string refers to any more.
+        keep = len(text)
+        if self._item_start is not None:
+            keep = self._item_start
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        self.text = text[keep:]
+        if self._item_start is not None:
+            self._item_start -= keep
+        self._string_start -= keep
+        self._pos = len(self.text)
+        return completed
+
+
+def _delta(chunk: Any, token: str) -> str:
+    message = getattr(chunk, "message", None)
+    tool_call_chunks = getattr(message, "tool_call_chunks", None)
+    if tool_call_chunks:
+        return "".join(c.get("args") or "" for c in tool_call_chunks)
+    return token if isinstance(token, str) else ""
+
+
+class DayStreamHandler(BaseCallbackHandler):
+    """Callback handler that feeds streamed model output through a `DaysStreamParser`."""
+
+    run_inline = True
+
+    def __init__(self, on_day: Callable[[dict[str, Any]], None], key: str = "days") -> None:
+        """Call `on_day` with each completed item of the array under `key`."""
+        self.on_day = on_day
+        self.key = key
+        self._parsers: dict[UUID, DaysStreamParser] = {}
+
+    def on_llm_new_token(
+        self, token: str, *, chunk: Any = None, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Parse one streamed delta."""
+        parser = self._parsers.setdefault(run_id, DaysStreamParser(self.key))
+        text = _delta(chunk, token)
+        if text:
+            for day in parser.feed(text):
+                self.on_day(day)
+
+
+def stream_writer() -> Callable[[Any], None]:
+    """Return the graph's custom stream writer, or a no-op outside a graph run."""
+    try:
+        from langgraph.config import get_stream_writer
+
+        return get_stream_writer()
+    except (ImportError, RuntimeError, KeyError):
+        return lambda chunk: None
+
+
+def invoke_streaming_days(
+    runnable: Runnable[Any, Any],
+    messages: Sequence[BaseMessage],
+    key: str = "days",
+    writer: Optional[Callable[[Any], None]] = None,
+) -> Any:
+    """Invoke a structured-output `runnable`, writing each completed day as it streams.
+
+    Models that cannot stream still work. Their days are written when the
+    response arrives.
+    """
+    write = writer or stream_writer()
+    sent = 0
+
+    def on_day(day: dict[str, Any]) -> None:
+        nonlocal sent
+        write({"type": DAY_EVENT, "day_index": sent, "day": day})
+        sent += 1
+
+    config = merge_configs(ensure_config(), {"callbacks": [DayStreamHandler(on_day, key)]})
+    response = runnable.invoke(list(messages), config, stream=True)
+    if isinstance(response, dict):
+        for day in (response.get(key) or [])[sent:]:
+            on_day(day)
+    return response
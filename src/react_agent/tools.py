@@ -5,23 +5,73 @@ It includes a basic Tavily search function (as an example)
 These tools are intended as free examples to get started. For production use,
 consider implementing more robust and specialized tools tailored to your needs.
 """
+import asyncio
 import os
-from typing import Any, Callable, List, Optional, cast
+from functools import cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, List, Optional
 
-import aiohttp
-import requests
-from exa_py import Exa
-from langchain_community.tools import GooglePlacesTool
-from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import InjectedToolArg, tool
-from tavily import TavilyClient, AsyncTavilyClient
+from langchain_core.tools import InjectedToolArg
 from typing_extensions import Annotated
 
+from react_agent.cache import get_cache, make_key, normalize_query
+from react_agent.cassette import cassette_tool
 from react_agent.configuration import Configuration
+from react_agent.dedupe import dedupe
+from react_agent.http_client import get_session
+from react_agent.projection import compact_places, project_place
+from react_agent.ratelimit import Throttled, get_limiter, parse_retry_after, settings_for
+from react_agent.registry import place_registry
+from react_agent.research import RESEARCH_SCOPE
+from react_agent.resilience import ToolPolicy, policy_for, resilient_call, retry_budget
+from react_agent.tracing import annotate
 
-exa = Exa(api_key=os.environ["EXA_API_KEY"])
-client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+if TYPE_CHECKING:
+    from tavily import AsyncTavilyClient
+
+GOOGLE_PLACES_URL = "https://places.googleapis.com/v1"
+BOOKING_API_URL = "https://booking-com15.p.rapidapi.com/api/v1"
+
+PLACES_FIELD_MASK = "places.attributions,places.id,places.displayName,places.googleMapsLinks,places.formattedAddress,places.businessStatus,places.types,places.location,places.internationalPhoneNumber,places.rating,places.priceLevel,places.priceRange,places.websiteUri,places.userRatingCount,places.websiteUri,places.goodForChildren,places.liveMusic,places.paymentOptions,places.servesBeer,places.servesVegetarianFood,places.regularOpeningHours,places.reviews"
+PLACES_PAGE_SIZE = 5
+PLACES_CACHE = "google_places"
+
+
+@cache
+def get_tavily_client() -> "AsyncTavilyClient":
+    """Return the shared Tavily client, importing and creating it on first use."""
+    from tavily import AsyncTavilyClient
+
+    return AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+
+
+def _thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    """Return the conversation thread id from a run config, if any.
+
+    Research sub-agents each have their own message history, so their id is
+    the thread id plus their `RESEARCH_SCOPE`.
+    """
+    configurable = (config or {}).get("configurable") or {}
+    thread_id = configurable.get("thread_id")
+    if thread_id is None:
+        return None
+    scope = configurable.get(RESEARCH_SCOPE)
+    return f"{thread_id}/{scope}" if scope else str(thread_id)
+
+
+def _tavily_rate_limited(exc: Exception) -> bool:
+    """Return whether a Tavily usage error is a rate limit rather than a spent quota."""
+    if getattr(exc, "retry_after_seconds", None) is not None:
+        return True
+    return "rate limit" in str(exc).lower()
+
+
+def _tool_policy(configuration: Configuration, tool: str) -> ToolPolicy:
+    """Return the hedging and retry policy for `tool` under this run's configuration."""
+    retry_budget().configure(
+        configuration.retry_budget_ratio, configuration.retry_budget_min_reserve
+    )
+    return policy_for(tool, configuration.tool_policies)
 
 
 async def query_google_places(
@@ -42,9 +92,8 @@ async def query_google_places(
       includes the API key and other relevant parameters for the Google Places API.
 
     Returns:
-    - dict: The API response as a dictionary containing a list of places with detailed information.
-      The data includes the place name, location, rating, address, and additional metadata like photos, 
-      links to Google Maps, and business status.
+    - dict: A dictionary containing a list of places. Each place carries its id, name, type, address,
+      location, rating, price, website, Google Maps link and a few short review snippets.
       
     Example:
     >>> query_google_places("Colosseum Rome")
@@ -68,25 +117,247 @@ async def query_google_places(
     - The search includes detailed attributes for each place, including user ratings, pricing details, 
       website URLs, and more.
     """  # noqa: D202, D212, D401
-    async with aiohttp.ClientSession() as session:
-
-        configuration = Configuration.from_runnable_config(config)
+    configuration = Configuration.from_runnable_config(config)
 
-        url = "https://places.googleapis.com/v1/places:searchText"
-        headers = {
-            'X-Goog-Api-Key': configuration.google_places_api_key,
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "X-Goog-FieldMask": "places.attributions,places.id,places.displayName,places.googleMapsLinks,places.formattedAddress,places.businessStatus,places.types,places.location,places.internationalPhoneNumber,places.rating,places.priceLevel,places.priceRange,places.websiteUri,places.userRatingCount,places.websiteUri,places.goodForChildren,places.liveMusic,places.paymentOptions,places.servesBeer,places.servesVegetarianFood,places.reviews"
-        }
-        data = {
-            "textQuery": query,
-            "pageSize": 5
+    cache = get_cache(
+        PLACES_CACHE,
+        disk_path=configuration.cache_path,
+        max_entries=configuration.places_cache_max_entries,
+    )
+    cache_key = make_key(normalize_query(query), PLACES_FIELD_MASK, PLACES_PAGE_SIZE)
+    # Stays "shared" when the result came from a concurrent or earlier identical call.
+    source = {"cache": "shared"}
+
+    async def fetch() -> dict:
+        result = None
+        if configuration.places_cache_ttl_seconds > 0:
+            result = cache.get(cache_key, ttl=configuration.places_cache_ttl_seconds)
+        source["cache"] = "miss" if result is None else "hit"
+        if result is None:
+            result = await _search_places(query, configuration)
+            if configuration.places_cache_ttl_seconds > 0:
+                cache.set(
+                    cache_key,
+                    result,
+                    ttl=configuration.places_cache_ttl_seconds,
+                    disk_ttl=configuration.places_cache_disk_ttl_seconds,
+                )
+        return result
+
+    if configuration.dedupe_tool_calls:
+        result = await dedupe(
+            "query_google_places",
+            cache_key,
+            fetch,
+            thread_id=_thread_id(config),
+            memo_entries=configuration.thread_memo_max_entries,
+        )
+    else:
+        result = await fetch()
+    annotate(**source)
+
+    if configuration.places_projection:
+        result, _ = compact_places(
+            result,
+            max_reviews=configuration.places_review_snippets,
+            max_review_chars=configuration.places_review_chars,
+        )
+    if configuration.dedupe_places:
+        result = {
+            **result,
+            "places": place_registry().dedupe(result.get("places", []), _thread_id(config)),
         }
+    return result
+
+
+async def lookup_places(place_ids: List[str]) -> dict:
+    """Return the full details of places listed earlier in the conversation.
 
+    Places already returned by `query_google_places` are shown again only as a short
+    reference with their id and name. Use this tool with those ids when you need the
+    details again.
+
+    Parameters:
+    - place_ids (list[str]): Ids of previously returned places.
+
+    Returns:
+    - dict: {"places": [...]} with one record per known id, and the ids that are unknown.
+    """
+    found = place_registry().get_many(place_ids)
+    return {
+        "places": list(found.values()),
+        "unknown_ids": [place_id for place_id in place_ids if place_id not in found],
+    }
+
+
+async def _search_places(
+    query: str,
+    configuration: Configuration,
+    page_size: int = PLACES_PAGE_SIZE,
+    page_token: Optional[str] = None,
+    field_mask: str = PLACES_FIELD_MASK,
+) -> dict:
+    """Send a single `places:searchText` request."""
+    session = await get_session()
+
+    url = f"{GOOGLE_PLACES_URL}/places:searchText"
+    headers = {
+        'X-Goog-Api-Key': configuration.google_places_api_key,
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "X-Goog-FieldMask": field_mask
+    }
+    data = {
+        "textQuery": query,
+        "pageSize": page_size
+    }
+    if page_token:
+        data["pageToken"] = page_token
+
+    async def send() -> dict:
         async with session.post(url, headers=headers, json=data) as response:
+            if response.status == 429:
+                raise Throttled(parse_retry_after(response.headers.get("Retry-After")))
             response.raise_for_status()
-            return await response.json()         
+            return await response.json()
+
+    limiter = get_limiter(
+        "google_places",
+        configuration.google_places_api_key,
+        settings_for("google_places", configuration.rate_limits),
+    )
+    return await resilient_call(
+        "query_google_places",
+        send,
+        _tool_policy(configuration, "query_google_places"),
+        admit=limiter.call,
+    )
+
+
+async def iter_google_places(
+    query: str,
+    config: Optional[RunnableConfig] = None,
+    *,
+    page_size: int = 20,
+    max_pages: int = 3,
+    stop_when: Optional[Callable[[list[dict]], bool]] = None,
+    project: bool = False,
+) -> AsyncIterator[list[dict]]:
+    """Yield Google Places results for `query` one page at a time.
+
+    The next page is requested as soon as the current one arrives, so it is
+    usually ready by the time the caller asks for it. Iteration stops after
+    `max_pages`, when the API returns no `nextPageToken`, or as soon as
+    `stop_when(all_places_so_far)` returns True, in which case no further page
+    is requested.
+
+    Args:
+        query: The text search query.
+        config: The run config, used for API keys and limits.
+        page_size: Places per page (the API allows up to 20).
+        max_pages: Upper bound on pages fetched.
+        stop_when: Predicate over every place collected so far.
+        project: Yield projected places (see `react_agent.projection`) instead of raw records.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    field_mask = f"{PLACES_FIELD_MASK},nextPageToken"
+
+    def fetch(page_token: Optional[str]) -> asyncio.Future[dict]:
+        return asyncio.ensure_future(
+            _search_places(query, configuration, page_size, page_token, field_mask)
+        )
+
+    collected: list[dict] = []
+    pending: Optional[asyncio.Future[dict]] = fetch(None)
+    try:
+        for page_number in range(max_pages):
+            assert pending is not None
+            payload = await pending
+            pending = None
+
+            places = payload.get("places") or []
+            collected.extend(places)
+            done = stop_when is not None and stop_when(collected)
+
+            token = payload.get("nextPageToken")
+            if token and not done and page_number + 1 < max_pages:
+                pending = fetch(token)
+
+            if project:
+                places = [
+                    project_place(
+                        place,
+                        configuration.places_review_snippets,
+                        configuration.places_review_chars,
+                    )
+                    for place in places
+                ]
+            yield places
+
+            if pending is None:
+                return
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def collect_google_places(
+    query: str,
+    config: Optional[RunnableConfig] = None,
+    **kwargs: Any,
+) -> list[dict]:
+    """Drain `iter_google_places` into a single list."""
+    places: list[dict] = []
+    async for page in iter_google_places(query, config, **kwargs):
+        places.extend(page)
+    return places
+
+
+def enough_places(
+    count: int,
+    min_rating: Optional[float] = None,
+    vegetarian: Optional[bool] = None,
+) -> Callable[[list[dict]], bool]:
+    """Build a `stop_when` predicate: stop once `count` places match the filters.
+
+    >>> stop = enough_places(10, min_rating=4.5, vegetarian=True)
+    """
+
+    def matches(place: dict) -> bool:
+        if min_rating is not None and (place.get("rating") or 0) < min_rating:
+            return False
+        if vegetarian is not None and bool(place.get("servesVegetarianFood")) != vegetarian:
+            return False
+        return True
+
+    return lambda places: sum(1 for place in places if matches(place)) >= count
+
+
+async def _booking_get(
+    configuration: Configuration, path: str, params: Optional[dict] = None
+) -> dict:
+    """Send a GET request to the Booking RapidAPI within its quota."""
+    session = await get_session()
+
+    headers = {
+        "x-rapidapi-key": configuration.booking_api_key,
+        "x-rapidapi-host": "booking-com15.p.rapidapi.com"
+    }
+
+    async def send() -> dict:
+        async with session.get(f"{BOOKING_API_URL}{path}", headers=headers, params=params) as response:
+            if response.status == 429:
+                raise Throttled(parse_retry_after(response.headers.get("Retry-After")))
+            response.raise_for_status()
+            return await response.json()
+
+    limiter = get_limiter(
+        "booking",
+        configuration.booking_api_key,
+        settings_for("booking", configuration.rate_limits),
+    )
+    return await limiter.call(send)
+
 
 async def tavily_web_search(
         query: str,
@@ -130,13 +401,49 @@ async def tavily_web_search(
 
     configuration = Configuration.from_runnable_config(config)
 
-    response = await client.search(
-        query=query,
-        include_images=True,
-        max_results=configuration.max_search_results,
-        time_range='year'
+    async def send() -> dict:
+        from tavily import UsageLimitExceededError
+
+        try:
+            return await get_tavily_client().search(
+                query=query,
+                include_images=True,
+                max_results=configuration.max_search_results,
+                time_range='year'
+            )
+        except UsageLimitExceededError as exc:
+            # Tavily answers both with HTTP 429; only a rate limit is worth waiting out.
+            if not _tavily_rate_limited(exc):
+                raise
+            raise Throttled(getattr(exc, "retry_after_seconds", None)) from exc
+
+    limiter = get_limiter(
+        "tavily", os.getenv("TAVILY_API_KEY"), settings_for("tavily", configuration.rate_limits)
     )
-    return response
+
+    source = {"cache": "shared"}
+
+    async def search() -> dict:
+        source["cache"] = "miss"
+        return await resilient_call(
+            "tavily_web_search",
+            send,
+            _tool_policy(configuration, "tavily_web_search"),
+            admit=limiter.call,
+        )
+
+    if not configuration.dedupe_tool_calls:
+        result = await search()
+    else:
+        result = await dedupe(
+            "tavily_web_search",
+            make_key(normalize_query(query), configuration.max_search_results),
+            search,
+            thread_id=_thread_id(config),
+            memo_entries=configuration.thread_memo_max_entries,
+        )
+    annotate(**source)
+    return result
 
 # async def tavily_web_search(
 #     query: str, *, config: Annotated[RunnableConfig, InjectedToolArg]
@@ -183,10 +490,10 @@ async def tavily_web_search(
 
 
 # def exa_web_search(query: str):
-    """Search for webpages based on the query and retrieve their contents."""
-    return exa.search_and_contents(
-        query, use_autoprompt=True, num_results=10, text=True, highlights=True
-    )
+#     """Search for webpages based on the query and retrieve their contents."""
+#     return exa.search_and_contents(
+#         query, use_autoprompt=True, num_results=10, text=True, highlights=True
+#     )
 
 async def get_hotel_currencies(
         config: Annotated[RunnableConfig, InjectedToolArg],
@@ -199,42 +506,20 @@ async def get_hotel_currencies(
     dict
         JSON response containing currency code results.
     """  # noqa: D212, D415
-    async with aiohttp.ClientSession() as session:
-        configuration = Configuration.from_runnable_config(config)
-        
-        url = "https://booking-com15.p.rapidapi.com/api/v1/meta/getCurrency"
-    
-        headers = {
-            "x-rapidapi-key": configuration.booking_api_key,
-            "x-rapidapi-host": "booking-com15.p.rapidapi.com"
-        }
+    configuration = Configuration.from_runnable_config(config)
 
-        async with session.get(url, headers=headers) as response:
-            response.raise_for_status()
-            return await response.json()
+    return await _booking_get(configuration, "/meta/getCurrency")
 
 async def get_hotel_location_id(
         location_query: str,
         config: Annotated[RunnableConfig, InjectedToolArg]
 ) -> dict:
     """Use to get all hotel_location_ids based on location query."""
-    async with aiohttp.ClientSession() as session:
-
-        configuration = Configuration.from_runnable_config(config)
-
-        url = "https://booking-com15.p.rapidapi.com/api/v1/hotels/searchDestination"
-
-        querystring = {"query":{location_query}}
+    configuration = Configuration.from_runnable_config(config)
 
-        headers = {
-            "x-rapidapi-key": configuration.booking_api_key,
-            "x-rapidapi-host": "booking-com15.p.rapidapi.com"
-        }
+    querystring = {"query": location_query}
 
-        async with session.get(url, headers=headers, params=querystring) as response:
-            response.raise_for_status()
-
-            return await response.json() 
+    return await _booking_get(configuration, "/hotels/searchDestination", querystring)
 
 async def get_hotel_ids(
         config: Annotated[RunnableConfig, InjectedToolArg],
@@ -276,38 +561,29 @@ async def get_hotel_ids(
     dict
         JSON response containing hotel search results.
     """  # noqa: D212
-    async with aiohttp.ClientSession() as session:
-        configuration = Configuration.from_runnable_config(config)
-        
-        url = "https://booking-com15.p.rapidapi.com/api/v1/hotels/searchHotels"
-        
+    configuration = Configuration.from_runnable_config(config)
 
-        querystring = {
-            "dest_id": dest_id,
-            "search_type": search_type,
-            "arrival_date": arrival_date,
-            "departure_date": departure_date,
-            "adults": adults,
-            "room_qty": room_qty,
-            "page_number": "1",
-            "units": "metric",
-            "temperature_unit": "c",
-            "languagecode": "en-us",
-        }
-        
-        # Add optional parameters only if they are provided
-        if children_ages:
-            querystring["children_age"] = children_ages
-        if currency_code:
-            querystring["currency_code"] = currency_code
-
-        headers = {
-            "x-rapidapi-key": configuration.booking_api_key,
-            "x-rapidapi-host": "booking-com15.p.rapidapi.com"
-        }
+    querystring = {
+        "dest_id": dest_id,
+        "search_type": search_type,
+        "arrival_date": arrival_date,
+        "departure_date": departure_date,
+        "adults": adults,
+        "room_qty": room_qty,
+        "page_number": "1",
+        "units": "metric",
+        "temperature_unit": "c",
+        "languagecode": "en-us",
+    }
+    
+    # Add optional parameters only if they are provided
+    if children_ages:
+        querystring["children_age"] = children_ages
+    if currency_code:
+        querystring["currency_code"] = currency_code
 
-        async with session.get(url, headers=headers, params=querystring) as response:
-            response.raise_for_status()
-            return await response.json()
+    return await _booking_get(configuration, "/hotels/searchHotels", querystring)
 
-TOOLS: List[Callable[..., Any]] = [tavily_web_search, query_google_places]
\ No newline at end of file
+TOOLS: List[Callable[..., Any]] = [
+    cassette_tool(fn) for fn in (tavily_web_search, query_google_places, lookup_places)
+]
\ No newline at end of file
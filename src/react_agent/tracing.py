@@ -0,0 +1,466 @@
+"""Spans for graph nodes, LLM calls and tool calls, exported as JSON lines.
+
+A slow itinerary can come from many `research_itinerary` loops, slow Places
+calls or a long `format_itinerary` structured output. `SpanRecorder` is a
+callback handler that turns LangChain's start/end events into one span per
+node run, chat model call and tool call. Every span carries its duration,
+input/output tokens, payload bytes, the conversation thread id and - for
+tools that report it via `annotate` - whether the result came from a cache.
+
+Tracing is off unless `REACT_AGENT_TRACE_PATH` names a JSONL file, or a block
+of code runs inside `trace_to(path)`. While off, no handler is attached to any
+run, so the only cost is LangChain checking for one unset context variable.
+
+`aggregate` reads an exported file back and reduces it to per-node latency
+histograms and percentiles:
+
+    python -m react_agent.tracing .traces/spans.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tracers.context import register_configure_hook
+
+from react_agent.utils import estimate_tokens
+
+TRACE_PATH_ENV = "REACT_AGENT_TRACE_PATH"
+
+# Upper bounds, in milliseconds, of the latency histogram buckets.
+BUCKETS_MS: tuple[float, ...] = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf")
+)
+
+
+@dataclass
+class Span:
+    """One timed node run, chat model call or tool call."""
+
+    kind: str
+    name: str
+    run_id: str
+    parent_run_id: Optional[str] = None
+    node: Optional[str] = None
+    thread_id: Optional[str] = None
+    start: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tokens_estimated: bool = False
+    input_bytes: int = 0
+    output_bytes: int = 0
+    cache: Optional[str] = None
+    error: Optional[str] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the span as a plain dict."""
+        return asdict(self)
+
+
+class JsonlExporter:
+    """Append spans to a JSON lines file, one object per line."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Write to `path`, creating its directory on first export."""
+        self.path = Path(path)
+        self._file: Any = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """Write one span and flush it."""
+        line = json.dumps(span.as_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_exporters: dict[str, JsonlExporter] = {}
+_exporters_lock = threading.Lock()
+
+
+def exporter_for(path: str | Path) -> JsonlExporter:
+    """Return the process-wide exporter writing to `path`."""
+    key = str(Path(path).resolve())
+    with _exporters_lock:
+        exporter = _exporters.get(key)
+        if exporter is None:
+            exporter = _exporters[key] = JsonlExporter(path)
+        return exporter
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, BaseMessage):
+        return {"content": value.content, "tool_calls": getattr(value, "tool_calls", None)}
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def payload_bytes(value: Any) -> int:
+    """Return the size of `value` serialized as JSON, messages reduced to their content."""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode())
+    try:
+        return len(json.dumps(value, default=_encode, ensure_ascii=False).encode())
+    except (TypeError, ValueError):
+        return len(str(value).encode())
+
+
+def _message_text(message: BaseMessage) -> str:
+    text = message.content if isinstance(message.content, str) else json.dumps(
+        message.content, default=str
+    )
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        text += json.dumps([call.get("args") for call in tool_calls], default=str)
+    return text
+
+
+def _usage(response: LLMResult) -> Optional[tuple[int, int]]:
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    if token_usage:
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+    return None
+
+
+@dataclass
+class _Open:
+    span: Span
+    started: float
+    checkpoint_ns: Optional[str] = None
+    prompt: str = ""
+
+
+class SpanRecorder(BaseCallbackHandler):
+    """Callback handler that records spans and hands them to an exporter."""
+
+    run_inline = True
+
+    def __init__(self, exporter: Optional[JsonlExporter] = None) -> None:
+        """Export to `exporter`, or to the file named by `REACT_AGENT_TRACE_PATH`."""
+        self.exporter = exporter or exporter_for(os.environ[TRACE_PATH_ENV])
+        self._open: dict[UUID, _Open] = {}
+        self._threads: dict[UUID, str] = {}
+        self._node_tokens: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def _start(
+        self,
+        kind: str,
+        name: str,
+        run_id: UUID,
+        parent_run_id: Optional[UUID],
+        metadata: Optional[dict[str, Any]],
+        input_bytes: int,
+    ) -> _Open:
+        metadata = metadata or {}
+        thread_id = metadata.get("thread_id")
+        with self._lock:
+            if thread_id is None and parent_run_id is not None:
+                thread_id = self._threads.get(parent_run_id)
+            if thread_id is not None:
+                self._threads[run_id] = thread_id = str(thread_id)
+            span = Span(
+                kind=kind,
+                name=name,
+                run_id=str(run_id),
+                parent_run_id=str(parent_run_id) if parent_run_id else None,
+                node=metadata.get("langgraph_node"),
+                thread_id=thread_id,
+                input_bytes=input_bytes,
+            )
+            opened = self._open[run_id] = _Open(
+                span, time.perf_counter(), metadata.get("langgraph_checkpoint_ns")
+            )
+        return opened
+
+    def _finish(
+        self, run_id: UUID, output: Any = None, error: Optional[BaseException] = None
+    ) -> Optional[Span]:
+        with self._lock:
+            opened = self._open.pop(run_id, None)
+            self._threads.pop(run_id, None)
+        if opened is None:
+            return None
+        span = opened.span
+        span.duration_ms = round((time.perf_counter() - opened.started) * 1000, 3)
+        span.output_bytes = payload_bytes(output)
+        if error is not None:
+            span.error = type(error).__name__
+        return span
+
+    def annotate(self, run_id: UUID, attrs: dict[str, Any]) -> None:
+        """Set extra span fields (such as `cache`) on an open run."""
+        opened = self._open.get(run_id)
+        if opened is not None:
+            for key, value in attrs.items():
+                setattr(opened.span, key, value)
+
+    # Graph nodes
+
+    def on_chain_start(
+        self,
+        serialized: Any,
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Open a span when the chain is a graph node."""
+        node = (metadata or {}).get("langgraph_node")
+        if node is None or kwargs.get("name") != node:
+            return
+        opened = self._start("node", node, run_id, parent_run_id, metadata, payload_bytes(inputs))
+        if opened.checkpoint_ns:
+            self._node_tokens[opened.checkpoint_ns] = [0, 0]
+
+    def _finish_node(
+        self, run_id: UUID, outputs: Any = None, error: Optional[BaseException] = None
+    ) -> None:
+        opened = self._open.get(run_id)
+        if opened is None:
+            return
+        span = self._finish(run_id, outputs, error)
+        if span is None:
+            return
+        tokens = self._node_tokens.pop(opened.checkpoint_ns or "", None)
+        if tokens:
+            span.input_tokens, span.output_tokens = tokens
+        self.exporter.export(span)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Close a node span."""
+        self._finish_node(run_id, outputs)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Close a node span; interrupts end up here too."""
+        self._finish_node(run_id, error=error)
+
+    # Chat models
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Open an LLM span."""
+        name = (metadata or {}).get("ls_model_name") or kwargs.get("name") or (
+            (serialized or {}).get("id") or ["chat_model"]
+        )[-1]
+        prompt = "".join(_message_text(m) for batch in messages for m in batch)
+        opened = self._start("llm", name, run_id, parent_run_id, metadata, len(prompt.encode()))
+        opened.prompt = prompt
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """Close an LLM span with its token usage."""
+        opened = self._open.get(run_id)
+        if opened is None:
+            return
+        prompt = opened.prompt
+        completion = "".join(
+            _message_text(g.message) if hasattr(g, "message") else g.text
+            for generations in response.generations
+            for g in generations
+        )
+        span = self._finish(run_id, completion)
+        if span is None:
+            return
+        usage = _usage(response)
+        if usage is None:
+            usage = estimate_tokens(prompt), estimate_tokens(completion)
+            span.tokens_estimated = True
+        span.input_tokens, span.output_tokens = usage
+        if opened.checkpoint_ns and opened.checkpoint_ns in self._node_tokens:
+            totals = self._node_tokens[opened.checkpoint_ns]
+            totals[0] += span.input_tokens
+            totals[1] += span.output_tokens
+        self.exporter.export(span)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Close an LLM span that failed."""
+        span = self._finish(run_id, error=error)
+        if span is not None:
+            self.exporter.export(span)
+
+    # Tools
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Open a tool span."""
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        self._start("tool", name, run_id, parent_run_id, metadata, len(input_str.encode()))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Close a tool span; the output tokens are what the model will read next."""
+        text = output.content if isinstance(output, BaseMessage) else output
+        text = text if isinstance(text, str) else json.dumps(text, default=str)
+        span = self._finish(run_id, text)
+        if span is not None:
+            span.output_tokens = estimate_tokens(text)
+            span.tokens_estimated = True
+            self.exporter.export(span)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Close a tool span that failed."""
+        span = self._finish(run_id, error=error)
+        if span is not None:
+            self.exporter.export(span)
+
+
+_recorder: ContextVar[Optional[SpanRecorder]] = ContextVar("react_agent_span_recorder", default=None)
+
+register_configure_hook(_recorder, True, SpanRecorder, TRACE_PATH_ENV)
+
+
+@contextmanager
+def trace_to(path: str | Path) -> Iterator[SpanRecorder]:
+    """Record spans of every run started inside the block to `path`."""
+    recorder = SpanRecorder(exporter_for(path))
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+def annotate(**attrs: Any) -> None:
+    """Attach fields such as `cache="hit"` to the span of the running tool or node.
+
+    The current run is taken from the runnable config LangChain keeps in the
+    calling context. Does nothing when tracing is off.
+    """
+    manager = (var_child_runnable_config.get() or {}).get("callbacks")
+    # A plain list of handlers carries no run to attach the fields to.
+    if not isinstance(manager, BaseCallbackManager) or manager.parent_run_id is None:
+        return
+    run_id = manager.parent_run_id
+    for handler in manager.handlers:
+        if isinstance(handler, SpanRecorder):
+            handler.annotate(run_id, attrs)
+
+
+def load_spans(path: str | Path) -> list[dict[str, Any]]:
+    """Read the spans exported to `path`."""
+    with Path(path).open(encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def aggregate(
+    spans: Iterable[dict[str, Any]], kind: str = "node", buckets: tuple[float, ...] = BUCKETS_MS
+) -> dict[str, dict[str, Any]]:
+    """Group spans of `kind` by name into latency histograms and totals.
+
+    Each histogram maps a bucket's upper bound in milliseconds ("inf" for the
+    last) to the number of spans that fell into it.
+    """
+    grouped: dict[str, list[dict[str, Any]]] = {}
+    for span in spans:
+        if span["kind"] == kind:
+            grouped.setdefault(span["name"], []).append(span)
+
+    report: dict[str, dict[str, Any]] = {}
+    for name, group in sorted(grouped.items()):
+        durations = sorted(span["duration_ms"] for span in group)
+        histogram = {("inf" if b == float("inf") else b): 0 for b in buckets}
+        for duration in durations:
+            for bound in buckets:
+                if duration <= bound:
+                    histogram["inf" if bound == float("inf") else bound] += 1
+                    break
+        caches = [span["cache"] for span in group if span.get("cache")]
+        report[name] = {
+            "count": len(group),
+            "errors": sum(1 for span in group if span.get("error")),
+            "mean_ms": round(sum(durations) / len(durations), 3),
+            "p50_ms": _percentile(durations, 50),
+            "p95_ms": _percentile(durations, 95),
+            "p99_ms": _percentile(durations, 99),
+            "max_ms": durations[-1],
+            "input_tokens": sum(span["input_tokens"] for span in group),
+            "output_tokens": sum(span["output_tokens"] for span in group),
+            "cache_hit_rate": (
+                round(sum(1 for c in caches if c == "hit") / len(caches), 3) if caches else None
+            ),
+            "histogram_ms": histogram,
+        }
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Print per-node, per-model and per-tool latency summaries of a span file."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("path", type=Path)
+    args = parser.parse_args(argv)
+
+    spans = load_spans(args.path)
+    for kind in ("node", "llm", "tool"):
+        report = aggregate(spans, kind)
+        if not report:
+            continue
+        sys.stdout.write(f"\n{kind}s\n")
+        sys.stdout.write(
+            f"  {'name':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'tokens in/out':>18}\n"
+        )
+        for name, row in report.items():
+            tokens = f"{row['input_tokens']}/{row['output_tokens']}"
+            sys.stdout.write(
+                f"  {name:<28}{row['count']:>7}{row['p50_ms']:>10.1f}"
+                f"{row['p95_ms']:>10.1f}{row['max_ms']:>10.1f}{tokens:>18}\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
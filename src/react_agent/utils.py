@@ -1,7 +1,7 @@
 """Utility & helper functions."""
 
-from langchain.chat_models import init_chat_model
-from langchain_core.language_models import BaseChatModel
+from typing import Any
+
 from langchain_core.messages import BaseMessage
 
 
@@ -15,3 +15,29 @@ def get_message_text(msg: BaseMessage) -> str:
     else:
         txts = [c if isinstance(c, str) else (c.get("text") or "") for c in content]
         return "".join(txts).strip()
+
+
+_ENCODING: Any = None
+_ENCODING_LOADED = False
+
+
+def estimate_tokens(text: str) -> int:
+    """Count tokens with tiktoken when its encoding is available, else estimate.
+
+    The fallback of four characters per token keeps this usable offline, where
+    tiktoken cannot download its encoding files.
+    """
+    global _ENCODING, _ENCODING_LOADED
+
+    if not _ENCODING_LOADED:
+        _ENCODING_LOADED = True
+        try:
+            import tiktoken
+
+            _ENCODING = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _ENCODING = None
+
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
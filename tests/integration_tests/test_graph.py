@@ -8,8 +8,9 @@ from react_agent import graph
 @unit
 async def test_react_agent_simple_passthrough() -> None:
     res = await graph.ainvoke(
-        {"messages": [("user", "Who is the founder of LangChain?")]},
-        {"configurable": {"system_prompt": "You are a helpful AI assistant."}},
+        {"itinerary_messages": [("user", "Hi! I'd like to plan a trip.")]},
+        {"configurable": {"thread_id": "integration-passthrough"}},
     )
 
-    assert "harrison" in str(res["messages"][-1].content).lower()
+    assert res["itinerary_messages"][0].content == "Hi! I'd like to plan a trip."
+    assert "__interrupt__" in res or res["itinerary_messages"][-1].type == "ai"
@@ -0,0 +1,95 @@
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, Union
+
+from aiohttp import web
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+Reply = Union[dict[str, Any], AIMessage]
+
+
+@asynccontextmanager
+async def serve(routes: dict[tuple[str, str], Handler]) -> AsyncIterator[str]:
+    """Serve `routes` on a random local port and yield the base URL."""
+    app = web.Application()
+    for (method, path), handler in routes.items():
+        app.router.add_route(method, path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that answers from a script and logs every request.
+
+    `respond(tool, messages)` gets the name of the first bound tool, or None
+    when no tools are bound. It returns either the arguments of a call to that
+    tool or a whole `AIMessage`, and may raise to simulate a failing model.
+    """
+
+    respond: Callable[[Optional[str], list[BaseMessage]], Reply]
+    calls: list[tuple[Optional[str], list[BaseMessage]]] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def requests(self, tool: Optional[str]) -> list[list[BaseMessage]]:
+        """Return the messages of every request made with `tool` bound first."""
+        return [messages for name, messages in self.calls if name == tool]
+
+    def _reply(self, messages: list[BaseMessage], kwargs: dict[str, Any]) -> AIMessage:
+        tools = kwargs.get("tools") or []
+        name = tools[0]["function"]["name"] if tools else None
+        self.calls.append((name, list(messages)))
+        reply = self.respond(name, messages)
+        if isinstance(reply, AIMessage):
+            return reply
+        call = {"name": name, "args": reply, "id": f"call_{len(self.calls)}"}
+        return AIMessage("", tool_calls=[call])
+
+    def _generate(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, kwargs))])
+
+
+class StreamingChatModel(ScriptedChatModel):
+    """`ScriptedChatModel` streaming tool-call arguments `chunk_chars` at a time.
+
+    `streamed` counts the chunks sent so far.
+    """
+
+    chunk_chars: int = 7
+    streamed: int = 0
+
+    def _stream(
+        self, messages: list[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._reply(messages, kwargs)
+        for index, call in enumerate(message.tool_calls):
+            args = json.dumps(call["args"])
+            for start in range(0, len(args), self.chunk_chars):
+                first = start == 0
+                piece = {
+                    "name": call["name"] if first else None,
+                    "args": args[start : start + self.chunk_chars],
+                    "id": call["id"] if first else None,
+                    "index": index,
+                }
+                self.streamed += 1
+                yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[piece]))
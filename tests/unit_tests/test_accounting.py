@@ -0,0 +1,116 @@
+import asyncio
+from typing import Annotated, TypedDict
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command, interrupt
+
+from react_agent.accounting import estimate_cost, merge_usage, metered, with_usage
+
+
+class UsageState(TypedDict, total=False):
+    answer: str
+    usage: Annotated[dict, merge_usage]
+
+
+def reply(input_tokens: int, output_tokens: int, cached: int = 0) -> AIMessage:
+    return AIMessage(
+        "ok",
+        usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": cached},
+        },
+        response_metadata={"model_name": "gpt-4o-2024-08-06"},
+    )
+
+
+def test_estimate_cost_matches_dated_models_and_overrides() -> None:
+    assert estimate_cost("gpt-4o-2024-08-06", 1_000_000, 0) == pytest.approx(2.50)
+    assert estimate_cost("openai/gpt-4o-mini", 0, 1_000_000) == pytest.approx(0.60)
+    assert estimate_cost("gpt-4o", 1_000_000, 0, cached_tokens=500_000) == pytest.approx(1.875)
+    assert estimate_cost("unknown-model", 1000, 1000) == 0.0
+    assert estimate_cost("local", 1_000_000, 0, overrides={"local": {"input": 1, "output": 2}}) == 1.0
+
+
+def test_merge_usage_adds_thread_and_node_totals() -> None:
+    first = {"input_tokens": 10, "output_tokens": 2, "cached_tokens": 0, "calls": 1,
+             "cost_usd": 0.1, "nodes": {"a": {"input_tokens": 10, "calls": 1, "cost_usd": 0.1}}}
+    second = {"input_tokens": 5, "output_tokens": 1, "cached_tokens": 4, "calls": 1,
+              "cost_usd": 0.05, "nodes": {"b": {"input_tokens": 5, "calls": 1, "cost_usd": 0.05}}}
+
+    merged = merge_usage(merge_usage({}, first), second)
+
+    assert merged["input_tokens"] == 15 and merged["cached_tokens"] == 4 and merged["calls"] == 2
+    assert merged["cost_usd"] == pytest.approx(0.15)
+    assert set(merged["nodes"]) == {"a", "b"}
+    assert merge_usage(merged, first)["nodes"]["a"]["calls"] == 2
+    assert merge_usage(merged, {}) == merged
+
+
+def test_metered_nodes_record_usage_and_expose_it_in_interrupts() -> None:
+    model = GenericFakeChatModel(messages=iter([reply(1000, 100, cached=200), reply(50, 5)]))
+
+    @metered
+    async def research(state: UsageState) -> dict:
+        await model.ainvoke("plan a trip")
+        return {"answer": "Colombo"}
+
+    @metered
+    def confirm(state: UsageState) -> Command:
+        decision = interrupt(with_usage(state, {"prompt": "Looks good?"}))
+        model.invoke(decision)
+        return Command(goto=END, update={"answer": decision})
+
+    builder = StateGraph(UsageState)
+    builder.add_node(research)
+    builder.add_node(confirm)
+    builder.add_edge(START, "research")
+    builder.add_edge("research", "confirm")
+    graph = builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "t1"}}
+
+    asyncio.run(graph.ainvoke({}, config))
+    prompt = graph.get_state(config).tasks[0].interrupts[0].value
+    final = asyncio.run(graph.ainvoke(Command(resume="yes"), config))
+
+    assert prompt["prompt"] == "Looks good?"
+    assert prompt["usage"]["input_tokens"] == 1000
+    usage = final["usage"]
+    assert (usage["input_tokens"], usage["output_tokens"], usage["cached_tokens"]) == (1050, 105, 200)
+    assert usage["calls"] == 2
+    assert usage["nodes"]["research"]["calls"] == 1
+    assert usage["nodes"]["confirm"]["input_tokens"] == 50
+    assert usage["cost_usd"] == pytest.approx(
+        estimate_cost("gpt-4o", 1000, 100, 200) + estimate_cost("gpt-4o", 50, 5), abs=1e-6
+    )
+    assert final["answer"] == "yes"
+
+
+def test_calls_made_before_an_interrupt_are_recorded_on_resume() -> None:
+    model = GenericFakeChatModel(messages=iter([reply(200, 20)]))
+    answers: dict[str, str] = {}
+
+    @metered
+    def validate(state: UsageState) -> dict:
+        # Like the structured output cache: the call is only paid for once.
+        if "check" not in answers:
+            answers["check"] = str(model.invoke("is this complete?").content)
+        return {"answer": interrupt(with_usage(state, {"prompt": answers["check"]}))}
+
+    builder = StateGraph(UsageState)
+    builder.add_node(validate)
+    builder.add_edge(START, "validate")
+    graph = builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "interrupted"}}
+
+    graph.invoke({}, config)
+    final = graph.invoke(Command(resume="3 days"), config)
+
+    assert final["answer"] == "3 days"
+    assert (final["usage"]["input_tokens"], final["usage"]["calls"]) == (200, 1)
+    assert final["usage"]["nodes"]["validate"]["output_tokens"] == 20
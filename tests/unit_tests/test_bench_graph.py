@@ -0,0 +1,30 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BENCH = Path(__file__).resolve().parents[2] / "benchmarks" / "bench_graph.py"
+
+
+def test_graph_benchmark_runs_the_full_flow_offline(tmp_path: Path) -> None:
+    output = tmp_path / "graph.jsonl"
+    result = subprocess.run(
+        [sys.executable, str(BENCH), "--runs", "1", "--output", str(output)],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    report = json.loads(output.read_text().splitlines()[-1])
+    assert set(report["nodes"]) >= {
+        "validate_user_query",
+        "update_user_profile",
+        "research_itinerary",
+        "tools",
+        "format_itinerary",
+        "review_itinerary",
+        "validate_itinerary",
+    }
+    assert report["state_bytes"] > 0
+    assert report["checkpoint"]["bytes"] > 0
+    assert report["peak_rss_mb"] > 0
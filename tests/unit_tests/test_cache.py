@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from react_agent import http_client, tools
+from react_agent.cache import TieredCache, get_cache, make_key, normalize_query
+
+from .stubs import serve
+
+
+def test_normalize_query_collapses_case_and_whitespace() -> None:
+    assert normalize_query("  Best Restaurants\tin  Colombo ") == "best restaurants in colombo"
+    assert make_key("a", 1) == make_key("a", 1)
+    assert make_key("a", 1) != make_key("a", 2)
+
+
+def test_memory_tier_lru_and_ttl() -> None:
+    cache = TieredCache("test", max_entries=2)
+    cache.set("a", {"v": 1}, ttl=60)
+    cache.set("b", {"v": 2}, ttl=60)
+    assert cache.get("a") == {"v": 1}
+    cache.set("c", {"v": 3}, ttl=60)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    cache.set("d", {"v": 4}, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+    assert cache.stats.memory_hits == 1
+    assert cache.stats.misses == 2
+
+
+def test_disk_tier_survives_new_instance(tmp_path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    TieredCache("places", disk_path=path).set("k", {"places": []}, ttl=60, disk_ttl=60)
+
+    fresh = TieredCache("places", disk_path=path)
+    assert fresh.get("k") == {"places": []}
+    assert fresh.get("k") == {"places": []}
+    assert fresh.stats.disk_hits == 1
+    assert fresh.stats.memory_hits == 1
+    assert TieredCache("other", disk_path=path).get("k") is None
+
+
+def test_get_cache_honours_max_entries() -> None:
+    small = get_cache("sized", max_entries=2)
+
+    assert get_cache("sized", max_entries=2) is small
+    assert small.max_entries == 2
+    assert get_cache("sized", max_entries=8).max_entries == 8
+
+
+def test_query_google_places_hits_cache(tmp_path) -> None:
+    calls = []
+
+    async def search_text(request: web.Request) -> web.Response:
+        calls.append(await request.json())
+        return web.json_response({"places": [{"id": "abc"}]})
+
+    async def run() -> None:
+        async with serve({("POST", "/v1/places:searchText"): search_text}) as base_url:
+            original = tools.GOOGLE_PLACES_URL
+            tools.GOOGLE_PLACES_URL = f"{base_url}/v1"
+            config = {
+                "configurable": {
+                    "google_places_api_key": "stub",
+                    "cache_path": str(tmp_path / "cache.sqlite"),
+                }
+            }
+            try:
+                first = await tools.query_google_places("Restaurants in Colombo", config=config)
+                second = await tools.query_google_places("restaurants  in colombo", config=config)
+            finally:
+                tools.GOOGLE_PLACES_URL = original
+                await http_client.shutdown()
+        assert first == second == {"places": [{"id": "abc"}]}
+
+    asyncio.run(run())
+    assert len(calls) == 1
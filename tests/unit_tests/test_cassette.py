@@ -0,0 +1,91 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import InjectedToolArg
+from langchain_openai import ChatOpenAI
+from typing_extensions import Annotated
+
+from react_agent.cassette import (
+    CassetteChatModel,
+    CassetteMiss,
+    LatencyModel,
+    cassette_tool,
+    places_fixture,
+    use_cassette,
+)
+from react_agent.schemas import USER_SCHEMA
+
+SAMPLE = Path(__file__).resolve().parents[2] / "our_sample.json"
+
+
+@pytest.fixture(autouse=True)
+def no_cassette():
+    yield
+    use_cassette(None)
+
+
+def test_tool_calls_are_recorded_then_replayed(tmp_path: Path) -> None:
+    calls = []
+
+    async def search(query: str, config: Annotated[RunnableConfig, InjectedToolArg]) -> dict:
+        calls.append(query)
+        return {"query": query, "n": len(calls)}
+
+    tool = cassette_tool(search)
+    path = tmp_path / "session.json"
+
+    use_cassette(path, "record")
+    recorded = asyncio.run(tool("cafes in Colombo", config={"configurable": {"thread_id": "a"}}))
+
+    use_cassette(path, "replay", LatencyModel.parse("fixed:0.01"))
+    replayed = asyncio.run(tool("cafes in Colombo", config={"configurable": {"thread_id": "b"}}))
+
+    assert replayed == recorded == {"query": "cafes in Colombo", "n": 1}
+    assert calls == ["cafes in Colombo"]
+    with pytest.raises(CassetteMiss):
+        asyncio.run(tool("beaches", config={}))
+
+
+def test_places_fixture_answers_unrecorded_place_queries(tmp_path: Path) -> None:
+    async def query_google_places(query: str) -> dict:
+        raise AssertionError("should not be called while replaying")
+
+    cassette = use_cassette(tmp_path / "empty.json", "replay")
+    cassette.seed("query_google_places", places_fixture(SAMPLE))
+    tool = cassette_tool(query_google_places)
+
+    first = asyncio.run(tool("anything"))
+    second = asyncio.run(tool("anything else"))
+
+    assert len(first["places"]) == len(second["places"]) == 5
+    assert first["places"][0]["name"] == "Havelock Gaming Cafe"
+    assert first["places"][0]["id"] != second["places"][0]["id"]
+
+
+def test_chat_model_replays_recorded_responses(tmp_path: Path) -> None:
+    path = tmp_path / "llm.json"
+    cassette = use_cassette(path, "record")
+    live = GenericFakeChatModel(messages=iter([AIMessage(content="Day 1: Galle Fort")]))
+    recorded = CassetteChatModel(inner=live, cassette=cassette).invoke([HumanMessage("plan", id="1")])
+
+    cassette = use_cassette(path, "replay")
+    exhausted = GenericFakeChatModel(messages=iter([]))
+    replayed = CassetteChatModel(inner=exhausted, cassette=cassette).invoke(
+        [HumanMessage("plan", id="2")]
+    )
+
+    assert replayed.content == recorded.content == "Day 1: Galle Fort"
+
+
+def test_structured_output_is_routed_through_the_cassette(tmp_path: Path) -> None:
+    cassette = use_cassette(tmp_path / "empty.json", "replay")
+    model = CassetteChatModel(inner=ChatOpenAI(model="gpt-4o", api_key="unused"), cassette=cassette)
+
+    with pytest.raises(CassetteMiss):
+        model.with_structured_output(USER_SCHEMA).invoke("I want 3 days in Kandy")
+    with pytest.raises(CassetteMiss):
+        model.with_structured_output(USER_SCHEMA, include_raw=True).invoke("hi")
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from react_agent.dedupe import dedupe, dedupe_stats
+
+
+def test_concurrent_calls_share_one_upstream_request() -> None:
+    calls = 0
+
+    async def fetch() -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"answer": 42}
+
+    async def run() -> list:
+        return await asyncio.gather(
+            *(dedupe("coalesce", "q", fetch, thread_id=f"t{i}", memo_entries=0) for i in range(5))
+        )
+
+    results = asyncio.run(run())
+    assert calls == 1
+    assert results == [{"answer": 42}] * 5
+    assert dedupe_stats()["coalesce"] == {
+        "calls": 5, "upstream_calls": 1, "coalesced": 4, "memo_hits": 0, "saved": 4
+    }
+
+
+def test_repeated_query_in_thread_is_memoized() -> None:
+    calls = 0
+
+    async def fetch() -> dict:
+        nonlocal calls
+        calls += 1
+        return {"n": calls}
+
+    async def run() -> None:
+        assert await dedupe("memo", "q", fetch, thread_id="a") == {"n": 1}
+        assert await dedupe("memo", "q", fetch, thread_id="a") == {"n": 1}
+        assert await dedupe("memo", "q", fetch, thread_id="b") == {"n": 2}
+
+    asyncio.run(run())
+    assert dedupe_stats()["memo"]["memo_hits"] == 1
+    assert dedupe_stats()["memo"]["upstream_calls"] == 2
+
+
+def test_followers_see_the_leaders_error() -> None:
+    async def fetch() -> dict:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def run() -> list:
+        return await asyncio.gather(
+            *(dedupe("errors", "q", fetch) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def retry() -> dict:
+        return {"ok": True}
+
+    # A failed call is not memoized or left in flight.
+    assert asyncio.run(dedupe("errors", "q", retry, thread_id="a")) == {"ok": True}
+    with pytest.raises(RuntimeError):
+        asyncio.run(dedupe("errors", "other", fetch))
+
+
+def test_cancelling_the_leader_does_not_cancel_its_followers() -> None:
+    calls = 0
+
+    async def fetch() -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"call": calls}
+
+    async def run() -> list:
+        leader = asyncio.create_task(dedupe("takeover", "q", fetch, thread_id="a"))
+        await asyncio.sleep(0)
+        followers = [
+            asyncio.create_task(dedupe("takeover", "q", fetch, thread_id=f"t{i}")) for i in range(3)
+        ]
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(run()) == [{"call": 2}] * 3
+    assert calls == 2
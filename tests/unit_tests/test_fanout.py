@@ -0,0 +1,98 @@
+import importlib
+import re
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage
+
+from react_agent.fanout import day_chunks, merge_chunks
+
+from .stubs import ScriptedChatModel
+
+graph_module = importlib.import_module("react_agent.graph")
+
+
+def day(number: int, *names: str, cost: float = 100) -> dict:
+    return {
+        "day_number": number,
+        "attractions": [{"name": name, "type": "sight", "location": "Colombo"} for name in names],
+        "dining": [],
+        "daily_cost_estimate": cost,
+    }
+
+
+def write_range(tool: Optional[str], messages: list[BaseMessage]) -> dict:
+    """Write the days named in a `format_days` prompt, numbering them from 1."""
+    if tool != "itinerary_schema":
+        return {"is_satisfactory": True, "feedback": ""}
+    first, last = map(int, re.search(r"days (\d+) to (\d+)", messages[0].content).groups())
+    return {
+        "destination": "Colombo",
+        "country": "Sri Lanka",
+        "trip_duration": 5,
+        "days": [day(i - first + 1, f"Sight {i}") for i in range(first, last + 1)],
+        "general_tips": {"must_try_dishes": [f"Dish {first}"]},
+    }
+
+
+def test_day_chunks_are_contiguous_and_balanced() -> None:
+    assert day_chunks(7, 3) == [(1, 3), (4, 5), (6, 7)]
+    assert day_chunks(3, 8) == [(1, 1), (2, 2), (3, 3)]
+    assert day_chunks(14, 1) == [(1, 14)]
+
+
+def test_merge_is_independent_of_completion_order() -> None:
+    parts = [
+        {"first_day": 3, "last_day": 4, "itinerary": {
+            "destination": "Colombo", "days": [day(1, "Fort", "Lotus Tower"), day(2, "Museum"), day(3, "Extra")],
+            "general_tips": {"transportation": "Train", "must_try_dishes": ["Kottu", "Hoppers"]}}},
+        {"first_day": 1, "last_day": 2, "itinerary": {
+            "destination": "Colombo", "country": "Sri Lanka", "days": [day(1, "Fort"), day(2, "Beach")],
+            "general_tips": {"transportation": "Tuk-tuk", "must_try_dishes": ["Hoppers"]}}},
+    ]
+
+    merged = merge_chunks(parts, 4)
+
+    assert merged == merge_chunks(parts[::-1], 4)
+    assert [d["day_number"] for d in merged["days"]] == [1, 2, 3, 4]
+    assert [[a["name"] for a in d["attractions"]] for d in merged["days"]] == [
+        ["Fort"], ["Beach"], ["Lotus Tower"], ["Museum"]
+    ]
+    assert merged["general_tips"] == {"transportation": "Tuk-tuk", "must_try_dishes": ["Hoppers", "Kottu"]}
+    assert merged["total_estimated_cost"] == 400
+    assert (merged["country"], merged["trip_duration"]) == ("Sri Lanka", 4)
+
+
+def test_graph_formats_day_ranges_concurrently_and_merges_them(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    model = ScriptedChatModel(respond=write_range)
+    monkeypatch.setattr(graph_module, "get_llm", lambda: model)
+    graph = graph_module.graph
+    config = {
+        "configurable": {
+            "thread_id": "fanout",
+            "format_parallelism": 3,
+            "max_review_iterations": 0,
+            "cache_path": str(tmp_path / "cache.sqlite"),
+            "structured_cache": {"*": {"enabled": False}},
+        }
+    }
+    graph.update_state(
+        config,
+        {
+            "itinerary_messages": [("user", "5 days"), AIMessage("<FINAL_OUTPUT>notes</FINAL_OUTPUT>")],
+            "user_profile": {"destination": "Colombo", "number_of_days": 5},
+        },
+        as_node="research_itinerary",
+    )
+
+    graph.invoke(None, config)
+
+    itinerary = graph.get_state(config).values["itinerary"]
+    assert len(model.requests("itinerary_schema")) == 3
+    assert [d["day_number"] for d in itinerary["days"]] == [1, 2, 3, 4, 5]
+    assert [d["attractions"][0]["name"] for d in itinerary["days"]] == [f"Sight {i}" for i in range(1, 6)]
+    assert itinerary["general_tips"]["must_try_dishes"] == ["Dish 1", "Dish 3", "Dish 5"]
+    assert itinerary["total_estimated_cost"] == 500
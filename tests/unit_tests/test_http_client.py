@@ -0,0 +1,36 @@
+import asyncio
+
+from react_agent import http_client
+
+
+def test_session_is_shared_within_a_loop() -> None:
+    async def run() -> None:
+        first = await http_client.get_session()
+        second = await http_client.get_session()
+        assert first is second
+        await http_client.shutdown()
+        assert first.closed
+
+    asyncio.run(run())
+
+
+def test_session_is_recreated_for_a_new_loop() -> None:
+    async def open_session() -> object:
+        return await http_client.get_session()
+
+    first = asyncio.run(open_session())
+    second = asyncio.run(open_session())
+    assert first is not second
+    asyncio.run(http_client.shutdown())
+
+
+def test_startup_applies_pool_settings() -> None:
+    async def run() -> None:
+        settings = http_client.PoolSettings(limit=7, limit_per_host=3)
+        session = await http_client.startup(settings)
+        assert session.connector.limit == 7
+        assert session.connector.limit_per_host == 3
+        await http_client.startup(http_client.PoolSettings())
+        await http_client.shutdown()
+
+    asyncio.run(run())
@@ -0,0 +1,82 @@
+import importlib
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+from langchain_core.messages import BaseMessage
+from langgraph.types import Command
+
+from react_agent.intake import (
+    follow_up_question,
+    merge_profile,
+    missing_fields,
+    with_defaults,
+)
+
+from .stubs import ScriptedChatModel
+
+graph_module = importlib.import_module("react_agent.graph")
+
+
+def intake(tool: Optional[str], messages: list[BaseMessage]) -> dict:
+    """Extract the destination first and the days and budget once they are given."""
+    profile: dict[str, Any] = {"destination": "Colombo"}
+    if "4 days" in str(messages[-1].content):
+        profile = {"number_of_days": 4, "budget": 800}
+    return {"is_valid": True, "response_message": "", "profile": profile}
+
+
+def test_profile_helpers() -> None:
+    profile = merge_profile(
+        {"destination": "Colombo"}, {"budget": 500, "currency": "", "unknown": 1}
+    )
+
+    assert profile == {"destination": "Colombo", "budget": 500}
+    assert missing_fields(profile) == ["number_of_days"]
+    assert follow_up_question(["budget", "number_of_days"]) == (
+        "Could you tell me your budget and how many days you'd like to travel?"
+    )
+    filled = with_defaults(profile)
+    assert filled["budget"] == 500
+    assert "number_of_people" in filled
+
+
+def test_fused_intake_keeps_the_partial_profile_across_interrupts(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    model = ScriptedChatModel(respond=intake)
+    monkeypatch.setattr(graph_module, "get_llm", lambda: model)
+    graph = graph_module.graph
+    config = {
+        "configurable": {
+            "thread_id": "intake",
+            "fused_intake": True,
+            "cache_path": str(tmp_path / "cache.sqlite"),
+            "structured_cache": {"*": {"enabled": False}},
+        }
+    }
+
+    graph.invoke({"itinerary_messages": [("user", "Colombo please")]}, config)
+
+    state = graph.get_state(config)
+    assert state.tasks[0].interrupts[0].value["missing_fields"] == [
+        "budget",
+        "number_of_days",
+    ]
+
+    graph.invoke(
+        Command(resume="4 days, 800 dollars"),
+        config,
+        interrupt_before=["research_itinerary", "research_category"],
+    )
+
+    state = graph.get_state(config)
+    assert state.next == ("research_itinerary",)
+    profile = state.values["user_profile"]
+    assert (profile["destination"], profile["number_of_days"], profile["budget"]) == (
+        "Colombo",
+        4,
+        800,
+    )
+    # One call per turn, plus the replay of the interrupted turn; no separate extraction.
+    assert [tool for tool, _ in model.calls] == ["intake_schema"] * 3
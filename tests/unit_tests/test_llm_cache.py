@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from react_agent.llm_cache import invoke_structured, settings_for, structured_key
+
+SCHEMA = {"title": "validation_schema", "type": "object"}
+
+
+class CountingModel:
+    """Stands in for a chat model; counts structured-output calls."""
+
+    model_name = "gpt-4o"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def with_structured_output(self, schema: Any) -> "CountingModel":
+        return self
+
+    def invoke(self, messages: list) -> dict:
+        self.calls += 1
+        return {"is_valid": True, "call": self.calls}
+
+
+def test_key_ignores_the_current_date_and_whitespace() -> None:
+    model = CountingModel()
+    first = [SystemMessage("Check it.\n  Today is 2025-01-01"), HumanMessage("Yes!")]
+    second = [SystemMessage("Check it. Today is 2025-06-30"), HumanMessage("  Yes! ")]
+
+    assert structured_key(model, SCHEMA, first) == structured_key(model, SCHEMA, second)
+    assert structured_key(model, SCHEMA, first) != structured_key(model, {"title": "other"}, first)
+    assert structured_key(model, SCHEMA, first) != structured_key(
+        model, SCHEMA, [first[0], HumanMessage("No")]
+    )
+
+
+def test_key_keeps_dates_and_numbers_the_user_gave() -> None:
+    model = CountingModel()
+    system = SystemMessage("### Today's date:\n2025-01-01")
+
+    def key(text: str) -> str:
+        return structured_key(model, SCHEMA, [system, HumanMessage(text)])
+
+    assert key("from 2025-03-01 to 2025-03-05") != key("from 2025-03-01 to 2025-03-15")
+    assert key("budget 1.500") != key("budget 1,500")
+    assert key("Yes!") != key("yes")
+    assert structured_key(model, SCHEMA, [SystemMessage("Trip starts 2025-03-01")]) != structured_key(
+        model, SCHEMA, [SystemMessage("Trip starts 2025-03-05")]
+    )
+
+
+def test_repeated_requests_are_answered_from_the_cache(tmp_path: Path) -> None:
+    model = CountingModel()
+    config = {"configurable": {"cache_path": str(tmp_path / "cache.sqlite")}}
+    messages = [SystemMessage("Validate"), HumanMessage("3 days in Colombo")]
+
+    first = invoke_structured(model, SCHEMA, messages, "validate_user_query", config)
+    second = invoke_structured(model, SCHEMA, messages, "validate_user_query", config)
+
+    assert first == second == {"is_valid": True, "call": 1}
+    assert model.calls == 1
+
+
+def test_caching_is_configured_per_node(tmp_path: Path) -> None:
+    model = CountingModel()
+    cache_path = str(tmp_path / "cache.sqlite")
+    messages = [HumanMessage("Yes")]
+    off = {
+        "configurable": {
+            "cache_path": cache_path,
+            "structured_cache": {"validate_itinerary": {"enabled": False}},
+        }
+    }
+    default = {"configurable": {"cache_path": cache_path}}
+
+    invoke_structured(model, SCHEMA, messages, "validate_itinerary", off)
+    invoke_structured(model, SCHEMA, messages, "validate_itinerary", off)
+    invoke_structured(model, SCHEMA, messages, "format_itinerary", default)
+    invoke_structured(model, SCHEMA, messages, "format_itinerary", default)
+
+    assert model.calls == 4
+    assert settings_for("format_itinerary", {"*": {"enabled": True}}).enabled
+    assert not settings_for("review_itinerary", {"*": {"enabled": False}}).enabled
@@ -0,0 +1,92 @@
+import importlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from react_agent import models
+from react_agent.configuration import Configuration
+
+from .stubs import ScriptedChatModel
+
+graph_module = importlib.import_module("react_agent.graph")
+
+
+def answer_intake(tool: Optional[str], messages: list[BaseMessage]) -> dict:
+    """Answer the intake requests for a complete query."""
+    if tool == "validation_schema":
+        return {"is_valid": True, "response_message": ""}
+    return {"destination": "Colombo", "number_of_days": 3, "budget": 500}
+
+
+def time_out(tool: Optional[str], messages: list[BaseMessage]) -> dict:
+    """Fail the way a model does when it hits `model_timeout`."""
+    raise TimeoutError("timed out")
+
+
+def test_model_chain_routes_nodes_and_appends_fallbacks() -> None:
+    configuration = Configuration(
+        node_models={"format_itinerary": "anthropic/claude-3-5-haiku-latest"},
+        model_fallbacks=["openai/gpt-4o-mini", "openai/gpt-4o"],
+    )
+
+    assert models.model_chain("validate_user_query", configuration) == ["openai/gpt-4o-mini", "openai/gpt-4o"]
+    assert models.model_chain("format_itinerary", configuration) == [
+        "anthropic/claude-3-5-haiku-latest", "openai/gpt-4o-mini", "openai/gpt-4o"
+    ]
+    assert models.model_chain(None, Configuration()) == ["openai/gpt-4o"]
+    assert models.split_model("anthropic/claude-3-5-haiku-latest") == ("anthropic", "claude-3-5-haiku-latest")
+    assert models.split_model("gpt-4o") == (None, "gpt-4o")
+
+
+def test_chat_models_are_built_once_per_spec(monkeypatch: pytest.MonkeyPatch) -> None:
+    built: list[tuple[str, Optional[str], dict]] = []
+
+    def init_chat_model(name: str, model_provider: Optional[str] = None, **kwargs: Any) -> Any:
+        built.append((name, model_provider, kwargs))
+        return ScriptedChatModel(respond=answer_intake)
+
+    monkeypatch.setattr("langchain.chat_models.init_chat_model", init_chat_model)
+    models.chat_model.cache_clear()
+    try:
+        first = models.chat_model("openai/gpt-4o-mini", 5.0)
+        assert models.chat_model("openai/gpt-4o-mini", 5.0) is first
+        models.chat_model("mistralai/mistral-small")
+    finally:
+        models.chat_model.cache_clear()
+
+    assert built == [
+        ("gpt-4o-mini", "openai", {"stream_usage": True, "timeout": 5.0}),
+        ("mistral-small", "mistralai", {}),
+    ]
+
+
+@pytest.mark.parametrize("small_fails", [False, True])
+def test_graph_nodes_use_their_configured_model(
+    small_fails: bool, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    small = ScriptedChatModel(respond=time_out if small_fails else answer_intake)
+    flagship = ScriptedChatModel(respond=answer_intake)
+    instances = {"openai/gpt-4o-mini": small, "openai/gpt-4o": flagship}
+    monkeypatch.setattr(models, "chat_model", lambda spec, timeout=None: instances[spec])
+    graph = graph_module.graph
+    config = {
+        "configurable": {
+            "thread_id": f"models-{small_fails}",
+            "cache_path": str(tmp_path / "cache.sqlite"),
+            "structured_cache": {"*": {"enabled": False}},
+        }
+    }
+
+    graph.invoke(
+        {"itinerary_messages": [HumanMessage("3 days in Colombo, 500 USD")]},
+        config,
+        interrupt_before=["research_itinerary", "research_category"],
+    )
+
+    assert [tool for tool, _ in small.calls] == ["validation_schema"]
+    fallback = ["validation_schema"] if small_fails else []
+    assert [tool for tool, _ in flagship.calls] == [*fallback, "profile_update_schema"]
+    assert json.loads(graph.get_state(config).values["itinerary_messages"][1].content)["is_valid"]
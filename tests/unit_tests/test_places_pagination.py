@@ -0,0 +1,65 @@
+import asyncio
+
+from aiohttp import web
+
+from react_agent import http_client, tools
+
+from .stubs import serve
+
+PAGES = {
+    None: {"places": [{"id": "a", "rating": 4.8, "servesVegetarianFood": True},
+                      {"id": "b", "rating": 4.1}], "nextPageToken": "p2"},
+    "p2": {"places": [{"id": "c", "rating": 4.6, "servesVegetarianFood": True}],
+           "nextPageToken": "p3"},
+    "p3": {"places": [{"id": "d", "rating": 4.9, "servesVegetarianFood": True}]},
+}
+
+
+def _run_against_pages(consume) -> list:
+    requested: list = []
+
+    async def search_text(request: web.Request) -> web.Response:
+        body = await request.json()
+        requested.append(body.get("pageToken"))
+        assert "nextPageToken" in request.headers["X-Goog-FieldMask"]
+        return web.json_response(PAGES[body.get("pageToken")])
+
+    async def run() -> None:
+        async with serve({("POST", "/v1/places:searchText"): search_text}) as base_url:
+            original = tools.GOOGLE_PLACES_URL
+            tools.GOOGLE_PLACES_URL = f"{base_url}/v1"
+            try:
+                await consume({"configurable": {"google_places_api_key": "pages"}}, requested)
+            finally:
+                tools.GOOGLE_PLACES_URL = original
+                await http_client.shutdown()
+
+    asyncio.run(run())
+    return requested
+
+
+def test_pages_are_yielded_in_order_and_prefetched() -> None:
+    async def consume(config, requested) -> None:
+        pages = []
+        async for page in tools.iter_google_places("cafes in Kandy", config):
+            await asyncio.sleep(0.05)
+            # The next page was requested while this one was being consumed.
+            assert len(requested) == min(len(pages) + 2, 3)
+            pages.append([place["id"] for place in page])
+        assert pages == [["a", "b"], ["c"], ["d"]]
+
+    assert _run_against_pages(consume) == [None, "p2", "p3"]
+
+
+def test_stop_when_skips_remaining_pages() -> None:
+    async def consume(config, requested) -> None:
+        places = await tools.collect_google_places(
+            "vegetarian restaurants in Kandy",
+            config,
+            stop_when=tools.enough_places(2, min_rating=4.5, vegetarian=True),
+            project=True,
+        )
+        assert [place["id"] for place in places] == ["a", "b", "c"]
+        assert places[0] == {"id": "a", "rating": 4.8, "vegetarian": True}
+
+    assert _run_against_pages(consume) == [None, "p2"]
@@ -0,0 +1,121 @@
+import json
+
+import numpy as np
+from langchain_core.messages import ToolMessage
+
+from react_agent.planning import (
+    candidate_places,
+    cluster_days,
+    haversine_matrix,
+    opening_window,
+    order_route,
+    plan_routes,
+)
+
+
+def _place(place_id: str, lat: float, lng: float, price_level: str = "moderate") -> dict:
+    return {
+        "id": place_id,
+        "name": place_id,
+        "location": {"lat": lat, "lng": lng},
+        "price_level": price_level,
+    }
+
+
+def test_haversine_matrix_matches_known_distances() -> None:
+    distances = haversine_matrix(np.array([0.0, 0.0, 1.0]), np.array([0.0, 1.0, 0.0]))
+
+    assert distances.shape == (3, 3)
+    assert np.allclose(np.diag(distances), 0.0)
+    assert np.allclose(distances, distances.T)
+    assert abs(distances[0, 1] - 111.19) < 0.05
+
+
+def test_cluster_days_keeps_nearby_places_together_and_balanced() -> None:
+    colombo = [_place(f"c{i}", 6.90 + i * 0.01, 79.85 + i * 0.01) for i in range(4)]
+    kandy = [_place(f"k{i}", 7.29 + i * 0.01, 80.63 + i * 0.01) for i in range(4)]
+    galle = [_place(f"g{i}", 6.03 + i * 0.01, 80.21 + i * 0.01) for i in range(4)]
+
+    clusters = cluster_days(colombo + kandy + galle, 3)
+
+    groups = [sorted(p["id"][0] for p in cluster.places) for cluster in clusters]
+    assert sorted(groups) == [["c"] * 4, ["g"] * 4, ["k"] * 4]
+    assert [cluster.day_number for cluster in clusters] == [1, 2, 3]
+    assert all(cluster.spread_km < 10 for cluster in clusters)
+
+
+def test_cluster_days_caps_places_per_day() -> None:
+    places = [_place(f"p{i}", 6.9 + i * 0.001, 79.85) for i in range(9)] + [_place("far", 8.5, 81.0)]
+
+    clusters = cluster_days(places, 2)
+
+    assert sorted(len(cluster.places) for cluster in clusters) == [5, 5]
+
+
+def test_candidate_places_reads_places_tool_messages() -> None:
+    places = [_place("a", 6.9, 79.8), {"id": "b", "name": "No location"}]
+    messages = [
+        ToolMessage(content=json.dumps({"places": places}), name="query_google_places", tool_call_id="1"),
+        ToolMessage(content=json.dumps({"results": []}), name="tavily_web_search", tool_call_id="2"),
+    ]
+
+    assert candidate_places(messages) == [places[0]]
+
+
+def test_order_route_untangles_a_day() -> None:
+    # Four stops along a line, given out of order.
+    places = [_place(name, 6.9, 79.80 + offset) for name, offset in
+              [("a", 0.00), ("c", 0.02), ("b", 0.01), ("d", 0.03)]]
+
+    route = order_route(places)
+
+    assert [places[i]["id"] for i in route.order] in (list("abcd"), list("dcba"))
+    assert len(route.legs) == 3
+    assert all(leg.travel_minutes > 0 for leg in route.legs)
+
+
+def test_order_route_respects_opening_windows() -> None:
+    # Without windows the shortest path visits "a" second; it closes at 10:30.
+    places = [_place("a", 6.9, 79.81), _place("b", 6.9, 79.80), _place("c", 6.9, 79.82)]
+    windows = [(9 * 60, 10 * 60 + 30), None, None]
+
+    assert order_route(places).order[1] == 0
+    route = order_route(places, windows=windows)
+
+    assert route.order[0] == 0
+    assert route.late_stops == 0
+
+
+def test_plan_routes_reorders_itinerary_days() -> None:
+    places = [_place("Fort", 6.93, 79.84), _place("Museum", 6.91, 79.86), _place("Cafe", 6.92, 79.85)]
+    itinerary = {
+        "days": [
+            {
+                "day_number": 1,
+                "attractions": [{"name": "Museum"}, {"name": "Fort"}, {"name": "Unknown"}],
+                "dining": [{"name": "cafe"}],
+            }
+        ]
+    }
+
+    day = plan_routes(itinerary, places)["days"][0]
+
+    assert [leg["from"] for leg in day["route"]] in (["Fort", "Cafe"], ["Museum", "Cafe"])
+    assert day["attractions"][-1] == {"name": "Unknown"}
+    assert {leg["to"] for leg in day["route"]} | {day["route"][0]["from"]} == {"Fort", "Cafe", "Museum"}
+
+
+def test_plan_routes_keeps_to_opening_hours() -> None:
+    # Shortest path visits "Fort" second; the Places hours close it at 10:30.
+    places = [_place("Fort", 6.9, 79.81), _place("Museum", 6.9, 79.80), _place("Cafe", 6.9, 79.82)]
+    places[0]["hours"] = "09:00-10:30"
+    places[2]["hours"] = "18:00-02:00"
+    itinerary = {
+        "days": [{"day_number": 1, "attractions": [{"name": "Museum"}, {"name": "Fort"}], "dining": [{"name": "Cafe"}]}]
+    }
+
+    day = plan_routes(itinerary, places)["days"][0]
+
+    assert opening_window(places[2]) == (18 * 60, 26 * 60)
+    assert opening_window(places[1]) is None
+    assert day["route"][0]["from"] == "Fort"
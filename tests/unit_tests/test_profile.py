@@ -0,0 +1,105 @@
+import importlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from react_agent.profile import (
+    DEFAULT_SOURCE,
+    UNTRACKED_SOURCE,
+    merge_extracted,
+    new_human_messages,
+)
+from react_agent.state import State
+
+from .stubs import ScriptedChatModel
+
+graph_module = importlib.import_module("react_agent.graph")
+
+
+def update(tool: Optional[str], messages: list[BaseMessage]) -> dict:
+    """Return the trip length of the last message, and the destination if it is named."""
+    last = str(messages[-1].content)
+    args: dict[str, Any] = {"number_of_days": int(last.split()[0])}
+    if "Colombo" in last:
+        args.update(destination="Colombo", budget=500)
+    return args
+
+
+def test_new_human_messages_start_after_the_cursor() -> None:
+    messages = [
+        HumanMessage("first", id="1"), AIMessage("reply", id="2"), HumanMessage("second", id="3")
+    ]
+
+    assert [m.id for m in new_human_messages(messages, "1")] == ["3"]
+    assert new_human_messages(messages, "3") == []
+    assert [m.id for m in new_human_messages(messages, "gone")] == ["1", "3"]
+
+
+def test_merge_keeps_stated_values_and_records_their_source() -> None:
+    profile, sources = merge_extracted(None, None, {"destination": "Colombo", "budget": 500}, "m1")
+
+    assert profile["number_of_people"] == 1
+    assert (sources["destination"], sources["number_of_people"]) == ("m1", DEFAULT_SOURCE)
+
+    profile, sources = merge_extracted(profile, sources, {"number_of_people": 3, "budget": None}, "m2")
+
+    assert (profile["number_of_people"], profile["budget"]) == (3, 500)
+    assert (sources["number_of_people"], sources["budget"]) == ("m2", "m1")
+
+
+def test_feedback_rounds_only_send_new_messages(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    model = ScriptedChatModel(respond=update)
+    monkeypatch.setattr(graph_module, "get_llm", lambda: model)
+    graph = graph_module.graph
+    config = {
+        "configurable": {
+            "thread_id": "profile",
+            "cache_path": str(tmp_path / "cache.sqlite"),
+            "structured_cache": {"*": {"enabled": False}},
+        }
+    }
+    stop = ["research_itinerary", "research_category"]
+    graph.update_state(
+        config,
+        {"itinerary_messages": [HumanMessage("3 days in Colombo"), AIMessage(json.dumps({"is_valid": True}))]},
+        as_node="validate_user_query",
+    )
+    graph.invoke(None, config, interrupt_before=stop)
+    graph.update_state(
+        config,
+        {
+            "itinerary_messages": [
+                AIMessage("Does this look good to you?"),
+                HumanMessage("5 days please"),
+                AIMessage(json.dumps({"is_approved": False, "valid_feedback": True})),
+            ]
+        },
+        as_node="validate_itinerary",
+    )
+
+    graph.invoke(None, config, interrupt_before=stop)
+
+    sent = [[m.content for m in messages[1:]] for messages in model.requests("profile_update_schema")]
+    assert sent == [["3 days in Colombo"], ["5 days please"]]
+    values = graph.get_state(config).values
+    assert (values["user_profile"]["number_of_days"], values["user_profile"]["destination"]) == (5, "Colombo")
+    sources = values["profile_sources"]
+    assert sources["number_of_days"] == values["profile_cursor"] != sources["destination"]
+    assert sources["has_pets"] == DEFAULT_SOURCE
+
+
+def test_messages_without_ids_get_an_untracked_source(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(graph_module, "get_llm", lambda: ScriptedChatModel(respond=update))
+    state = State(itinerary_messages=[HumanMessage("4 days in Colombo")], hotel_messages=[])
+    config = {"configurable": {"structured_cache": {"*": {"enabled": False}}}}
+
+    update_ = graph_module.update_user_profile(state, config)
+
+    assert update_["user_profile"]["number_of_days"] == 4
+    assert update_["profile_sources"]["number_of_days"] == UNTRACKED_SOURCE
+    assert update_["profile_cursor"] == state.profile_cursor
@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+from react_agent.projection import compact_places, project_place
+
+SAMPLE = Path(__file__).resolve().parents[2] / "our_sample.json"
+
+
+def test_project_place_keeps_itinerary_fields() -> None:
+    place = json.loads(SAMPLE.read_text())["places"][0]
+    slim = project_place(place, max_reviews=1, max_review_chars=40)
+
+    assert slim["id"] == "ChIJLWyNjg5Z4joRnX-WxQT5x2E"
+    assert slim["name"] == "Havelock Gaming Cafe"
+    assert slim["location"] == {"lat": 6.88293, "lng": 79.869216}
+    assert slim["rating"] == 4.7
+    assert slim["website"] == "https://www.facebook.com/pnxhub/"
+    assert len(slim["reviews"]) == 1
+    assert slim["reviews"][0].startswith("5/5: ")
+    assert len(slim["reviews"][0]) <= len("5/5: ") + 40
+    assert "photos" not in slim and "addressComponents" not in slim
+
+
+def test_project_place_keeps_the_hours_open_every_day() -> None:
+    places = json.loads(SAMPLE.read_text())["places"]
+
+    # Open until 21:00 early in the week and 22:00 later, and past midnight.
+    assert project_place(places[4])["hours"] == "09:00-21:00"
+    assert project_place(places[0])["hours"] == "09:00-03:00"
+    # Always open: no window worth sending.
+    assert "hours" not in project_place(places[1])
+
+
+def test_compact_places_reports_savings() -> None:
+    payload = json.loads(SAMPLE.read_text())
+    slim, report = compact_places(payload)
+
+    assert len(slim["places"]) == len(payload["places"])
+    assert report.projected_bytes < report.raw_bytes
+    assert report.bytes_saved == report.raw_bytes - report.projected_bytes
+    assert 0 < report.projected_tokens < report.raw_tokens
@@ -0,0 +1,52 @@
+import importlib
+import os
+
+from react_agent import prompts
+from react_agent.state import State
+
+graph_module = importlib.import_module("react_agent.graph")
+
+STATIC_PROMPTS = {
+    "validate_user_query": prompts.VALIDATE_INPUT_PROMPT,
+    "update_user_profile": prompts.PROFILE_UPDATE_PROMPT,
+    "research_itinerary": prompts.GENERATE_ITINERARY_PROMPT,
+    "format_itinerary": prompts.FORMAT_ITINERARY_PROMPT,
+    "review_itinerary": prompts.REFLECTION_ITINERARY_PROMPT,
+}
+
+
+def make_state(destination: str, feedback: str = "", itinerary: dict | None = None) -> State:
+    return State(
+        itinerary_messages=[],
+        hotel_messages=[],
+        user_profile={"destination": destination},
+        itinerary=itinerary or {},
+        itinerary_feedback=feedback,
+    )
+
+
+def test_every_node_prompt_starts_with_its_static_prefix() -> None:
+    first = make_state("Colombo")
+    second = make_state("Kandy", "More temples please.", {"days": [{"day_number": 1}]})
+
+    assert set(graph_module.NODE_PROMPTS) == set(STATIC_PROMPTS)
+    for node, build in graph_module.NODE_PROMPTS.items():
+        static = STATIC_PROMPTS[node]
+        rendered = build(first), build(second)
+        assert all(text.startswith(static) for text in rendered), node
+        assert len(os.path.commonprefix(rendered)) >= len(static), node
+
+
+def test_user_data_stays_out_of_the_static_prefix() -> None:
+    state = make_state("Trincomalee", "Swap day two", {"days": [{"day_number": 7}]})
+
+    for node in ("research_itinerary", "format_itinerary", "review_itinerary"):
+        static = STATIC_PROMPTS[node]
+        rendered = graph_module.NODE_PROMPTS[node](state)
+        assert "Trincomalee" not in static
+        assert "Trincomalee" in rendered[len(static):], node
+
+
+def test_research_prefix_is_long_enough_for_provider_caching() -> None:
+    assert len(prompts.GENERATE_ITINERARY_PROMPT) > 4096
+    assert str(prompts.ITINERARY_SCHEMA) in prompts.REFLECTION_ITINERARY_PROMPT
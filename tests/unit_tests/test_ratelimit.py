@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from react_agent import http_client, tools
+from react_agent.ratelimit import (
+    AdaptiveConcurrency,
+    LimiterSettings,
+    RateLimitExceeded,
+    Throttled,
+    TokenBucket,
+    UpstreamLimiter,
+    get_limiter,
+)
+
+from .stubs import serve
+
+
+def test_token_bucket_spaces_requests_after_burst() -> None:
+    bucket = TokenBucket(rate=100, burst=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.01, abs=2e-3)
+    assert delays[3] == pytest.approx(0.02, abs=2e-3)
+
+
+def test_window_halves_on_throttle_and_grows_on_success() -> None:
+    window = AdaptiveConcurrency(LimiterSettings(max_concurrency=8, latency_target=1.0))
+    window.on_throttle()
+    assert window.limit == 4
+    window.on_success(latency=0.1)
+    assert window.limit == pytest.approx(4.25)
+    window.on_success(latency=2.0)
+    assert window.limit == pytest.approx(4.25 * 0.9)
+
+
+def test_limiter_gives_up_after_max_attempts() -> None:
+    limiter = UpstreamLimiter("stub", LimiterSettings(rate=1000, max_attempts=2))
+
+    async def always_throttled() -> None:
+        raise Throttled(retry_after=0)
+
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(limiter.call(always_throttled))
+    assert limiter.stats.throttled == 2
+
+
+def test_places_calls_survive_a_throttling_upstream() -> None:
+    in_flight = 0
+    throttled = 0
+
+    async def search_text(request: web.Request) -> web.Response:
+        nonlocal in_flight, throttled
+        body = await request.json()
+        if in_flight >= 2:
+            throttled += 1
+            return web.json_response({}, status=429, headers={"Retry-After": "0.02"})
+        in_flight += 1
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            in_flight -= 1
+        return web.json_response({"places": [{"id": body["textQuery"]}]})
+
+    async def run() -> list:
+        async with serve({("POST", "/v1/places:searchText"): search_text}) as base_url:
+            original = tools.GOOGLE_PLACES_URL
+            tools.GOOGLE_PLACES_URL = f"{base_url}/v1"
+            config = {
+                "configurable": {
+                    "google_places_api_key": "throttle-test",
+                    "places_cache_ttl_seconds": 0,
+                    "rate_limits": {
+                        "google_places": {"rate": 1000, "burst": 50, "max_concurrency": 8}
+                    },
+                }
+            }
+            try:
+                return await asyncio.gather(
+                    *(tools.query_google_places(f"q{i}", config=config) for i in range(20))
+                )
+            finally:
+                tools.GOOGLE_PLACES_URL = original
+                await http_client.shutdown()
+
+    results = asyncio.run(run())
+    assert [r["places"][0]["id"] for r in results] == [f"q{i}" for i in range(20)]
+    assert throttled > 0
+    stats = get_limiter("google_places", "throttle-test").snapshot()
+    assert stats["throttled"] == throttled
+    assert stats["concurrency_limit"] < 8
+    assert stats["failures"] == 0
+
+
+@pytest.mark.parametrize(
+    ("message", "calls"),
+    [("This request exceeds your plan's set usage limit.", 1), ("Rate limit exceeded.", 3)],
+)
+def test_tavily_quota_errors_fail_at_once(
+    message: str, calls: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from tavily import UsageLimitExceededError
+
+    attempts = 0
+
+    class Client:
+        async def search(self, **kwargs: object) -> dict:
+            nonlocal attempts
+            attempts += 1
+            raise UsageLimitExceededError(message)
+
+    monkeypatch.setattr(tools, "get_tavily_client", Client)
+    monkeypatch.setenv("TAVILY_API_KEY", f"tavily-{calls}")
+    config = {
+        "configurable": {
+            "dedupe_tool_calls": False,
+            "rate_limits": {"tavily": {"max_attempts": 3, "base_backoff": 0.001, "max_backoff": 0.001}},
+        }
+    }
+
+    # A spent quota fails at once; a rate limit is retried until the limiter gives up.
+    expected = UsageLimitExceededError if calls == 1 else RateLimitExceeded
+    with pytest.raises(expected):
+        asyncio.run(tools.tavily_web_search("Colombo", config=config))
+    assert attempts == calls
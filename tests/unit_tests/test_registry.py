@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+from react_agent.projection import project_place
+from react_agent.registry import PlaceRegistry
+
+SAMPLE = Path(__file__).resolve().parents[2] / "our_sample.json"
+
+
+def test_repeated_places_become_references_per_thread() -> None:
+    places = [project_place(p) for p in json.loads(SAMPLE.read_text())["places"][:6]]
+    registry = PlaceRegistry()
+
+    first = registry.dedupe(places[:4], "t1")
+    second = registry.dedupe(places[2:6], "t1")
+    other_thread = registry.dedupe(places[2:6], "t2")
+
+    assert first == places[:4]
+    assert second[:2] == [
+        {"id": p["id"], "name": p["name"], "ref": "already listed earlier in this conversation"}
+        for p in places[2:4]
+    ]
+    assert second[2:] == places[4:6]
+    assert other_thread == places[2:6]
+    assert len(registry) == 6
+    assert registry.stats.references == 2
+    assert registry.stats.bytes_after < registry.stats.bytes_before
+
+
+def test_get_many_returns_known_records_and_tracks_refresh() -> None:
+    raw = json.loads(SAMPLE.read_text())["places"][:2]
+    registry = PlaceRegistry()
+    registry.dedupe(raw, None)
+    first_seen = registry.get(raw[0]["id"])["first_seen"]
+
+    registry.upsert(raw[0])
+    found = registry.get_many([raw[0]["id"], raw[1]["id"], "missing"])
+
+    assert set(found) == {raw[0]["id"], raw[1]["id"]}
+    assert found[raw[0]["id"]]["name"] == "Havelock Gaming Cafe"
+    assert found[raw[0]["id"]]["first_seen"] == first_seen
+    assert found[raw[0]["id"]]["last_refreshed"] >= first_seen
@@ -0,0 +1,122 @@
+import asyncio
+import importlib
+import re
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import ensure_config
+
+from react_agent import tools
+from react_agent.registry import PlaceRegistry
+from react_agent.research import (
+    RESEARCH_SCOPE,
+    merge_notes,
+    research_scope,
+    research_tasks,
+    split_cities,
+)
+
+from .stubs import ScriptedChatModel
+
+graph_module = importlib.import_module("react_agent.graph")
+
+
+FOCUS = re.compile(r"### Your part of the research:\n(\w+)")
+
+
+def research_category(tool: Optional[str], messages: list[BaseMessage]) -> AIMessage:
+    """Ask for one tool round while tools are bound, then report the category."""
+    focus = FOCUS.search(str(messages[0].content))
+    if tool:
+        call = {"name": "lookup_places", "args": {"place_ids": []}, "id": f"call_{focus[1]}"}
+        return AIMessage("", tool_calls=[call])
+    return AIMessage(f"<FINAL_OUTPUT>{focus[1]} notes</FINAL_OUTPUT>")
+
+
+def test_tasks_split_by_category_and_city() -> None:
+    assert split_cities("Colombo, Kandy and  galle / colombo") == ["Colombo", "Kandy", "galle"]
+
+    tasks = research_tasks({"destination": "Colombo and Kandy"}, ["attractions", "dining"], True)
+    assert [(t["category"], t["city"]) for t in tasks] == [
+        ("attractions", "Colombo"), ("attractions", "Kandy"), ("dining", "Colombo"), ("dining", "Kandy"),
+    ]
+    assert len(research_tasks({"destination": "Colombo and Kandy"}, ["dining"])) == 1
+    assert research_tasks({}, ["nightlife"])[0]["focus"] == "nightlife"
+
+
+def test_merge_notes_orders_by_configured_category() -> None:
+    notes = [
+        {"category": "tips", "city": "Colombo", "findings": "<FINAL_OUTPUT>Take the train</FINAL_OUTPUT>"},
+        {"category": "attractions", "city": "Colombo", "findings": "Galle Face"},
+    ]
+
+    merged = merge_notes(notes, ["attractions", "dining", "tips"])
+
+    assert merged == (
+        "<FINAL_OUTPUT>\n## Attractions in Colombo\nGalle Face\n\n"
+        "## Tips in Colombo\nTake the train\n</FINAL_OUTPUT>"
+    )
+
+
+def test_graph_researches_categories_with_bounded_sub_agents(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    scopes: set[str] = set()
+
+    def respond(tool: Optional[str], messages: list[BaseMessage]) -> AIMessage:
+        scopes.add(ensure_config()["configurable"][RESEARCH_SCOPE])
+        return research_category(tool, messages)
+
+    model = ScriptedChatModel(respond=respond)
+    monkeypatch.setattr(graph_module, "get_llm", lambda: model)
+    monkeypatch.setattr(graph_module, "get_token_counter", lambda: count_tokens_approximately)
+    graph = graph_module.graph
+    config = {
+        "configurable": {
+            "thread_id": "research",
+            "research_categories": ["attractions", "dining", "tips"],
+            "research_tool_rounds": 1,
+            "cache_path": str(tmp_path / "cache.sqlite"),
+            "structured_cache": {"*": {"enabled": False}},
+        }
+    }
+    graph.update_state(
+        config,
+        {
+            "itinerary_messages": [("user", "3 days in Colombo")],
+            "user_profile": {"destination": "Colombo", "number_of_days": 3},
+        },
+        as_node="update_user_profile",
+    )
+
+    asyncio.run(graph.ainvoke(None, config, interrupt_before=["format_itinerary"]))
+
+    state = graph.get_state(config).values
+    requests = [(FOCUS.search(str(messages[0].content))[1], tool is not None) for tool, messages in model.calls]
+    assert sorted(requests) == sorted(
+        [(category, tools) for category in ("Attractions", "Dining", "General") for tools in (True, False)]
+    )
+    messages = state["itinerary_messages"]
+    assert sum(isinstance(m, ToolMessage) for m in messages) == 3
+    assert messages[-1].content.startswith("<FINAL_OUTPUT>\n## Attractions in Colombo\nAttractions notes")
+    assert "## Tips in Colombo\nGeneral notes" in messages[-1].content
+    assert state["research_notes"] == []
+    assert scopes == {"attractions/Colombo", "dining/Colombo", "tips/Colombo"}
+
+
+def test_sub_agents_remember_places_apart_from_each_other() -> None:
+    registry = PlaceRegistry()
+    place = {"id": "p1", "name": "Fort"}
+    tasks = research_tasks({"destination": "Colombo"}, ["attractions", "dining"])
+    threads = [
+        tools._thread_id({"configurable": {"thread_id": "t", RESEARCH_SCOPE: research_scope(task)}})
+        for task in tasks
+    ]
+
+    assert threads == ["t/attractions/Colombo", "t/dining/Colombo"]
+    assert [registry.dedupe([place], thread) for thread in threads] == [[place], [place]]
+    assert registry.dedupe([place], threads[0])[0]["ref"]
+    assert tools._thread_id({"configurable": {"thread_id": "t"}}) == "t"
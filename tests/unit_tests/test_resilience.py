@@ -0,0 +1,125 @@
+import asyncio
+from typing import Awaitable, Callable
+
+import aiohttp
+import pytest
+
+from react_agent.resilience import (
+    RetryBudget,
+    ToolPolicy,
+    policy_for,
+    resilience_stats,
+    resilient_call,
+)
+
+
+def _response_error(status: int) -> aiohttp.ClientResponseError:
+    return aiohttp.ClientResponseError(None, (), status=status)  # type: ignore[arg-type]
+
+
+def test_hedge_returns_the_faster_duplicate() -> None:
+    attempts = 0
+    cancelled = []
+
+    async def call() -> str:
+        nonlocal attempts
+        attempts += 1
+        mine = attempts
+        try:
+            await asyncio.sleep(1.0 if mine == 1 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(mine)
+            raise
+        return f"attempt {mine}"
+
+    policy = ToolPolicy(hedge=True, hedge_default_delay=0.02)
+    result = asyncio.run(resilient_call("hedge_tool", call, policy))
+
+    assert result == "attempt 2"
+    assert cancelled == [1]
+    stats = resilience_stats()["hedge_tool"]
+    assert stats["hedges_sent"] == 1 and stats["hedges_won"] == 1
+
+
+def test_hedge_delay_starts_once_the_limiter_admits_the_call() -> None:
+    attempts = 0
+
+    async def queued(send: Callable[[], Awaitable[str]]) -> str:
+        await asyncio.sleep(0.05)
+        return await send()
+
+    async def call() -> str:
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        return "done"
+
+    policy = ToolPolicy(hedge=True, hedge_default_delay=0.02)
+
+    assert asyncio.run(resilient_call("queued_tool", call, policy, admit=queued)) == "done"
+    assert attempts == 1
+    assert resilience_stats()["queued_tool"]["hedges_sent"] == 0
+
+
+def test_cancelling_a_hedged_call_cancels_its_attempts() -> None:
+    cancelled = []
+
+    async def call() -> str:
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "late"
+
+    async def run() -> None:
+        policy = ToolPolicy(hedge=True, hedge_default_delay=0.5)
+        task = asyncio.create_task(resilient_call("cancelled_tool", call, policy))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert cancelled == [True]
+
+
+def test_transient_errors_are_retried() -> None:
+    failures = [_response_error(503), aiohttp.ServerDisconnectedError()]
+
+    async def call() -> str:
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    policy = ToolPolicy(max_retries=2, base_backoff=0.001)
+    assert asyncio.run(resilient_call("retry_tool", call, policy)) == "ok"
+    assert resilience_stats()["retry_tool"]["retries"] == 2
+
+
+def test_client_errors_are_not_retried() -> None:
+    calls = 0
+
+    async def call() -> str:
+        nonlocal calls
+        calls += 1
+        raise _response_error(400)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(resilient_call("bad_request_tool", call, ToolPolicy(max_retries=3)))
+    assert calls == 1
+
+
+def test_retry_budget_caps_extra_attempts() -> None:
+    budget = RetryBudget(ratio=0.5, min_reserve=1)
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_withdraw()
+
+
+def test_policy_overrides_merge_with_defaults() -> None:
+    policy = policy_for("tavily_web_search", {"tavily_web_search": {"hedge": True}})
+    assert policy.hedge and policy.max_retries == 2
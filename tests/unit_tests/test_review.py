@@ -0,0 +1,150 @@
+import importlib
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage
+from langgraph.types import Command
+
+from react_agent.review import check_itinerary, compile_schema, needs_llm_review
+from react_agent.state import State
+
+from .stubs import ScriptedChatModel
+
+graph_module = importlib.import_module("react_agent.graph")
+
+
+def day(number: int, *names: str, cost: float = 100) -> dict:
+    attractions = [{"name": name, "type": "sight", "location": "Colombo"} for name in names[:2]]
+    dining = [{"name": name, "type": "cafe", "location": "Colombo"} for name in names[2:]]
+    return {"day_number": number, "attractions": attractions, "dining": dining, "daily_cost_estimate": cost}
+
+
+def itinerary(*days: dict) -> dict:
+    return {"destination": "Colombo", "country": "Sri Lanka", "trip_duration": len(days), "days": list(days)}
+
+
+GOOD = itinerary(day(1, "Fort", "Museum", "Cafe A", "Cafe B"), day(2, "Temple", "Beach", "Cafe C", "Cafe D"))
+
+
+def test_compiled_schema_reports_paths() -> None:
+    validate = compile_schema({
+        "type": "object",
+        "required": ["days"],
+        "properties": {
+            "days": {"type": "array", "items": {"type": "integer", "minimum": 1}},
+            "cost": {"oneOf": [{"type": "number"}, {"type": "string", "pattern": "^\\$[0-9]+$"}]},
+        },
+    })
+
+    assert list(validate({"days": [1, 2], "cost": "$12"})) == []
+    assert list(validate({"days": [0, "x"], "cost": "12"})) == [
+        "$.days[0]: 0 is below the minimum 1",
+        "$.days[1]: expected integer, got str",
+        "$.cost: matches 0 of the allowed forms instead of exactly one",
+    ]
+    assert list(validate([])) == ["$: expected object, got list"]
+
+
+def test_checks_budget_counts_and_duplicates() -> None:
+    bad = itinerary(day(1, "Fort", "Museum", "Cafe A", "Cafe B", cost=300), day(2, "Fort", cost=300))
+
+    findings = check_itinerary(bad, {"budget": 500, "number_of_days": 3})
+
+    assert {f.code for f in findings} == {"day_count", "attractions", "dining", "duplicate", "budget"}
+    assert all(f.severity == "error" for f in findings)
+    assert check_itinerary(GOOD, {"budget": 1000, "number_of_days": 2}) == []
+    assert not needs_llm_review(check_itinerary(bad, {"budget": 500}))
+    assert not needs_llm_review([])
+    assert needs_llm_review(check_itinerary(GOOD, {"budget": 210}))
+    assert needs_llm_review([], "always")
+
+
+@pytest.mark.parametrize(
+    ("counter", "goto"), [(0, "research_itinerary"), (1, "validate_itinerary")]
+)
+def test_review_sends_errors_back_until_the_iteration_limit(
+    counter: int, goto: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # The model must not be called for rule-based findings.
+    monkeypatch.setattr(graph_module, "get_llm", None)
+    state = State(
+        itinerary_messages=[],
+        hotel_messages=[],
+        user_profile={"budget": 500, "number_of_days": 2},
+        itinerary=itinerary(day(1, "Fort", "Museum", "Cafe A", "Cafe B", cost=800), day(2, "Fort")),
+        iteration_counter=counter,
+    )
+    config = {"configurable": {"max_review_iterations": 1}}
+
+    command = graph_module.review_itinerary(state, config)
+
+    assert command.goto == goto
+    if goto == "research_itinerary":
+        assert command.update["iteration_counter"] == 1
+        assert "over the budget" in command.update["itinerary_feedback"]
+        assert "Fort is planned on day 1 and again on day 2" in command.update["itinerary_feedback"]
+
+
+def review_flow(shown: threading.Event) -> Any:
+    """Format a one-day itinerary, review it once `shown` is set and reject it for the user."""
+
+    def respond(tool: Optional[str], messages: list[BaseMessage]) -> dict:
+        if tool == "itinerary_schema":
+            return itinerary(day(1, "Fort", "Museum", "Cafe A", "Cafe B"))
+        if tool == "Destination":
+            assert shown.wait(timeout=10), "the itinerary was not shown before the review finished"
+            return {"is_satisfactory": False, "feedback": "Leave room in the budget for transport."}
+        return {"is_approved": False, "valid_feedback": True, "llm_response": "Will do"}
+
+    return respond
+
+
+def test_background_review_shows_the_itinerary_first_and_reports_problems(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    shown = threading.Event()
+    model = ScriptedChatModel(respond=review_flow(shown))
+    monkeypatch.setattr(graph_module, "get_llm", lambda: model)
+    graph = graph_module.graph
+    config = {
+        "configurable": {
+            "thread_id": "background-review",
+            "background_review": True,
+            "cache_path": str(tmp_path / "cache.sqlite"),
+            "structured_cache": {"*": {"enabled": False}},
+        }
+    }
+    graph.update_state(
+        config,
+        {
+            "itinerary_messages": [("user", "1 day"), AIMessage("<FINAL_OUTPUT>notes</FINAL_OUTPUT>")],
+            "user_profile": {"destination": "Colombo", "number_of_days": 1, "budget": 105},
+        },
+        as_node="research_itinerary",
+    )
+
+    events = []
+    for mode, chunk in graph.stream(None, config, stream_mode=["updates", "custom"]):
+        events.append((mode, chunk))
+        if mode == "updates" and "__interrupt__" in chunk:
+            shown.set()
+
+    kinds = [
+        "interrupt" if mode == "updates" and "__interrupt__" in chunk
+        else chunk.get("type") if mode == "custom" else next(iter(chunk))
+        for mode, chunk in events
+    ]
+    assert kinds.index("interrupt") < kinds.index("itinerary_review")
+    interrupt_value = events[kinds.index("interrupt")][1]["__interrupt__"][0].value
+    assert interrupt_value["review_pending"] is True
+    notice = events[kinds.index("itinerary_review")][1]["feedback"]
+    assert notice == "Leave room in the budget for transport."
+    assert graph.get_state(config).values["review_feedback"] == notice
+
+    graph.invoke(Command(resume="More beaches please"), config, interrupt_before=["update_user_profile"])
+
+    feedback = graph.get_state(config).values["itinerary_feedback"]
+    assert feedback.startswith("More beaches please")
+    assert notice in feedback
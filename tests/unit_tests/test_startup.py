@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+DEFERRED = ["openai", "langchain_openai", "tavily", "exa_py", "langchain_community"]
+
+
+def test_graph_imports_without_api_keys_or_provider_sdks() -> None:
+    env = {
+        k: v for k, v in os.environ.items()
+        if k not in ("OPENAI_API_KEY", "EXA_API_KEY", "TAVILY_API_KEY")
+    }
+    code = (
+        "import sys, react_agent.graph; "
+        f"print(','.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
@@ -0,0 +1,86 @@
+import json
+
+from langgraph.config import get_stream_writer
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from react_agent.schemas import ITINERARY_SCHEMA
+from react_agent.streaming import DaysStreamParser, invoke_streaming_days
+
+from .stubs import ScriptedChatModel, StreamingChatModel
+
+ITINERARY = {
+    "destination": "Colombo {city}",
+    "country": "Sri Lanka",
+    "trip_duration": 3,
+    "days": [
+        {
+            "day_number": day,
+            "attractions": [{"name": f'Fort "{day}" ]}}', "type": "history", "location": "Fort"}],
+            "dining": [],
+        }
+        for day in (1, 2, 3)
+    ],
+    "general_tips": {"days": [{"not": "a day"}]},
+}
+
+
+def test_parser_returns_each_day_when_its_brace_closes() -> None:
+    text = json.dumps(ITINERARY)
+    parser = DaysStreamParser()
+    seen = []
+    for index, char in enumerate(text):
+        for day in parser.feed(char):
+            seen.append((day, index))
+
+    assert [day for day, _ in seen] == ITINERARY["days"]
+    for day, index in seen:
+        assert text[: index + 1].endswith(json.dumps(day))
+    assert len(parser.text) < 100
+
+
+def test_days_reach_the_graph_stream_before_the_model_finishes() -> None:
+    model = StreamingChatModel(respond=lambda tool, messages: ITINERARY)
+    structured = model.with_structured_output(ITINERARY_SCHEMA)
+    result = {}
+    sent_at = []
+
+    def format_itinerary(state: MessagesState) -> dict:
+        write = get_stream_writer()
+
+        def writer(event: dict) -> None:
+            sent_at.append(model.streamed)
+            write(event)
+
+        result["itinerary"] = invoke_streaming_days(structured, state["messages"], writer=writer)
+        return {"messages": [("ai", "done")]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node(format_itinerary)
+    builder.add_edge(START, "format_itinerary")
+    builder.add_edge("format_itinerary", END)
+    graph = builder.compile()
+
+    events = list(
+        graph.stream({"messages": [("user", "3 days")]}, stream_mode=["custom", "updates"])
+    )
+
+    days = [chunk for mode, chunk in events if mode == "custom"]
+    assert [chunk["day"] for chunk in days] == ITINERARY["days"]
+    assert [chunk["day_index"] for chunk in days] == [0, 1, 2]
+    assert events[-1][0] == "updates"
+    # Day 1 went out while most of the response was still to come.
+    assert sent_at[0] < model.streamed / 2
+    assert sent_at == sorted(sent_at) and sent_at[-1] < model.streamed
+    assert result["itinerary"] == ITINERARY
+
+
+def test_days_are_still_written_when_the_model_cannot_stream() -> None:
+    model = ScriptedChatModel(respond=lambda tool, messages: ITINERARY)
+
+    written = []
+    response = invoke_streaming_days(
+        model.with_structured_output(ITINERARY_SCHEMA), [], writer=written.append
+    )
+
+    assert response == ITINERARY
+    assert [event["day"] for event in written] == ITINERARY["days"]
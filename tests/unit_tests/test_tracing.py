@@ -0,0 +1,116 @@
+import asyncio
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tools import tool
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from react_agent.tracing import aggregate, annotate, load_spans, trace_to
+
+
+@tool
+async def cached_lookup(query: str) -> str:
+    """Pretend to answer from a cache."""
+    annotate(cache="hit")
+    return f"answer for {query}"
+
+
+def build_graph() -> StateGraph:
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(
+                    "Colombo it is",
+                    usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15},
+                )
+            ]
+        )
+    )
+
+    async def ask(state: MessagesState) -> dict:
+        return {"messages": [await model.ainvoke(state["messages"])]}
+
+    async def look(state: MessagesState) -> dict:
+        answer = await cached_lookup.ainvoke({"query": "Colombo"})
+        return {"messages": [("ai", answer)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node(ask)
+    builder.add_node(look)
+    builder.add_edge(START, "ask")
+    builder.add_edge("ask", "look")
+    builder.add_edge("look", END)
+    return builder.compile()
+
+
+def test_spans_cover_nodes_llm_calls_and_tools(tmp_path: Path) -> None:
+    path = tmp_path / "spans.jsonl"
+    graph = build_graph()
+    config = {"configurable": {"thread_id": "t1"}}
+
+    with trace_to(path):
+        asyncio.run(graph.ainvoke({"messages": [("user", "Where to?")]}, config))
+
+    spans = load_spans(path)
+    by_kind = {(span["kind"], span["name"]): span for span in spans}
+    assert set(by_kind) == {
+        ("node", "ask"),
+        ("node", "look"),
+        ("llm", "GenericFakeChatModel"),
+        ("tool", "cached_lookup"),
+    }
+    assert all(span["thread_id"] == "t1" for span in spans)
+    assert all(span["duration_ms"] >= 0 for span in spans)
+
+    llm = by_kind[("llm", "GenericFakeChatModel")]
+    assert (llm["input_tokens"], llm["output_tokens"]) == (12, 3)
+    assert llm["node"] == "ask" and not llm["tokens_estimated"]
+    assert (by_kind[("node", "ask")]["input_tokens"], by_kind[("node", "ask")]["output_tokens"]) == (12, 3)
+    assert by_kind[("node", "ask")]["input_bytes"] > 0
+
+    lookup = by_kind[("tool", "cached_lookup")]
+    assert lookup["cache"] == "hit"
+    assert lookup["node"] == "look"
+    assert lookup["output_bytes"] == len("answer for Colombo")
+
+
+def test_nothing_is_recorded_when_tracing_is_off(tmp_path: Path) -> None:
+    graph = build_graph()
+    with trace_to(tmp_path / "before.jsonl"):
+        pass
+
+    asyncio.run(graph.ainvoke({"messages": [("user", "Where to?")]}))
+    annotate(cache="hit")
+
+    assert not (tmp_path / "before.jsonl").exists()
+
+
+def test_annotate_ignores_plain_handler_lists() -> None:
+    token = var_child_runnable_config.set({"callbacks": []})
+    try:
+        annotate(cache="hit")
+    finally:
+        var_child_runnable_config.reset(token)
+
+
+def test_aggregate_builds_histograms_per_node() -> None:
+    spans = [
+        {"kind": "node", "name": "tools", "duration_ms": ms, "input_tokens": 0,
+         "output_tokens": 10, "cache": cache, "error": None}
+        for ms, cache in [(3, "hit"), (40, "miss"), (900, "miss"), (45, None)]
+    ] + [{"kind": "llm", "name": "gpt", "duration_ms": 1, "input_tokens": 5, "output_tokens": 1}]
+
+    report = aggregate(spans)
+
+    assert list(report) == ["tools"]
+    tools = report["tools"]
+    assert tools["count"] == 4
+    assert tools["p50_ms"] == 45 and tools["max_ms"] == 900
+    assert tools["output_tokens"] == 40
+    assert tools["cache_hit_rate"] == round(1 / 3, 3)
+    assert tools["histogram_ms"][5] == 1
+    assert tools["histogram_ms"][50] == 2
+    assert tools["histogram_ms"][1000] == 1
+    assert sum(tools["histogram_ms"].values()) == 4